@@ -0,0 +1,4 @@
+"""
+Pytest configuration: makes the repository root importable, so tests import the `src` package as the
+application does.
+"""
@@ -0,0 +1,652 @@
+"""
+Benchmark harness for the music interpreter backend.
+Times each analysis stage per audio file and performance profile, reports throughput and peak memory, checks
+the key and tempo estimates against the labels embedded in the file names, and writes everything as JSON so
+runs can be compared between commits.
+
+File names carry their ground truth: a key prefix such as `Am.`, `BM.` or `F#m.` (an upper-case M for
+major, a lower-case m for minor), and optionally a tempo as a separate 2-3 digit token such as `_140_`.
+
+With --startup, the latency of a fresh process is also measured: the import of the service, then two full
+requests (feature extraction and transcription of one file), once cold and once after the warm-up routine.
+
+With --backend, the feature extraction of each named analysis backend is compared: the latency of the first
+extraction in a fresh process, the warm CPU time per file, key and tempo accuracy, agreement with the first
+backend named, and conformance of every result to the schema the use case expects.
+
+With --online, each file is fed to the online key/tempo estimator in 100 ms chunks, reporting the per-chunk
+latency and the final estimates against the labels.
+
+Usage:
+    python -m src.benchmark [--audio-dir sample_audio] [--profile fast balanced accurate]
+                            [--output bench.json] [--compare previous.json] [--startup]
+                            [--backend librosa numpy] [--online]
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import librosa
+import numpy as np
+import soundfile as sf
+from src.infrastructure.analysis_context import AnalysisContext
+from src.infrastructure.audio_probe import AudioProbe
+from src.entities.musical_feature import PITCH_TRACK_DTYPE
+from src.infrastructure.ks_key_finder import KEY_NAMES, PITCH_CLASSES, KrumhanslSchmucklerKeyFinder
+from src.infrastructure.online_estimator import OnlineKeyTempoEstimator
+from src.infrastructure.librosa_transcription_service import LibrosaTranscriptionService
+from src.infrastructure.performance_profile import PERFORMANCE_PROFILES, get_performance_profile
+from src.main import BACKENDS, build_backends
+
+AUDIO_EXTENSIONS = {'.wav', '.flac', '.mp3', '.ogg', '.m4a', '.aiff', '.aif'}
+
+# The stages timed per file, in execution order
+STAGES = ['decode', 'stft', 'beats', 'chroma', 'piptrack', 'key', 'transcription']
+
+# A key label at the start of a file name, e.g. "Am." or "F#M."
+KEY_LABEL = re.compile(r'^([A-G])([#b]?)([Mm])\.')
+
+# A tempo label: a 2-3 digit token delimited by underscores or the extension
+TEMPO_LABEL = re.compile(r'_(\d{2,3})(?=_|\.[^.]+$)')
+
+# Relative tempo error accepted as correct, as in the MIREX tempo evaluation
+TEMPO_TOLERANCE = 0.04
+
+# Run in a fresh interpreter by `measure_startup`: argv holds the audio file, the profile and "1" to warm up
+STARTUP_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from src.main import build_controllers, mock_request
+from src.infrastructure.startup import warm_up
+imported = time.perf_counter()
+path, profile, warm = sys.argv[1], sys.argv[2], sys.argv[3] == '1'
+if warm:
+    warm_up(profile)
+warmed = time.perf_counter()
+requests = []
+for _ in range(2):
+    # Fresh controllers, so the second request does not hit the decoded-audio cache
+    upload_controller, feature_controller = build_controllers('general', profile=profile)
+    start = time.perf_counter()
+    feature_controller.extract_features(mock_request(path))
+    upload_controller.upload_audio(mock_request(path))
+    requests.append(time.perf_counter() - start)
+print(json.dumps({'import_seconds': imported - started, 'warm_up_seconds': warmed - imported,
+                  'first_request_seconds': requests[0], 'next_request_seconds': requests[1]}))
+"""
+
+# Run in a fresh interpreter by `measure_backend_startup`: argv holds the audio file and the backend name
+BACKEND_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from src.main import build_backends
+from src.infrastructure.audio_probe import AudioProbe
+imported = time.perf_counter()
+feature_extractor = build_backends('general').resolve('feature_extractor', sys.argv[2])
+feature_extractor.extract(AudioProbe().probe(sys.argv[1]))
+print(json.dumps({'import_seconds': imported - started,
+                  'first_extraction_seconds': time.perf_counter() - imported,
+                  'scipy_loaded': 'scipy' in sys.modules, 'numba_loaded': 'numba' in sys.modules}))
+"""
+
+
+def parse_labels(file_name):
+    """
+    Reads the ground-truth key and tempo from a labeled file name.
+
+    Args:
+        file_name (str): The base name of the audio file.
+
+    Returns:
+        tuple: The key in the key finder's spelling (e.g. "A minor") and the tempo in BPM; either is None when
+            the name carries no such label.
+    """
+    key = None
+    match = KEY_LABEL.match(file_name)
+    if match:
+        letter, accidental, mode = match.groups()
+        pitch_class = PITCH_CLASSES.index(letter) + {'#': 1, 'b': -1, '': 0}[accidental]
+        key = f"{PITCH_CLASSES[pitch_class % 12]} {'major' if mode == 'M' else 'minor'}"
+
+    tempo = None
+    for token in TEMPO_LABEL.findall(file_name):
+        if 40 <= int(token) <= 240:
+            tempo = float(token)
+    return key, tempo
+
+
+def key_score(estimated, reference):
+    """
+    Scores a key estimate with the MIREX weighting: 1 for the correct key, 0.5 for a perfect fifth above,
+    0.3 for the relative key, 0.2 for the parallel key and 0 otherwise.
+    """
+    if estimated == reference:
+        return 1.0
+    (tonic, mode), (reference_tonic, reference_mode) = estimated.split(), reference.split()
+    interval = (PITCH_CLASSES.index(tonic) - PITCH_CLASSES.index(reference_tonic)) % 12
+    if mode == reference_mode:
+        return 0.5 if interval == 7 else 0.0
+    if tonic == reference_tonic:
+        return 0.2
+    relative = 9 if reference_mode == 'major' else 3
+    return 0.3 if interval == relative else 0.0
+
+
+def tempo_scores(estimated, reference):
+    """
+    Returns whether a tempo estimate matches the reference within the tolerance (Acc1), and whether it does
+    allowing for octave errors of a factor 2 or 3 (Acc2).
+    """
+    def within(factor):
+        return abs(estimated - reference * factor) <= TEMPO_TOLERANCE * reference * factor
+
+    return within(1), any(within(factor) for factor in (1, 2, 3, 1 / 2, 1 / 3))
+
+
+@contextmanager
+def timed(timings, stage):
+    """
+    Adds the wall and CPU seconds spent in the block to `timings[stage]`.
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        entry = timings.setdefault(stage, {'wall': 0.0, 'cpu': 0.0})
+        entry['wall'] += time.perf_counter() - wall
+        entry['cpu'] += time.process_time() - cpu
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of this process so far, in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def benchmark_file(file_path, profile, key_finder, transcription_service, audio_probe):
+    """
+    Runs the whole analysis of one file stage by stage, timing each stage.
+
+    The STFT is timed on its own because the beat, pitch and transcription stages share it.
+
+    Returns:
+        dict: The file's duration, stage timings, estimates and label scores.
+    """
+    audio_file = audio_probe.probe(file_path)
+    audio_file.profile = profile.name
+    timings = {}
+
+    with timed(timings, 'decode'):
+        y, sr = librosa.load(file_path, sr=profile.analysis_rate_for(audio_file), res_type=profile.res_type)
+    context = AnalysisContext(y, sr, n_fft=profile.n_fft, hop_length=profile.hop_length)
+    with timed(timings, 'stft'):
+        context.stft_magnitude
+    with timed(timings, 'beats'):
+        tempo, _ = context.beats()
+    with timed(timings, 'chroma'):
+        chroma_profile = context.chroma.mean(axis=1)
+    with timed(timings, 'piptrack'):
+        context.pitch_contour
+    with timed(timings, 'key'):
+        key = key_finder.estimate_key_from_profile(chroma_profile)
+    with timed(timings, 'transcription'):
+        midi_data, score_data = transcription_service.transcribe(audio_file, context=context)
+        str(score_data)
+
+    tempo = float(np.atleast_1d(tempo)[0])
+    reference_key, reference_tempo = parse_labels(os.path.basename(file_path))
+    result = {
+        'file': os.path.basename(file_path),
+        'duration': len(y) / sr,
+        'analysis_rate': sr,
+        'stages': timings,
+        'cpu_seconds': sum(stage['cpu'] for stage in timings.values()),
+        'wall_seconds': sum(stage['wall'] for stage in timings.values()),
+        'key': key,
+        'tempo': tempo,
+        'midi_bytes': len(midi_data),
+        'reference_key': reference_key,
+        'reference_tempo': reference_tempo
+    }
+    if reference_key:
+        result['key_correct'] = key == reference_key
+        result['key_score'] = key_score(key, reference_key)
+    if reference_tempo:
+        result['tempo_acc1'], result['tempo_acc2'] = tempo_scores(tempo, reference_tempo)
+    return result
+
+
+def summarize(files):
+    """
+    Aggregates the per-file results of one profile.
+    """
+    audio_seconds = sum(f['duration'] for f in files)
+    cpu_seconds = sum(f['cpu_seconds'] for f in files)
+    key_labeled = [f for f in files if f['reference_key']]
+    tempo_labeled = [f for f in files if f['reference_tempo']]
+    return {
+        'files': len(files),
+        'audio_seconds': audio_seconds,
+        'cpu_seconds': cpu_seconds,
+        'wall_seconds': sum(f['wall_seconds'] for f in files),
+        'audio_seconds_per_cpu_second': audio_seconds / cpu_seconds if cpu_seconds else None,
+        'stage_cpu_seconds': {stage: sum(f['stages'][stage]['cpu'] for f in files) for stage in STAGES},
+        'key_accuracy': _mean([f['key_correct'] for f in key_labeled]),
+        'key_mirex_score': _mean([f['key_score'] for f in key_labeled]),
+        'tempo_acc1': _mean([f['tempo_acc1'] for f in tempo_labeled]),
+        'tempo_acc2': _mean([f['tempo_acc2'] for f in tempo_labeled]),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def run_benchmark(audio_dir, profiles, genre='general', warmup=True, repeat=1):
+    """
+    Benchmarks every audio file of a directory under each performance profile.
+
+    Args:
+        audio_dir (str): The directory holding the (labeled) audio files.
+        profiles (list): The names of the performance profiles to run.
+        genre (str): The genre profile for key estimation.
+        warmup (bool): Whether to analyze the first file once, untimed, so one-off costs (imports, JIT
+            compilation, filter construction) are not charged to it.
+        repeat (int): The number of runs per file; the one with the least CPU time is kept, as the least
+            disturbed by other activity on the machine.
+
+    Returns:
+        dict: The run metadata and the per-profile file results and summaries.
+    """
+    paths = _audio_paths(audio_dir)
+    key_finder = KrumhanslSchmucklerKeyFinder(genre)
+    audio_probe = AudioProbe()
+
+    results = {'meta': _run_metadata(genre), 'profiles': {}}
+    for name in profiles:
+        profile = get_performance_profile(name)
+        transcription_service = LibrosaTranscriptionService(profile=profile)
+        if warmup and paths:
+            benchmark_file(paths[0], profile, key_finder, transcription_service, audio_probe)
+        files = [min((benchmark_file(path, profile, key_finder, transcription_service, audio_probe)
+                      for _ in range(repeat)), key=lambda result: result['cpu_seconds'])
+                 for path in paths]
+        results['profiles'][name] = {'files': files, 'summary': summarize(files)}
+    return results
+
+
+def measure_startup(file_path, profile, warm):
+    """
+    Measures the start-up latency of a fresh service process.
+
+    Args:
+        file_path (str): The audio file both requests process.
+        profile (str): The performance profile.
+        warm (bool): Whether the process runs the warm-up routine before its first request.
+
+    Returns:
+        dict: The seconds spent importing the service, warming up and serving the first and the next request,
+            and the wall time of the whole process including interpreter start-up.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', STARTUP_PROBE, os.path.abspath(file_path), profile,
+                                '1' if warm else '0'], cwd=root, capture_output=True, text=True, check=True)
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    timings['process_seconds'] = time.perf_counter() - started
+    return timings
+
+
+def run_startup_benchmark(audio_dir, profiles):
+    """
+    Measures cold and warmed start-up latency per performance profile on the first audio file of a directory.
+
+    Returns:
+        dict: The "cold" and "warm" measurements of `measure_startup` by profile name.
+    """
+    paths = _audio_paths(audio_dir)
+    if not paths:
+        return {}
+    return {name: {'cold': measure_startup(paths[0], name, warm=False),
+                   'warm': measure_startup(paths[0], name, warm=True)}
+            for name in profiles}
+
+
+def check_conformance(extracted, duration):
+    """
+    Checks an extraction against the schema the use case builds its MusicalFeature from.
+
+    Args:
+        extracted (dict): The extractor's output, with pitch_mode "contour".
+        duration (float): The audio duration in seconds.
+
+    Returns:
+        list: A description of each violation; empty when the extraction conforms.
+    """
+    problems = []
+    tempo = np.atleast_1d(extracted['tempo'])
+    if tempo.size != 1 or not np.isfinite(tempo[0]) or tempo[0] < 0:
+        problems.append(f"tempo is not one non-negative number: {extracted['tempo']!r}")
+    if extracted['key'] not in KEY_NAMES:
+        problems.append(f"unknown key: {extracted['key']!r}")
+    pitch = np.asarray(extracted['pitch'])
+    if pitch.ndim != 1 or pitch.dtype != np.float32 or len(pitch) > 10 or (pitch <= 0).any():
+        problems.append(f"pitch is not up to 10 positive float32 frequencies: {pitch!r}")
+    rhythm = np.asarray(extracted['rhythm'])
+    if rhythm.ndim != 1 or (np.diff(rhythm) < 0).any() or (rhythm < 0).any() or (rhythm > duration + 0.1).any():
+        problems.append("rhythm is not sorted beat times within the audio")
+    pitch_track = np.asarray(extracted.get('pitch_track'))
+    if pitch_track.dtype != PITCH_TRACK_DTYPE or pitch_track.ndim != 1:
+        problems.append(f"pitch track is not a PITCH_TRACK_DTYPE array: {pitch_track.dtype}")
+    elif (np.diff(pitch_track['time']) < 0).any() or (pitch_track['frequency'] < 0).any():
+        problems.append("pitch track times are not sorted or frequencies are negative")
+    return problems
+
+
+def benchmark_backend_file(feature_extractor, audio_file):
+    """
+    Extracts the features of one file with a backend, timing the extraction and checking its output.
+
+    Returns:
+        dict: The file's timings, estimates and conformance problems.
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    extracted = feature_extractor.extract(audio_file, pitch_mode='contour')
+    cpu_seconds, wall_seconds = time.process_time() - cpu, time.perf_counter() - wall
+    return {
+        'file': os.path.basename(audio_file.file_path),
+        'duration': audio_file.duration,
+        'cpu_seconds': cpu_seconds,
+        'wall_seconds': wall_seconds,
+        'key': extracted['key'],
+        'tempo': float(np.atleast_1d(extracted['tempo'])[0]),
+        'problems': check_conformance(extracted, audio_file.duration)
+    }
+
+
+def measure_backend_startup(file_path, backend):
+    """
+    Measures the latency of the first feature extraction of a backend in a fresh process.
+
+    Returns:
+        dict: The seconds spent importing the service and extracting the file, and whether SciPy and numba
+            were loaded, plus the wall time of the whole process including interpreter start-up.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', BACKEND_PROBE, os.path.abspath(file_path), backend],
+                               cwd=root, capture_output=True, text=True, check=True)
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    timings['process_seconds'] = time.perf_counter() - started
+    return timings
+
+
+def run_backend_benchmark(audio_dir, backends, genre='general', repeat=1):
+    """
+    Compares the feature extraction of analysis backends on every audio file of a directory.
+
+    Each backend is first measured cold in a fresh process, then warmed on the first file and timed on every
+    file in this process; its estimates are scored against the labels and against the first backend's.
+
+    Args:
+        audio_dir (str): The directory holding the (labeled) audio files.
+        backends (list): The backend names; the first is the reference for agreement.
+        genre (str): The genre profile for key estimation.
+        repeat (int): The number of runs per file; the one with the least CPU time is kept.
+
+    Returns:
+        dict: The per-backend cold start-up, file results and summaries.
+    """
+    paths = _audio_paths(audio_dir)
+    audio_probe = AudioProbe()
+    audio_files = [audio_probe.probe(path) for path in paths]
+    registry = build_backends(genre)
+
+    results = {}
+    for name in backends:
+        feature_extractor = registry.resolve('feature_extractor', name)
+        startup = measure_backend_startup(paths[0], name) if paths else None
+        if audio_files:
+            feature_extractor.extract(audio_files[0])
+        files = [min((benchmark_backend_file(feature_extractor, audio_file) for _ in range(repeat)),
+                     key=lambda result: result['cpu_seconds'])
+                 for audio_file in audio_files]
+        for result in files:
+            reference_key, reference_tempo = parse_labels(result['file'])
+            if reference_key:
+                result['key_score'] = key_score(result['key'], reference_key)
+            if reference_tempo:
+                result['tempo_acc1'], result['tempo_acc2'] = tempo_scores(result['tempo'], reference_tempo)
+        results[name] = {'startup': startup, 'files': files}
+
+    reference = results[backends[0]]['files'] if backends else []
+    for name, run in results.items():
+        files = run['files']
+        audio_seconds = sum(f['duration'] for f in files)
+        cpu_seconds = sum(f['cpu_seconds'] for f in files)
+        run['summary'] = {
+            'files': len(files),
+            'audio_seconds_per_cpu_second': audio_seconds / cpu_seconds if cpu_seconds else None,
+            'conformant_files': sum(not f['problems'] for f in files),
+            'key_mirex_score': _mean([f['key_score'] for f in files if 'key_score' in f]),
+            'tempo_acc1': _mean([f['tempo_acc1'] for f in files if 'tempo_acc1' in f]),
+            'tempo_acc2': _mean([f['tempo_acc2'] for f in files if 'tempo_acc2' in f]),
+            'key_agreement': _mean([f['key'] == r['key'] for f, r in zip(files, reference)]),
+            'tempo_agreement': _mean([tempo_scores(f['tempo'], r['tempo'])[1] for f, r in zip(files, reference)
+                                      if r['tempo'] > 0])
+        }
+    return results
+
+
+def run_online_benchmark(audio_dir, genre='general', chunk_seconds=0.1):
+    """
+    Streams every audio file of a directory through the online key/tempo estimator as 16-bit PCM chunks.
+
+    Args:
+        audio_dir (str): The directory holding the (labeled) audio files.
+        genre (str): The genre profile for key estimation.
+        chunk_seconds (float): The length of each pushed chunk.
+
+    Returns:
+        dict: The per-file chunk latencies, final estimates and label scores, and their summary.
+    """
+    files = []
+    for path in _audio_paths(audio_dir):
+        pcm, sr = sf.read(path, dtype='int16')
+        estimator = OnlineKeyTempoEstimator(sr, genre)
+        step = max(int(chunk_seconds * sr), 1)
+        latencies = []
+        for start in range(0, len(pcm), step):
+            began = time.perf_counter()
+            estimate = estimator.push(pcm[start:start + step])
+            latencies.append(time.perf_counter() - began)
+        result = {
+            'file': os.path.basename(path),
+            'chunks': len(latencies),
+            'latency_ms_p50': 1e3 * float(np.median(latencies)),
+            'latency_ms_p99': 1e3 * float(np.percentile(latencies, 99)),
+            'latency_ms_max': 1e3 * max(latencies),
+            'key': estimate.key,
+            'key_confidence': estimate.key_confidence,
+            'tempo': estimate.tempo,
+            'tempo_confidence': estimate.tempo_confidence
+        }
+        reference_key, reference_tempo = parse_labels(result['file'])
+        if reference_key and estimate.key:
+            result['key_score'] = key_score(estimate.key, reference_key)
+        if reference_tempo:
+            result['tempo_acc1'], result['tempo_acc2'] = tempo_scores(estimate.tempo, reference_tempo)
+        files.append(result)
+
+    latencies = [f['latency_ms_p99'] for f in files]
+    return {'files': files, 'summary': {
+        'chunk_seconds': chunk_seconds,
+        'latency_ms_p99': max(latencies) if latencies else None,
+        'key_mirex_score': _mean([f['key_score'] for f in files if 'key_score' in f]),
+        'tempo_acc1': _mean([f['tempo_acc1'] for f in files if 'tempo_acc1' in f]),
+        'tempo_acc2': _mean([f['tempo_acc2'] for f in files if 'tempo_acc2' in f])
+    }}
+
+
+def print_report(results, baseline=None):
+    """
+    Prints one summary line per profile, with the relative change against a baseline run when given.
+    """
+    for name, run in results['profiles'].items():
+        summary = run['summary']
+        print(f"[{name}] {summary['files']} files, {summary['audio_seconds']:.1f} s of audio: "
+              f"{summary['audio_seconds_per_cpu_second']:.2f} audio-s/CPU-s, peak RSS {summary['peak_rss_mb']:.0f} MiB, "
+              f"key {_percent(summary['key_accuracy'])} (MIREX {_percent(summary['key_mirex_score'])}), "
+              f"tempo Acc1 {_percent(summary['tempo_acc1'])} / Acc2 {_percent(summary['tempo_acc2'])}")
+        print('    CPU s by stage: ' + ', '.join(f"{stage} {seconds:.3f}"
+                                                  for stage, seconds in summary['stage_cpu_seconds'].items()))
+        previous = (baseline or {}).get('profiles', {}).get(name)
+        if previous:
+            before = previous['summary']
+            print(f"    vs baseline {baseline['meta'].get('commit')}: throughput "
+                  f"{_change(before['audio_seconds_per_cpu_second'], summary['audio_seconds_per_cpu_second'])}, "
+                  f"key accuracy {_percent(before['key_accuracy'])} -> {_percent(summary['key_accuracy'])}, "
+                  f"tempo Acc1 {_percent(before['tempo_acc1'])} -> {_percent(summary['tempo_acc1'])}")
+            print('    stage CPU change: ' + ', '.join(
+                f"{stage} {_change(before['stage_cpu_seconds'].get(stage), seconds)}"
+                for stage, seconds in summary['stage_cpu_seconds'].items()))
+
+
+def print_startup_report(startup):
+    """
+    Prints the cold and warmed start-up latency of each profile.
+    """
+    for name, runs in startup.items():
+        cold, warm = runs['cold'], runs['warm']
+        print(f"[{name} start-up] import {cold['import_seconds']:.2f} s; cold: first request "
+              f"{cold['first_request_seconds']:.2f} s, next {cold['next_request_seconds']:.2f} s; warmed: warm-up "
+              f"{warm['warm_up_seconds']:.2f} s, first request {warm['first_request_seconds']:.2f} s, next "
+              f"{warm['next_request_seconds']:.2f} s")
+
+
+def print_backend_report(backends):
+    """
+    Prints the start-up latency, throughput, accuracy and conformance of each backend.
+    """
+    reference = next(iter(backends), None)
+    for name, run in backends.items():
+        summary, startup = run['summary'], run['startup']
+        if startup:
+            print(f"[{name} backend] cold: import {startup['import_seconds']:.2f} s, first extraction "
+                  f"{startup['first_extraction_seconds']:.2f} s (SciPy {'loaded' if startup['scipy_loaded'] else 'not loaded'}, "
+                  f"numba {'loaded' if startup['numba_loaded'] else 'not loaded'})")
+        print(f"    warm: {_rate(summary['audio_seconds_per_cpu_second'])} audio-s/CPU-s, "
+              f"key MIREX {_percent(summary['key_mirex_score'])}, tempo Acc1 {_percent(summary['tempo_acc1'])} / "
+              f"Acc2 {_percent(summary['tempo_acc2'])}, agreement with {reference}: key "
+              f"{_percent(summary['key_agreement'])}, tempo {_percent(summary['tempo_agreement'])}; "
+              f"{summary['conformant_files']}/{summary['files']} files conform")
+        for result in run['files']:
+            for problem in result['problems']:
+                print(f"    {result['file']}: {problem}")
+
+
+def print_online_report(online):
+    """
+    Prints the per-chunk latency and final accuracy of the online estimator.
+    """
+    summary = online['summary']
+    print(f"[online] {len(online['files'])} files in {1e3 * summary['chunk_seconds']:.0f} ms chunks: worst p99 "
+          f"latency {_rate(summary['latency_ms_p99'])} ms, key MIREX {_percent(summary['key_mirex_score'])}, "
+          f"tempo Acc1 {_percent(summary['tempo_acc1'])} / Acc2 {_percent(summary['tempo_acc2'])}")
+
+
+def _audio_paths(audio_dir):
+    return [os.path.join(audio_dir, name) for name in sorted(os.listdir(audio_dir))
+            if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS]
+
+
+def _run_metadata(genre):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'genre': genre,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'librosa': librosa.__version__,
+        'numpy': np.__version__
+    }
+
+
+def _mean(values):
+    return float(np.mean(values)) if values else None
+
+
+def _percent(value):
+    return 'n/a' if value is None else f"{100 * value:.0f}%"
+
+
+def _rate(value):
+    return 'n/a' if value is None else f"{value:.2f}"
+
+
+def _change(before, after):
+    if not before or after is None:
+        return 'n/a'
+    return f"{100 * (after - before) / before:+.1f}%"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark speed and accuracy on labeled audio files.")
+    parser.add_argument('--audio-dir', default='sample_audio', help="The directory of labeled audio files.")
+    parser.add_argument('--profile', nargs='+', choices=sorted(PERFORMANCE_PROFILES),
+                        default=['fast', 'balanced', 'accurate'], help="The performance profiles to benchmark.")
+    parser.add_argument('--genre', default='general', help="The genre profile for key estimation.")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per file; the fastest is kept (default: 3).")
+    parser.add_argument('--no-warmup', dest='warmup', action='store_false',
+                        help="Charge one-off start-up costs to the first file.")
+    parser.add_argument('--output', metavar='JSON', help="Write the full results to this file.")
+    parser.add_argument('--compare', metavar='JSON', help="A previous results file to compare against.")
+    parser.add_argument('--startup', action='store_true',
+                        help="Also measure cold and warmed start-up latency in fresh processes.")
+    parser.add_argument('--backend', nargs='+', choices=BACKENDS,
+                        help="Also compare the feature extraction of these analysis backends; the first is the "
+                             "reference for agreement.")
+    parser.add_argument('--online', action='store_true',
+                        help="Also stream each file through the online key/tempo estimator in 100 ms chunks.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmark(args.audio_dir, args.profile, args.genre, args.warmup, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as source:
+            baseline = json.load(source)
+    print_report(results, baseline)
+    if args.startup:
+        results['startup'] = run_startup_benchmark(args.audio_dir, args.profile)
+        print_startup_report(results['startup'])
+    if args.backend:
+        results['backends'] = run_backend_benchmark(args.audio_dir, args.backend, args.genre, args.repeat)
+        print_backend_report(results['backends'])
+    if args.online:
+        results['online'] = run_online_benchmark(args.audio_dir, args.genre)
+        print_online_report(results['online'])
+
+    if args.output:
+        with open(args.output, 'w') as sink:
+            json.dump(results, sink, indent=2)
+
+
+if __name__ == "__main__":
+    main()
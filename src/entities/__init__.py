@@ -4,8 +4,12 @@ Contains the core domain models.
 """
 
 from .audio_file import AudioFile
+from .diagnostics import Diagnostics, SpanTiming
 from .music_score import MusicScore
-from .musical_feature import MusicalFeature
+from .musical_feature import FEATURE_NAMES, PITCH_TRACK_DTYPE, MusicalFeature
+from .online_estimate import OnlineEstimate
+from .note import SCORE_NOTE_DTYPE, Note
 from .transcription_result import TranscriptionResult
 
-__all__ = ['AudioFile', 'MusicScore', 'MusicalFeature', 'TranscriptionResult']
\ No newline at end of file
+__all__ = ['AudioFile', 'Diagnostics', 'SpanTiming', 'MusicScore', 'MusicalFeature', 'FEATURE_NAMES', 'Note',
+           'OnlineEstimate', 'PITCH_TRACK_DTYPE', 'SCORE_NOTE_DTYPE', 'TranscriptionResult']
\ No newline at end of file
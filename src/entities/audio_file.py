@@ -14,10 +14,27 @@ class AudioFile:
         format (str): Audio file format, such as 'wav', 'mp3', etc.
         duration (float): The duration of the audio file in seconds.
         sample_rate (int): The sample rate of the audio file in Hertz.
+        channels (int): The number of audio channels, if known.
+        analysis_sample_rate (int): The sample rate to analyze the audio at, if it differs from `sample_rate`.
+        profile (str): The name of the performance profile requested for this file, if any.
     """
 
-    def __init__(self, file_path: str, format: str, duration: float, sample_rate: int):
+    __slots__ = ('file_path', 'format', 'duration', 'sample_rate', 'channels', 'analysis_sample_rate', 'profile')
+
+    def __init__(self, file_path: str, format: str, duration: float, sample_rate: int, channels: int = None,
+                 analysis_sample_rate: int = None, profile: str = None):
         self.file_path = file_path
         self.format = format
         self.duration = duration
-        self.sample_rate = sample_rate
\ No newline at end of file
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.analysis_sample_rate = analysis_sample_rate
+        self.profile = profile
+
+    @property
+    def analysis_rate(self):
+        """
+        int: The pinned analysis rate, or the native rate when none is pinned (performance profiles may then
+        choose a lower one).
+        """
+        return self.analysis_sample_rate or self.sample_rate
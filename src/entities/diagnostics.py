@@ -0,0 +1,56 @@
+"""
+Module: Diagnostics Entity
+Location: entities/diagnostics.py
+Defines the entities holding the timing, memory and measurement diagnostics recorded while a use case ran.
+"""
+
+
+class SpanTiming:
+    """
+    The aggregated measurements of one named processing stage.
+
+    Attributes:
+        name (str): The stage path, with nested stages separated by "/" (e.g. "extract_features/beats").
+        calls (int): The number of times the stage ran.
+        wall_seconds (float): The total elapsed time spent in the stage.
+        cpu_seconds (float): The total process CPU time spent in the stage.
+        peak_allocated_bytes (int): The largest amount of memory allocated during the stage above what was
+            allocated when it started, if allocations were traced.
+    """
+
+    __slots__ = ('name', 'calls', 'wall_seconds', 'cpu_seconds', 'peak_allocated_bytes')
+
+    def __init__(self, name: str, calls: int = 0, wall_seconds: float = 0.0, cpu_seconds: float = 0.0,
+                 peak_allocated_bytes: int = None):
+        self.name = name
+        self.calls = calls
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+        self.peak_allocated_bytes = peak_allocated_bytes
+
+
+class Diagnostics:
+    """
+    Represents the diagnostics of one use case execution.
+
+    Attributes:
+        spans (list): The SpanTiming of every stage, in the order the stages first started.
+        profile (str): The cProfile statistics of the execution, if a profile was captured.
+        allocations (list): The top allocation sites as text lines, if allocations were captured.
+        measurements (dict): Named quantities the stages reported, e.g. the seconds of audio they skipped.
+    """
+
+    __slots__ = ('spans', 'profile', 'allocations', 'measurements')
+
+    def __init__(self, spans: list = None, profile: str = None, allocations: list = None,
+                 measurements: dict = None):
+        self.spans = spans or []
+        self.profile = profile
+        self.allocations = allocations
+        self.measurements = measurements or {}
+
+    def span(self, name):
+        """
+        Returns the SpanTiming of a stage, or None if it did not run.
+        """
+        return next((span for span in self.spans if span.name == name), None)
@@ -4,6 +4,10 @@ Location: entities/music_score.py
 Defines the entity that stores the result of music transcription as a score.
 """
 
+import numpy as np
+
+from src.entities.note import SCORE_NOTE_DTYPE
+
 
 class MusicScore:
     """
@@ -12,19 +16,36 @@ class MusicScore:
     Attributes:
         title (str): The title of the music piece.
         composer (str): Composer of the piece (optional).
-        notes (list): A list of musical notes in the score.
+        notes (np.recarray): The notes of the score ordered by start, one SCORE_NOTE_DTYPE record per note;
+            records expose the fields of Note as attributes.
+        tempo (float): The tempo of the piece in BPM (beats per minute).
+        divisions (int): The number of divisions per beat that note positions are quantized to.
+        beats_per_measure (int): The number of beats in a measure.
     """
 
-    def __init__(self, title: str, composer: str = None):
+    __slots__ = ('title', 'composer', 'tempo', 'divisions', 'beats_per_measure', '_notes')
+
+    def __init__(self, title: str, composer: str = None, tempo: float = 120.0, divisions: int = 4,
+                 beats_per_measure: int = 4):
         self.title = title
         self.composer = composer
-        self.notes = []
+        self._notes = np.empty(0, dtype=SCORE_NOTE_DTYPE)
+        self.tempo = tempo
+        self.divisions = divisions
+        self.beats_per_measure = beats_per_measure
+
+    @property
+    def notes(self):
+        return self._notes.view(np.recarray)
 
-    def add_notes(self, notes: list):
+    def add_notes(self, notes):
         """
         Adds notes to the musical score.
         
         Args:
-            notes (list): List of musical notes.
+            notes: A SCORE_NOTE_DTYPE array, or a list of Note objects.
         """
-        self.notes.extend(notes)
\ No newline at end of file
+        if not isinstance(notes, np.ndarray):
+            notes = np.array([(note.pitch, note.start, note.duration, note.velocity) for note in notes],
+                             dtype=SCORE_NOTE_DTYPE)
+        self._notes = np.concatenate([self._notes, notes.astype(SCORE_NOTE_DTYPE, copy=False)])
@@ -4,19 +4,89 @@ Location: entities/musical_feature.py
 Defines the entity for holding extracted musical features such as tempo, key, pitch, and rhythm.
 """
 
+import numpy as np
+
+# One row of a pitch track: the start time of the frame or bin in seconds, and its pitch in Hz (0 when unvoiced)
+PITCH_TRACK_DTYPE = np.dtype([('time', np.float32), ('frequency', np.float32)])
+
+# The features a caller can request from an extraction
+FEATURE_NAMES = ('tempo', 'key', 'pitch', 'rhythm')
+
+
+def _as_tempo(tempo):
+    return float(np.atleast_1d(tempo)[0]) if np.size(tempo) else 0.0
+
+
+class _LazyAttribute:
+    """
+    An attribute that may be given as a zero-argument callable, which is called on first access and replaced
+    by its (converted) value. None stands for a missing value and is kept as is.
+    """
+
+    def __init__(self, convert):
+        self.convert = convert
+
+    def __set_name__(self, owner, name):
+        self.slot = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        if callable(value):
+            value = value()
+            value = None if value is None else self.convert(value)
+            setattr(instance, self.slot, value)
+        return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, value if value is None or callable(value) else self.convert(value))
+
+
 class MusicalFeature:
     """
     Represents musical features extracted from an audio file.
 
+    Features the caller did not request may be given as zero-argument callables: they are computed on first
+    access and memoized. Features still unevaluated when the entity is pickled (e.g. returned from a worker
+    process) are not computed but left as None.
+
     Attributes:
         tempo (float): The tempo of the music in BPM (beats per minute).
         key (str): The musical key (e.g., "C major").
-        pitch (list): List of pitch values detected in the audio.
-        rhythm (list): List of rhythmic patterns in the audio.
+        pitch (np.ndarray): The pitch values detected in the audio, in Hz (float32).
+        rhythm (np.ndarray): The beat times of the audio, in seconds (float64).
+        pitch_track (np.ndarray): The full pitch contour at the requested resolution, as a PITCH_TRACK_DTYPE
+            array, if it was requested.
+        diagnostics (Diagnostics): The stage timings of the extraction, if they were requested.
     """
 
-    def __init__(self, tempo: float, key: str, pitch: list, rhythm: list):
+    __slots__ = ('_tempo', '_key', '_pitch', '_rhythm', '_pitch_track', 'diagnostics')
+
+    tempo = _LazyAttribute(_as_tempo)
+    key = _LazyAttribute(lambda key: key)
+    pitch = _LazyAttribute(lambda pitch: np.asarray(pitch, dtype=np.float32))
+    rhythm = _LazyAttribute(lambda rhythm: np.asarray(rhythm, dtype=np.float64))
+    pitch_track = _LazyAttribute(lambda pitch_track: np.asarray(pitch_track, dtype=PITCH_TRACK_DTYPE))
+
+    def __init__(self, tempo: float, key: str, pitch, rhythm, pitch_track=None, diagnostics=None):
         self.tempo = tempo
         self.key = key
         self.pitch = pitch
-        self.rhythm = rhythm
\ No newline at end of file
+        self.rhythm = rhythm
+        self.pitch_track = pitch_track
+        self.diagnostics = diagnostics
+
+    def is_evaluated(self, name):
+        """
+        Returns whether a feature holds a value rather than a pending computation.
+        """
+        return not callable(getattr(self, f"_{name}"))
+
+    def __getstate__(self):
+        state = {slot: getattr(self, slot) for slot in self.__slots__}
+        return {slot: None if callable(value) else value for slot, value in state.items()}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
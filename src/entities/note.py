@@ -0,0 +1,32 @@
+"""
+Module: Note Entity
+Location: entities/note.py
+Defines the entity for a single quantized note of a musical score, and the record layout scores store their
+notes in.
+"""
+
+import numpy as np
+
+# The layout of a score's notes: one record per note, fields as in Note
+SCORE_NOTE_DTYPE = np.dtype([('pitch', np.uint8), ('start', np.int64), ('duration', np.int64),
+                             ('velocity', np.uint8)])
+
+
+class Note:
+    """
+    Represents a note placed on a score's beat grid.
+
+    Attributes:
+        pitch (int): The MIDI pitch of the note (60 is middle C).
+        start (int): The start of the note, in divisions from the beginning of the score.
+        duration (int): The length of the note, in divisions.
+        velocity (int): The MIDI velocity of the note (1-127).
+    """
+
+    __slots__ = ('pitch', 'start', 'duration', 'velocity')
+
+    def __init__(self, pitch: int, start: int, duration: int, velocity: int = 64):
+        self.pitch = pitch
+        self.start = start
+        self.duration = duration
+        self.velocity = velocity
@@ -0,0 +1,27 @@
+"""
+Module: Online Estimate Entity
+Location: entities/online_estimate.py
+Defines the entity for holding the running key and tempo estimate of a live audio stream.
+"""
+
+
+class OnlineEstimate:
+    """
+    Represents the key and tempo of a live stream as estimated from the audio received so far.
+
+    Attributes:
+        time (float): The stream time the estimate is current to, in seconds.
+        key (str): The estimated key (e.g., "C major"), or None before any pitched audio was received.
+        key_confidence (float): The correlation margin of the key over the runner-up key, from 0 to 1.
+        tempo (float): The estimated tempo in BPM, or 0.0 until a periodicity was found.
+        tempo_confidence (float): The onset autocorrelation at the beat period relative to lag 0, from 0 to 1.
+    """
+
+    __slots__ = ('time', 'key', 'key_confidence', 'tempo', 'tempo_confidence')
+
+    def __init__(self, time: float, key: str, key_confidence: float, tempo: float, tempo_confidence: float):
+        self.time = time
+        self.key = key
+        self.key_confidence = key_confidence
+        self.tempo = tempo
+        self.tempo_confidence = tempo_confidence
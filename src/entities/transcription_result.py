@@ -11,9 +11,14 @@ class TranscriptionResult:
 
     Attributes:
         midi_data (bytes): The byte representation of the transcribed MIDI file.
-        score_data (str): The MusicXML representation of the music score.
+        score_data: The MusicXML representation of the music score; either a string or a document that
+            yields the MusicXML text in chunks when iterated, so long scores can be streamed to a sink.
+        diagnostics (Diagnostics): The stage timings of the transcription, if they were requested.
     """
 
-    def __init__(self, midi_data: bytes, score_data: str):
+    __slots__ = ('midi_data', 'score_data', 'diagnostics')
+
+    def __init__(self, midi_data: bytes, score_data: str, diagnostics=None):
         self.midi_data = midi_data
-        self.score_data = score_data
\ No newline at end of file
+        self.score_data = score_data
+        self.diagnostics = diagnostics
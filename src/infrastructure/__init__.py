@@ -5,5 +5,33 @@ Contains the implementations for transcription and feature extraction using exte
 
 from .librosa_transcription_service import LibrosaTranscriptionService
 from .librosa_feature_extractor import LibrosaFeatureExtractor
+from .numpy_feature_extractor import NumpyFeatureExtractor
+from .online_estimator import OnlineKeyTempoEstimator
+from .audio_cache import DecodedAudioCache
+from .shared_pcm_cache import SharedPCMCache
+from .analysis_context import AnalysisContext
+from .active_regions import ActiveRegions, find_active_regions
+from .pitch_contour import PitchContour, extract_pitch_contour
+from .streaming_analysis import StreamingAnalysis, analyze_stream
+from .feature_store import FeatureStore, StoredFeatureExtractor
+from .genre_profile import GENRE_PROFILES, get_genre_profile
+from .ks_key_finder import KrumhanslSchmucklerKeyFinder
+from .note_segmentation import NOTE_DTYPE, segment_notes
+from .midi_writer import write_midi_bytes
+from .musicxml_writer import MusicXMLDocument, iter_musicxml
+from .score_quantization import build_score
+from .audio_probe import AudioProbe
+from .performance_profile import (PerformanceProfile, PERFORMANCE_PROFILES, DEFAULT_PROFILE,
+                                  get_performance_profile)
+from .startup import configure_numba_cache, warm_up
 
-__all__ = ['LibrosaTranscriptionService', 'LibrosaFeatureExtractor']
\ No newline at end of file
+__all__ = ['LibrosaTranscriptionService', 'LibrosaFeatureExtractor', 'NumpyFeatureExtractor',
+           'OnlineKeyTempoEstimator', 'DecodedAudioCache', 'SharedPCMCache', 'AnalysisContext',
+           'ActiveRegions', 'find_active_regions',
+           'PitchContour', 'extract_pitch_contour', 'StreamingAnalysis', 'analyze_stream',
+           'FeatureStore', 'StoredFeatureExtractor',
+           'GENRE_PROFILES', 'get_genre_profile', 'KrumhanslSchmucklerKeyFinder',
+           'NOTE_DTYPE', 'segment_notes', 'write_midi_bytes',
+           'MusicXMLDocument', 'iter_musicxml', 'build_score',
+           'AudioProbe', 'PerformanceProfile', 'PERFORMANCE_PROFILES', 'DEFAULT_PROFILE',
+           'get_performance_profile', 'configure_numba_cache', 'warm_up']
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Module: Active Regions
+Location: src/infrastructure/active_regions.py
+Implements a cheap energy pre-pass that finds the active regions of a signal, so the expensive analysis stages
+(STFT, CQT, onset envelopes, piptrack) can run over the active audio only. Leading and trailing silence and long
+gaps such as applause breaks are cut out, and times measured on the compacted signal are mapped back to the
+original timeline.
+"""
+
+import numpy as np
+
+# A block is silent when its RMS level is this far below the loudest block of the signal
+SILENCE_THRESHOLD_DB = -50.0
+
+# Only gaps at least this long are cut; shorter pauses belong to the music
+MIN_SILENCE_SECONDS = 1.0
+
+# The audio kept on either side of each active stretch, so decays and soft attacks survive the cut
+PADDING_SECONDS = 0.25
+
+
+class ActiveRegions:
+    """
+    The active sample ranges of a signal, and the mapping between the compacted and the original timeline.
+
+    Attributes:
+        regions (np.ndarray): The [start, stop) sample ranges of the active audio (N x 2, int64), in order.
+        sr (int): The sample rate.
+        n_samples (int): The length of the original signal in samples.
+    """
+
+    def __init__(self, regions, sr, n_samples):
+        self.regions = np.asarray(regions, dtype=np.int64).reshape(-1, 2)
+        self.sr = sr
+        self.n_samples = n_samples
+        lengths = self.regions[:, 1] - self.regions[:, 0]
+        # The start of each region on the compacted timeline, in samples
+        self._compacted_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+        self.n_active_samples = int(lengths.sum())
+
+    @property
+    def active_seconds(self):
+        return self.n_active_samples / self.sr
+
+    @property
+    def skipped_seconds(self):
+        return (self.n_samples - self.n_active_samples) / self.sr
+
+    def covers_all(self):
+        """
+        Returns whether the whole signal is active, so there is nothing to skip.
+        """
+        return self.n_active_samples == self.n_samples
+
+    def compact(self, y):
+        """
+        Returns the active audio of a signal, concatenated.
+        """
+        if self.covers_all():
+            return y
+        return np.concatenate([y[start:stop] for start, stop in self.regions])
+
+    def expand_frames(self, values, hop_length):
+        """
+        Places per-frame values of the compacted signal on the frame grid of the original signal, with zeros in
+        the skipped gaps. Region boundaries must be multiples of `hop_length` (see `find_active_regions`).
+
+        Args:
+            values (np.ndarray): One value per (centered) frame of the compacted signal.
+            hop_length (int): The hop length between frames.
+
+        Returns:
+            np.ndarray: One value per frame of the original signal.
+        """
+        expanded = np.zeros(1 + self.n_samples // hop_length, dtype=np.asarray(values).dtype)
+        samples = np.arange(len(values), dtype=np.int64) * hop_length
+        index = np.searchsorted(self._compacted_starts, samples, side='right') - 1
+        index = np.clip(index, 0, len(self.regions) - 1)
+        frames = (samples + self.regions[index, 0] - self._compacted_starts[index]) // hop_length
+        expanded[np.minimum(frames, len(expanded) - 1)] = values
+        return expanded
+
+    def to_original_time(self, times):
+        """
+        Maps times on the compacted signal back to the original timeline.
+
+        Args:
+            times (np.ndarray): Times in seconds, measured on the compacted signal.
+
+        Returns:
+            np.ndarray: The corresponding times in the original signal (float64).
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if len(self.regions) == 0:
+            return times
+        compacted_starts = self._compacted_starts / self.sr
+        index = np.clip(np.searchsorted(compacted_starts, times, side='right') - 1, 0, len(self.regions) - 1)
+        return times + (self.regions[index, 0] / self.sr - compacted_starts[index])
+
+
+def find_active_regions(y, sr, block_length=512, threshold_db=SILENCE_THRESHOLD_DB,
+                        min_silence=MIN_SILENCE_SECONDS, padding=PADDING_SECONDS):
+    """
+    Finds the active regions of a signal from the RMS level of non-overlapping blocks.
+
+    Blocks within `threshold_db` of the loudest block are active. Each active stretch is widened by `padding`,
+    and only the silent gaps at least `min_silence` long remain cut. Region boundaries fall on block boundaries,
+    so they are multiples of `block_length` (pass the hop length to align them with the analysis frames).
+
+    Args:
+        y (np.ndarray): The mono signal.
+        sr (int): The sample rate.
+        block_length (int): The block length in samples.
+        threshold_db (float): The level below the loudest block at which a block counts as silent.
+        min_silence (float): The shortest gap cut, in seconds.
+        padding (float): The audio kept around each active stretch, in seconds.
+
+    Returns:
+        ActiveRegions: The active regions; a signal without any sound has none.
+    """
+    n_samples = len(y)
+    n_full, tail = divmod(n_samples, block_length)
+    n_blocks = n_full + (tail > 0)
+    # Sums of squares straight from views of the signal, without a padded or squared copy of it
+    blocks = y[:n_full * block_length].reshape(n_full, block_length)
+    power = np.empty(n_blocks, dtype=np.float64)
+    power[:n_full] = np.einsum('ij,ij->i', blocks, blocks, dtype=np.float64)
+    if tail:
+        # The last block is partial; it is averaged as if zero-padded to a whole block
+        last = y[n_full * block_length:]
+        power[n_full] = np.dot(last, last)
+    power /= block_length
+    loudest = power.max() if n_blocks else 0.0
+    if loudest <= 0:
+        return ActiveRegions(np.zeros((0, 2)), sr, n_samples)
+    active = power >= loudest * 10.0 ** (threshold_db / 10.0)
+
+    # Pad the active stretches, then fill the gaps too short to cut
+    pad_blocks = int(np.ceil(padding * sr / block_length))
+    gap_blocks = int(np.ceil(min_silence * sr / block_length))
+    active_blocks = np.flatnonzero(active)
+    edges = np.flatnonzero(np.diff(active_blocks) > 1)
+    starts = np.concatenate(([active_blocks[0]], active_blocks[edges + 1])) - pad_blocks
+    stops = np.concatenate((active_blocks[edges], [active_blocks[-1]])) + 1 + pad_blocks
+    # A stretch opens a new region only after a gap long enough to cut; a region ends where its last stretch does
+    opens = np.flatnonzero(np.concatenate(([True], starts[1:] - stops[:-1] >= gap_blocks)))
+    closes = np.append(opens[1:] - 1, len(stops) - 1)
+    starts, stops = np.maximum(starts[opens], 0), np.minimum(stops[closes], n_blocks)
+    regions = np.stack([starts * block_length, np.minimum(stops * block_length, n_samples)], axis=1)
+    return ActiveRegions(regions, sr, n_samples)
@@ -0,0 +1,177 @@
+"""
+Module: Spectral Analysis Context
+Location: src/infrastructure/analysis_context.py
+Defines a per-signal context that lazily computes and memoizes the spectral representations shared by
+beat tracking, onset detection, pitch tracking and chroma extraction.
+"""
+
+from functools import cached_property
+
+import numpy as np
+import librosa
+from src.infrastructure.active_regions import ActiveRegions, find_active_regions
+from src.infrastructure.pitch_contour import PitchContour, extract_pitch_contour
+from src.use_cases.instrumentation import measure, span
+
+
+class AnalysisContext:
+    """
+    Holds a decoded signal and memoizes its spectral representations, so each is computed at most once.
+
+    The STFT magnitude feeds the mel spectrogram, the onset envelopes and the pitch contour, while the CQT feeds
+    the chroma, so a full feature extraction costs one STFT and one CQT.
+
+    When the signal was compacted to its active regions (see `over_active_regions`), frames index the compacted
+    signal but every time the context reports is on the original timeline, and beats are tracked on the
+    original frame grid.
+
+    Attributes:
+        y (np.ndarray): The decoded mono signal.
+        sr (int): The sample rate of the signal.
+        n_fft (int): The FFT size used for the STFT.
+        hop_length (int): The hop length shared by every frame-based representation.
+        regions (ActiveRegions): The active regions `y` was compacted from, or None for a whole signal.
+    """
+
+    # chroma_cqt defaults: 7 octaves at 3 bins per semitone
+    CQT_BINS_PER_OCTAVE = 36
+    CQT_OCTAVES = 7
+
+    def __init__(self, y, sr, n_fft=2048, hop_length=512, regions: ActiveRegions = None):
+        self.y = y
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.regions = regions
+
+    @classmethod
+    def over_active_regions(cls, y, sr, n_fft=2048, hop_length=512):
+        """
+        Builds a context over the active regions of a signal only, skipping silence before the expensive
+        stages run. The seconds of audio kept and skipped are reported as the "active_audio_seconds" and
+        "skipped_audio_seconds" measurements.
+
+        Args:
+            y (np.ndarray): The decoded mono signal.
+            sr (int): The sample rate of the signal.
+            n_fft (int): The FFT size used for the STFT.
+            hop_length (int): The hop length; region boundaries are aligned to it.
+
+        Returns:
+            AnalysisContext: A context over the compacted signal, or over the whole signal when it has no
+                silence to skip (or no sound at all).
+        """
+        with span('active_regions'):
+            regions = find_active_regions(y, sr, block_length=hop_length)
+        measure('active_audio_seconds', regions.active_seconds if regions.n_active_samples else len(y) / sr)
+        measure('skipped_audio_seconds', regions.skipped_seconds if regions.n_active_samples else 0.0)
+        if regions.covers_all() or not regions.n_active_samples:
+            return cls(y, sr, n_fft=n_fft, hop_length=hop_length)
+        return cls(regions.compact(y), sr, n_fft=n_fft, hop_length=hop_length, regions=regions)
+
+    @cached_property
+    def stft_magnitude(self):
+        """
+        np.ndarray: The STFT magnitude spectrogram.
+        """
+        return np.abs(librosa.stft(self.y, n_fft=self.n_fft, hop_length=self.hop_length))
+
+    @cached_property
+    def log_mel_spectrogram(self):
+        """
+        np.ndarray: The log-power mel spectrogram derived from the STFT magnitude.
+        """
+        mel = librosa.feature.melspectrogram(S=self.stft_magnitude ** 2, sr=self.sr, n_fft=self.n_fft)
+        return librosa.power_to_db(mel, ref=np.max)
+
+    @cached_property
+    def onset_envelope(self):
+        """
+        np.ndarray: The onset strength envelope used for onset detection (mean aggregation).
+        """
+        return librosa.onset.onset_strength(S=self.log_mel_spectrogram, sr=self.sr, hop_length=self.hop_length)
+
+    @cached_property
+    def beat_onset_envelope(self):
+        """
+        np.ndarray: The onset strength envelope used for beat tracking (median aggregation).
+        """
+        return librosa.onset.onset_strength(S=self.log_mel_spectrogram, sr=self.sr, hop_length=self.hop_length,
+                                            aggregate=np.median)
+
+    @cached_property
+    def rms(self):
+        """
+        np.ndarray: The per-frame RMS energy derived from the STFT magnitude.
+        """
+        return librosa.feature.rms(S=self.stft_magnitude, frame_length=self.n_fft)[0]
+
+    @cached_property
+    def pitch_contour(self):
+        """
+        PitchContour: The per-frame dominant pitch, extracted block-wise from the STFT magnitude.
+        """
+        contour = extract_pitch_contour(self.stft_magnitude, self.sr, n_fft=self.n_fft, hop_length=self.hop_length)
+        if self.regions is None:
+            return contour
+        times = self.regions.to_original_time(contour.times).astype(np.float32)
+        return PitchContour(contour.frequencies, contour.voiced, times)
+
+    @cached_property
+    def cqt_magnitude(self):
+        """
+        np.ndarray: The constant-Q transform magnitude.
+        """
+        return np.abs(librosa.cqt(self.y, sr=self.sr, hop_length=self.hop_length,
+                                  n_bins=self.CQT_OCTAVES * self.CQT_BINS_PER_OCTAVE,
+                                  bins_per_octave=self.CQT_BINS_PER_OCTAVE))
+
+    @cached_property
+    def chroma(self):
+        """
+        np.ndarray: The CQT chromagram (12 x frames).
+        """
+        return librosa.feature.chroma_cqt(C=self.cqt_magnitude, sr=self.sr, hop_length=self.hop_length,
+                                          bins_per_octave=self.CQT_BINS_PER_OCTAVE)
+
+    def beats(self):
+        """
+        Tracks beats from the memoized onset envelope.
+
+        Returns:
+            tuple: The estimated tempo (float) and the beat frame indices (np.ndarray).
+        """
+        return librosa.beat.beat_track(onset_envelope=self.beat_onset_envelope, sr=self.sr,
+                                       hop_length=self.hop_length)
+
+    def beat_times(self):
+        """
+        Tracks beats and returns their times. Over active regions, the onset envelope is placed back on the
+        original frame grid (silent in the skipped gaps) before tracking, so the beat grid runs on through gaps
+        exactly as it does over the whole signal; only the cheap tracking step sees the full length.
+
+        Returns:
+            tuple: The estimated tempo (float) and the beat times in seconds on the original timeline.
+        """
+        if self.regions is None:
+            tempo, beat_frames = self.beats()
+            return tempo, self.frames_to_time(beat_frames)
+        envelope = self.regions.expand_frames(self.beat_onset_envelope, self.hop_length)
+        tempo, beat_frames = librosa.beat.beat_track(onset_envelope=envelope, sr=self.sr, hop_length=self.hop_length)
+        return tempo, librosa.frames_to_time(beat_frames, sr=self.sr, hop_length=self.hop_length)
+
+    def onsets(self):
+        """
+        Detects note onsets from the memoized onset envelope.
+
+        Returns:
+            np.ndarray: The onset frame indices.
+        """
+        return librosa.onset.onset_detect(onset_envelope=self.onset_envelope, sr=self.sr, hop_length=self.hop_length)
+
+    def frames_to_time(self, frames):
+        """
+        Converts frame indices of this context into times in seconds, on the original timeline.
+        """
+        times = librosa.frames_to_time(frames, sr=self.sr, hop_length=self.hop_length)
+        return times if self.regions is None else self.regions.to_original_time(times)
@@ -0,0 +1,106 @@
+"""
+Module: Decoded Audio Cache
+Location: src/infrastructure/audio_cache.py
+Implements a byte-budgeted LRU cache of decoded audio signals, so a file is decoded once per request
+instead of once per service. Backed by a SharedPCMCache, the decoded signals are also shared across processes.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import librosa
+
+
+class DecodedAudioCache:
+    """
+    Caches decoded audio signals keyed by path, modification time, target sample rate, resampler and channel
+    layout.
+
+    Entries are evicted in least-recently-used order once the total size of the cached arrays exceeds
+    the byte budget. A signal larger than the whole budget is returned but never cached.
+
+    With a shared cache, misses are served from (or decoded into) its memory-mapped entries, so the cached
+    signals are read-only views of pages shared with other processes rather than private copies.
+
+    Attributes:
+        max_bytes (int): The maximum number of bytes held by the cached signals.
+        current_bytes (int): The number of bytes currently held by the cached signals.
+        shared (SharedPCMCache): The cross-process cache backing this one (optional).
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024, shared=None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, file_path, sample_rate=None, mono=True, res_type='soxr_hq'):
+        """
+        Returns the decoded signal for the audio file, decoding it only on a cache miss.
+
+        Args:
+            file_path (str): Path to the audio file.
+            sample_rate (int): The target sample rate, or None to keep the native rate.
+            mono (bool): Whether to downmix the signal to mono.
+            res_type (str): The librosa resampler used when the target rate differs from the native rate.
+
+        Returns:
+            tuple: The decoded signal (np.ndarray) and its sample rate (int).
+        """
+        key = self._make_key(file_path, sample_rate, mono, res_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if self.shared is not None:
+            y, sr = self.shared.load(file_path, sample_rate, mono=mono, res_type=res_type)
+        else:
+            y, sr = librosa.load(file_path, sr=sample_rate, mono=mono, res_type=res_type)
+        self._store(key, (y, sr))
+        return y, sr
+
+    def clear(self):
+        """
+        Drops every cached signal.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getstate__(self):
+        # Cached signals and the lock are process-local; a pickled cache starts empty but keeps its shared cache.
+        return {'max_bytes': self.max_bytes, 'shared': self.shared}
+
+    def __setstate__(self, state):
+        self.__init__(state['max_bytes'], state.get('shared'))
+
+    def _make_key(self, file_path, sample_rate, mono, res_type):
+        """
+        Builds the cache key, so a file rewritten in place is decoded again.
+        """
+        path = os.path.abspath(file_path)
+        return path, os.stat(path).st_mtime_ns, sample_rate, bool(mono), res_type
+
+    def _store(self, key, entry):
+        """
+        Inserts an entry and evicts the least recently used ones until the byte budget is respected.
+        """
+        size = entry[0].nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[0].nbytes
+            self._entries[key] = entry
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
@@ -0,0 +1,73 @@
+"""
+Module: Audio Metadata Probe
+Location: src/infrastructure/audio_probe.py
+Reads the true format, channel count, native sample rate and duration of an audio file from its header,
+without decoding it, and optionally pins the sample rate the analysis runs at.
+"""
+
+import os
+
+import audioread
+import soundfile as sf
+from src.entities.audio_file import AudioFile
+
+
+class AudioProbe:
+    """
+    Builds AudioFile entities from the audio files themselves instead of request-supplied metadata.
+
+    Attributes:
+        analysis_rate: None to leave the analysis rate to the performance profile, "native" to analyze at the
+            file's own rate with no resampling, or a sample rate in Hz. A fixed rate is never above the native
+            rate, since upsampling adds cost and no information.
+    """
+
+    def __init__(self, analysis_rate=None):
+        self.analysis_rate = analysis_rate
+
+    def probe(self, file_path):
+        """
+        Reads the metadata of an audio file from its header.
+
+        libsndfile answers from the header for WAV, FLAC, OGG and (recent versions) MP3; other formats fall
+        back to audioread, which reads stream metadata without decoding the samples.
+
+        Args:
+            file_path (str): Path to the audio file.
+
+        Returns:
+            AudioFile: The audio file with its true format, channels, native rate, duration and analysis rate.
+        """
+        try:
+            info = sf.info(file_path)
+            audio_format, channels, sample_rate, duration = (info.format.lower(), info.channels, info.samplerate,
+                                                             info.frames / info.samplerate)
+        except (sf.LibsndfileError, RuntimeError):
+            with audioread.audio_open(file_path) as source:
+                channels, sample_rate, duration = source.channels, source.samplerate, source.duration
+            audio_format = os.path.splitext(file_path)[1].lstrip('.').lower()
+
+        return AudioFile(
+            file_path=file_path,
+            format=audio_format,
+            duration=duration,
+            sample_rate=sample_rate,
+            channels=channels,
+            analysis_sample_rate=self.choose_analysis_rate(sample_rate)
+        )
+
+    def choose_analysis_rate(self, native_rate):
+        """
+        Applies the analysis-rate policy to a file's native rate.
+
+        Args:
+            native_rate (int): The native sample rate of the file.
+
+        Returns:
+            int: The sample rate to decode the file at, or None to leave it to the performance profile.
+        """
+        if self.analysis_rate is None:
+            return None
+        if self.analysis_rate == 'native':
+            return native_rate
+        return min(int(self.analysis_rate), native_rate)
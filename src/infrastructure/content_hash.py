@@ -0,0 +1,26 @@
+"""
+Module: Audio Content Hashing
+Location: src/infrastructure/content_hash.py
+Computes content hashes of audio files, used to key persisted analysis results independently of file paths.
+"""
+
+import hashlib
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def content_hash(file_path):
+    """
+    Computes the SHA-256 digest of a file's bytes, reading it in fixed-size blocks.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,136 @@
+"""
+Module: Feature Stages
+Location: src/infrastructure/feature_stages.py
+Defines the memoized stage graph feature extractors build their outputs from, so that only the stages the
+requested features depend on run and the other outputs are deferred until first use. Deferred outputs do not
+keep the stage graph of the extraction alive, since it holds the signal and its spectrograms.
+"""
+
+from functools import cached_property, partial
+
+from src.infrastructure.pitch_contour import pitch_outputs
+from src.use_cases.instrumentation import span
+
+
+class FeatureStages:
+    """
+    The outputs of one feature extraction, derived from memoized stages.
+
+    Subclasses implement the backend-specific stages as memoized properties: `beats` (the tempo and the beat
+    times), `chroma_profile` and `pitch_contour` (None when pitch tracking is off). The key and the pitch
+    outputs are derived here, the same way for every backend.
+
+    Attributes:
+        key_finder (KrumhanslSchmucklerKeyFinder): Estimates the key from the chroma profile.
+        pitch_options (dict): The pitch "mode", "resolution" and "pooling" (see `pitch_outputs`).
+    """
+
+    # The extractor outputs, in the order their stages run when everything is requested
+    OUTPUTS = ("tempo", "rhythm", "chroma_profile", "key", "pitch_contour", "pitch", "pitch_track")
+
+    # The outputs each requestable feature needs
+    FEATURE_OUTPUTS = {
+        "tempo": ("tempo",),
+        "rhythm": ("rhythm",),
+        "key": ("chroma_profile", "key"),
+        "pitch": ("pitch_contour", "pitch", "pitch_track")
+    }
+
+    # The memoized stages whose results are small enough to hand over to the deferred outputs
+    RESULT_STAGES = ("beats", "chroma_profile", "key", "pitch_contour", "pitch_summary")
+
+    def __init__(self, key_finder, pitch_options):
+        self.key_finder = key_finder
+        self.pitch_options = pitch_options
+
+    def outputs(self, features, rebuild):
+        """
+        Runs the stages of the requested features and defers the others.
+
+        The deferred outputs hold `rebuild` and the small stage results computed so far rather than this stage
+        graph, so the graph's signal and spectrograms are released with the extraction. Using a deferred output
+        rebuilds a graph, seeded with those results, to compute the deferred outputs of its feature, and drops
+        it again.
+
+        Args:
+            features (iterable): The features whose outputs are computed right away.
+            rebuild (callable): A zero-argument callable building a new stage graph over the same audio and
+                options, e.g. by decoding the file again.
+
+        Returns:
+            dict: The requested outputs by name, and a zero-argument callable for every other output.
+        """
+        requested = {output for feature in features for output in self.FEATURE_OUTPUTS[feature]}
+        results = {output: getattr(self, output) for output in self.OUTPUTS if output in requested}
+        deferred = {output: feature_outputs for feature_outputs in self.FEATURE_OUTPUTS.values()
+                    for output in feature_outputs if output not in requested}
+        if deferred:
+            stages = _DeferredStages(rebuild, self.stage_results(), deferred)
+            results.update({output: partial(stages.output, output) for output in deferred})
+        return {output: results[output] for output in self.OUTPUTS}
+
+    def stage_results(self):
+        """
+        Returns the results of the RESULT_STAGES that have run.
+        """
+        return {name: self.__dict__[name] for name in self.RESULT_STAGES if name in self.__dict__}
+
+    @property
+    def tempo(self):
+        return self.beats[0]
+
+    @property
+    def rhythm(self):
+        return self.beats[1]
+
+    @cached_property
+    def key(self):
+        # Use K-S algorithm to estimate key from the average chroma profile
+        chroma_profile = self.chroma_profile
+        with span('key'):
+            return self.key_finder.estimate_key_from_profile(chroma_profile)
+
+    @cached_property
+    def pitch_summary(self):
+        contour = self.pitch_contour
+        # Only the per-beat pitch track depends on beat tracking
+        beat_times = self.rhythm if tracks_pitch_per_beat(self.pitch_options) else None
+        with span('pitch_track'):
+            return pitch_outputs(contour, beat_times, **self.pitch_options)
+
+    @property
+    def pitch(self):
+        return self.pitch_summary["pitch"]
+
+    @property
+    def pitch_track(self):
+        return self.pitch_summary.get("pitch_track")
+
+
+class _DeferredStages:
+    """
+    The deferred outputs of one extraction, computed feature by feature on first use.
+    """
+
+    def __init__(self, rebuild, stage_results, feature_outputs):
+        self._rebuild = rebuild
+        self._stage_results = stage_results
+        self._feature_outputs = feature_outputs
+        self._values = {}
+
+    def output(self, name):
+        if name not in self._values:
+            stages = self._rebuild()
+            # Memoized stages are instance attributes, so the results computed earlier are not run again
+            stages.__dict__.update(self._stage_results)
+            for output in self._feature_outputs[name]:
+                self._values[output] = getattr(stages, output)
+            self._stage_results = stages.stage_results()
+        return self._values[name]
+
+
+def tracks_pitch_per_beat(pitch_options):
+    """
+    Returns whether the requested pitch output is a per-beat pitch track, the only one that needs beats.
+    """
+    return pitch_options["mode"] == 'contour' and pitch_options["resolution"] == 'beat'
@@ -0,0 +1,241 @@
+"""
+Module: Persistent Feature Store
+Location: src/infrastructure/feature_store.py
+Implements an on-disk store of extracted musical features (SQLite index plus .npz array blobs) keyed by audio
+content hash, extractor version and extraction parameters, and a feature extractor decorator that serves
+repeat requests from it.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from src.entities.audio_file import AudioFile
+from src.entities.musical_feature import MusicalFeature
+from src.infrastructure.content_hash import content_hash
+from src.infrastructure.pitch_contour import PitchContour, pitch_outputs
+from src.use_cases.instrumentation import span
+
+
+class FeatureStore:
+    """
+    Persists extracted features so they can be reloaded without touching the audio.
+
+    Scalar features live in an SQLite table; the chroma profile, beat times and pitch contour are written as
+    one .npz blob per entry. File hashes are memoized by path, size and modification time, so a repeat lookup
+    does not re-read the audio file either.
+
+    Attributes:
+        root_dir (str): The directory holding the index database and the blobs.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self._blob_dir = os.path.join(root_dir, 'blobs')
+        self._db_path = os.path.join(root_dir, 'features.sqlite')
+        os.makedirs(self._blob_dir, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS features ("
+                " entry_key TEXT PRIMARY KEY, content_hash TEXT NOT NULL, extractor_version TEXT NOT NULL,"
+                " params TEXT NOT NULL, tempo REAL, key_name TEXT, blob_name TEXT NOT NULL, created_at REAL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS file_hashes ("
+                " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, content_hash TEXT NOT NULL)"
+            )
+
+    def hash_file(self, file_path):
+        """
+        Returns the content hash of a file, reusing the memoized hash while the file is unchanged.
+
+        Args:
+            file_path (str): Path to the audio file.
+
+        Returns:
+            str: The hexadecimal content hash.
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT content_hash FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        if row is not None:
+            return row[0]
+
+        digest = content_hash(path)
+        with self._connect() as connection:
+            connection.execute("INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+                               (path, stat.st_size, stat.st_mtime_ns, digest))
+        return digest
+
+    def get(self, digest, extractor_version, params):
+        """
+        Loads stored features.
+
+        Args:
+            digest (str): The content hash of the audio.
+            extractor_version (str): The version of the extractor that produced the features.
+            params (dict): The extraction parameters (e.g. genre and sample rate).
+
+        Returns:
+            dict: The stored features in the extractor's output format, or None if absent.
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT tempo, key_name, blob_name FROM features WHERE entry_key = ?",
+                                     (self._entry_key(digest, extractor_version, params),)).fetchone()
+        if row is None:
+            return None
+        tempo, key, blob_name = row
+
+        blob_path = os.path.join(self._blob_dir, blob_name)
+        if not os.path.exists(blob_path):
+            return None
+        with np.load(blob_path, allow_pickle=False) as blob:
+            beat_times = blob['beat_times']
+            chroma_profile = blob['chroma_profile']
+            # Entries extracted with pitch tracking off hold no contour
+            contour = None
+            if 'pitch_frequencies' in blob.files:
+                contour = PitchContour(blob['pitch_frequencies'], blob['pitch_voiced'], blob['pitch_times'])
+
+        return {
+            "tempo": tempo,
+            "key": key,
+            **pitch_outputs(contour, beat_times),
+            "rhythm": beat_times,
+            "chroma_profile": chroma_profile,
+            "pitch_contour": contour
+        }
+
+    def put(self, digest, extractor_version, params, features):
+        """
+        Stores extracted features, replacing any previous entry with the same key.
+
+        Args:
+            digest (str): The content hash of the audio.
+            extractor_version (str): The version of the extractor that produced the features.
+            params (dict): The extraction parameters (e.g. genre and sample rate).
+            features (dict): The extractor output, including "chroma_profile" and "pitch_contour" (None when
+                pitch tracking was skipped).
+        """
+        entry_key = self._entry_key(digest, extractor_version, params)
+        blob_name = f"{entry_key}.npz"
+        contour = features["pitch_contour"]
+        arrays = {}
+        if contour is not None:
+            arrays = {'pitch_frequencies': contour.frequencies, 'pitch_voiced': contour.voiced,
+                      'pitch_times': contour.times}
+
+        # Write the blob under a temporary name first, so readers never see a partial file
+        temporary_path = os.path.join(self._blob_dir, f"{blob_name}.{os.getpid()}.tmp")
+        with open(temporary_path, 'wb') as f:
+            np.savez(f,
+                     beat_times=np.asarray(features["rhythm"], dtype=np.float64),
+                     chroma_profile=np.asarray(features["chroma_profile"], dtype=np.float32),
+                     **arrays)
+        os.replace(temporary_path, os.path.join(self._blob_dir, blob_name))
+
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (entry_key, digest, extractor_version, self._canonical_params(params),
+                 float(np.atleast_1d(features["tempo"])[0]), features["key"], blob_name, time.time())
+            )
+
+    def load_musical_feature(self, digest, extractor_version, params):
+        """
+        Reconstructs a MusicalFeature from the store without touching the audio.
+
+        Returns:
+            MusicalFeature: The stored features, or None if absent.
+        """
+        features = self.get(digest, extractor_version, params)
+        if features is None:
+            return None
+        return MusicalFeature(tempo=features["tempo"], key=features["key"], pitch=features["pitch"],
+                              rhythm=features["rhythm"])
+
+    @contextmanager
+    def _connect(self):
+        """
+        Opens a short-lived connection that commits on success and is always closed, so the store can be
+        shared across threads and processes.
+        """
+        connection = sqlite3.connect(self._db_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _canonical_params(self, params):
+        return json.dumps(params, sort_keys=True, separators=(',', ':'))
+
+    def _entry_key(self, digest, extractor_version, params):
+        """
+        Builds the entry key from everything that influences the stored features.
+        """
+        parts = f"{digest}|{extractor_version}|{self._canonical_params(params)}"
+        return hashlib.sha256(parts.encode('utf-8')).hexdigest()
+
+
+class StoredFeatureExtractor:
+    """
+    Wraps a feature extractor and serves repeat requests from a FeatureStore.
+
+    The wrapped extractor must expose `VERSION` and `cache_params(audio_file, pitch_mode)`, which together with
+    the audio content hash identify a stored entry. The pitch track of a hit is pooled from the stored contour
+    at the requested resolution, so one entry serves every resolution. A miss extracts and stores every
+    feature, even for a request of a subset, so that any later request is served from the store.
+
+    Attributes:
+        feature_extractor: The wrapped feature extractor.
+        feature_store (FeatureStore): The store holding previously extracted features.
+    """
+
+    def __init__(self, feature_extractor, feature_store: FeatureStore):
+        self.feature_extractor = feature_extractor
+        self.feature_store = feature_store
+
+    def extract(self, audio_file: AudioFile, features=None, pitch_mode='summary', pitch_resolution='raw',
+                pitch_pooling='median', **kwargs):
+        """
+        Returns the stored features of the audio file, extracting and storing them on a miss.
+
+        Args:
+            audio_file (AudioFile): The audio file to extract features from.
+            features (iterable): The requested features (all by default); a miss extracts all of them.
+            pitch_mode (str): "summary", "contour" or "off" (see the wrapped extractor).
+            pitch_resolution: The pitch track resolution in contour mode.
+            pitch_pooling (str): The pitch track pooling in contour mode.
+            **kwargs: Passed through to the wrapped extractor on a miss.
+
+        Returns:
+            dict: A dictionary containing tempo, key, pitch, and rhythm data.
+        """
+        with span('content_hash'):
+            digest = self.feature_store.hash_file(audio_file.file_path)
+        version = self.feature_extractor.VERSION
+        params = self.feature_extractor.cache_params(audio_file, pitch_mode=pitch_mode)
+        kwargs.update(pitch_mode=pitch_mode, pitch_resolution=pitch_resolution, pitch_pooling=pitch_pooling)
+
+        with span('feature_store_get'):
+            stored = self.feature_store.get(digest, version, params)
+        if stored is not None:
+            with span('pitch_track'):
+                stored.update(pitch_outputs(stored["pitch_contour"], stored["rhythm"], pitch_mode, pitch_resolution,
+                                            pitch_pooling))
+            return stored
+
+        # A partial extraction would leave the other features pending and the entry incomplete
+        extracted = self.feature_extractor.extract(audio_file, features=None, **kwargs)
+        with span('feature_store_put'):
+            self.feature_store.put(digest, version, params, extracted)
+        return extracted
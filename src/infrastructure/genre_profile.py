@@ -6,6 +6,8 @@ Defines the base class and genre-specific classes for key-finding profiles.
 
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 class GenreProfile(ABC):
     """
@@ -31,6 +33,27 @@ class GenreProfile(ABC):
         """
         pass
 
+    def get_template_matrix(self):
+        """
+        Returns the 24 key templates (12 major rotations, then 12 minor rotations) as a 24x12 matrix whose
+        rows are mean-centered and scaled to unit norm, so that the Pearson correlation of a mean-centered,
+        unit-norm chroma profile with every key is a single matrix product. Computed once per profile.
+
+        Returns:
+            np.ndarray: The normalized template matrix (24 x 12).
+        """
+        template_matrix = getattr(self, '_template_matrix', None)
+        if template_matrix is None:
+            major = np.asarray(self.get_major_profile(), dtype=np.float64)
+            minor = np.asarray(self.get_minor_profile(), dtype=np.float64)
+            # Row k of the circulant holds the template rotated to key k, like np.roll(template, k)
+            shifts = (np.arange(12)[np.newaxis, :] - np.arange(12)[:, np.newaxis]) % 12
+            template_matrix = np.vstack([major[shifts], minor[shifts]])
+            template_matrix -= template_matrix.mean(axis=1, keepdims=True)
+            template_matrix /= np.linalg.norm(template_matrix, axis=1, keepdims=True)
+            self._template_matrix = template_matrix
+        return template_matrix
+
 
 class GeneralProfile(GenreProfile):
     """
@@ -93,4 +116,26 @@ class PopProfile(GenreProfile):
         return self.major_profile
 
     def get_minor_profile(self):
-        return self.minor_profile
\ No newline at end of file
+        return self.minor_profile
+
+
+# Registry of the available genre profiles, by the genre names accepted across the service
+GENRE_PROFILES = {
+    'general': GeneralProfile,
+    'classical': ClassicalProfile,
+    'jazz': JazzProfile,
+    'pop': PopProfile,
+}
+
+
+def get_genre_profile(genre):
+    """
+    Returns the profile registered for a genre, defaulting to the general profile for unknown genres.
+
+    Args:
+        genre (str): The genre name.
+
+    Returns:
+        GenreProfile: An instance of the genre's profile.
+    """
+    return GENRE_PROFILES.get(genre, GeneralProfile)()
@@ -6,7 +6,16 @@ Implements the Krumhansl-Schmuckler key-finding algorithm with genre-specific pr
 
 import numpy as np
 import librosa
-from src.infrastructure.genre_profile import GeneralProfile, ClassicalProfile, JazzProfile, PopProfile
+from src.infrastructure.analysis_context import AnalysisContext
+from src.infrastructure.genre_profile import GENRE_PROFILES, get_genre_profile
+from src.infrastructure.streaming_analysis import analyze_stream
+
+# The pitch classes, indexed by key transposition
+PITCH_CLASSES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+
+# The 24 key names, 12 major keys followed by 12 minor keys
+KEY_NAMES = [f"{pitch_class} major" for pitch_class in PITCH_CLASSES] + \
+            [f"{pitch_class} minor" for pitch_class in PITCH_CLASSES]
 
 
 class KrumhanslSchmucklerKeyFinder:
@@ -18,36 +27,65 @@ class KrumhanslSchmucklerKeyFinder:
         """
         Initializes the Krumhansl-Schmuckler algorithm with the appropriate genre-specific profiles.
         """
-        if genre == 'classical':
-            self.genre_profile = ClassicalProfile()
-        elif genre == 'jazz':
-            self.genre_profile = JazzProfile()
-        elif genre == 'pop':
-            self.genre_profile = PopProfile()
-        else:
-            self.genre_profile = GeneralProfile()  # Default to general
+        self.genre_profile = get_genre_profile(genre)  # Unknown genres default to general
 
-    def estimate_key(self, audio_file_path, sample_rate=44100):
+    def estimate_key(self, audio_file_path=None, sample_rate=44100, y=None, context=None):
         """
         Estimates the musical key of the audio file using the Krumhansl-Schmuckler algorithm.
 
         Args:
-            audio_file_path (str): Path to the audio file.
-            sample_rate (int): The sample rate for the audio file.
+            audio_file_path (str): Path to the audio file. Ignored when a decoded signal is given.
+            sample_rate (int): The sample rate for the audio file, or of the decoded signal.
+            y (np.ndarray): An already-decoded mono signal, so the file is not read again.
+            context (AnalysisContext): A shared analysis context whose memoized chroma is reused.
 
         Returns:
             str: The estimated key as a string (e.g., "C major", "A minor").
         """
-        # Load the audio file and extract chroma features
-        y, sr = librosa.load(audio_file_path, sr=sample_rate)
-        chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
+        # Take the chroma from the shared context, or decode the audio file if needed and extract it
+        if context is None:
+            if y is None:
+                y, sample_rate = librosa.load(audio_file_path, sr=sample_rate)
+            context = AnalysisContext(y, sample_rate)
+        chroma = context.chroma
 
         # Compute the average chroma profile across the entire audio signal
         chroma_profile = np.mean(chroma, axis=1)
+        return self.estimate_key_from_profile(chroma_profile)
+
+    def estimate_key_streaming(self, audio_file_path, n_fft=2048, hop_length=512, block_length=256):
+        """
+        Estimates the musical key of the audio file block by block, without loading the whole file.
 
+        The chroma histogram is accumulated from STFT chroma over fixed-size blocks at the file's native
+        sample rate, so peak memory does not depend on the length of the track.
+
+        Args:
+            audio_file_path (str): Path to the audio file.
+            n_fft (int): The FFT size.
+            hop_length (int): The hop length between frames.
+            block_length (int): The number of frames per decoded block.
+
+        Returns:
+            str: The estimated key as a string (e.g., "C major", "A minor").
+        """
+        analysis = analyze_stream(audio_file_path, n_fft=n_fft, hop_length=hop_length, block_length=block_length,
+                                  onsets=False, pitch=False)
+        return self.estimate_key_from_profile(analysis.chroma_mean())
+
+    def estimate_key_from_profile(self, chroma_profile):
+        """
+        Estimates the musical key from an average chroma profile.
+
+        Args:
+            chroma_profile (np.ndarray): The average chroma profile (12,).
+
+        Returns:
+            str: The estimated key as a string (e.g., "C major", "A minor").
+        """
         # Correlate with major and minor profiles for all 12 keys
-        major_correlations = self._correlate_profiles(chroma_profile, self.genre_profile.get_major_profile())
-        minor_correlations = self._correlate_profiles(chroma_profile, self.genre_profile.get_minor_profile())
+        correlations = self.correlate_batch(chroma_profile)[0]
+        major_correlations, minor_correlations = correlations[:12], correlations[12:]
 
         # Find the key with the highest correlation
         major_key_index = np.argmax(major_correlations)
@@ -56,29 +94,217 @@ class KrumhanslSchmucklerKeyFinder:
         major_key_strength = major_correlations[major_key_index]
         minor_key_strength = minor_correlations[minor_key_index]
 
-        # Define the keys in terms of pitch classes
-        keys = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-
         # Choose between major and minor based on the highest correlation
         if major_key_strength > minor_key_strength:
-            return f"{keys[major_key_index]} major"
+            return f"{PITCH_CLASSES[major_key_index]} major"
+        else:
+            return f"{PITCH_CLASSES[minor_key_index]} minor"
+
+    def estimate_keys_batch(self, chroma_profiles):
+        """
+        Estimates the musical key of many stored chroma profiles at once.
+
+        Args:
+            chroma_profiles (np.ndarray): The average chroma profiles (N x 12).
+
+        Returns:
+            list: The estimated key of each profile (e.g., "C major", "A minor").
+        """
+        correlations = self.correlate_batch(chroma_profiles)
+        # Ties go to the minor key, as in estimate_key_from_profile
+        best_major = correlations[:, :12].argmax(axis=1)
+        best_minor = correlations[:, 12:].argmax(axis=1) + 12
+        rows = np.arange(len(correlations))
+        best = np.where(correlations[rows, best_major] > correlations[rows, best_minor], best_major, best_minor)
+        return [KEY_NAMES[i] for i in best]
+
+    def correlate_batch(self, chroma_profiles):
+        """
+        Correlates a batch of chroma profiles with the genre's 24 key templates in a single matrix product.
+
+        Args:
+            chroma_profiles (np.ndarray): One chroma profile (12,) or a batch of them (N x 12).
+
+        Returns:
+            np.ndarray: The Pearson correlation with each key (N x 24), major keys first. Profiles with no
+                variance correlate 0 with every key.
+        """
+        return _normalize_profiles(chroma_profiles) @ self.genre_profile.get_template_matrix().T
+
+    def estimate_key_timeline(self, audio_file_path=None, sample_rate=44100, y=None, context=None,
+                              window_seconds=8.0, hop_seconds=2.0, smoothing=False, transition_penalty=0.2):
+        """
+        Estimates the local key over time, for pieces that modulate.
+
+        Args:
+            audio_file_path (str): Path to the audio file. Ignored when a decoded signal is given.
+            sample_rate (int): The sample rate for the audio file, or of the decoded signal.
+            y (np.ndarray): An already-decoded mono signal, so the file is not read again.
+            context (AnalysisContext): A shared analysis context whose memoized chroma is reused.
+            window_seconds (float): The length of each analysis window.
+            hop_seconds (float): The distance between consecutive windows.
+            smoothing (bool): Whether to smooth the key sequence with a Viterbi pass.
+            transition_penalty (float): The correlation a key change must gain to be taken when smoothing.
+
+        Returns:
+            list: Segments of constant key, as dicts with "start" and "end" times in seconds and the "key".
+        """
+        if context is None:
+            if y is None:
+                y, sample_rate = librosa.load(audio_file_path, sr=sample_rate)
+            context = AnalysisContext(y, sample_rate)
+        frame_rate = context.sr / context.hop_length
+        return self.key_timeline_from_chroma(context.chroma, frame_rate, window_seconds=window_seconds,
+                                             hop_seconds=hop_seconds, smoothing=smoothing,
+                                             transition_penalty=transition_penalty)
+
+    def key_timeline_from_chroma(self, chroma, frame_rate, window_seconds=8.0, hop_seconds=2.0, smoothing=False,
+                                 transition_penalty=0.2):
+        """
+        Estimates the local key of sliding windows over a chromagram.
+
+        Window sums are differences of one cumulative chroma sum, so each window costs O(1) regardless of its
+        length, and all windows are correlated with the key templates in one matrix product. The optional
+        Viterbi pass is linear in the number of windows, so the whole timeline is linear in track length.
+
+        Args:
+            chroma (np.ndarray): The chromagram (12 x frames).
+            frame_rate (float): The number of chroma frames per second.
+            window_seconds (float): The length of each analysis window.
+            hop_seconds (float): The distance between consecutive windows.
+            smoothing (bool): Whether to smooth the key sequence with a Viterbi pass.
+            transition_penalty (float): The correlation a key change must gain to be taken when smoothing.
+
+        Returns:
+            list: Segments of constant key, as dicts with "start" and "end" times in seconds and the "key".
+        """
+        n_frames = chroma.shape[1]
+        if n_frames == 0:
+            return []
+        window_frames = min(max(int(round(window_seconds * frame_rate)), 1), n_frames)
+        hop_frames = max(int(round(hop_seconds * frame_rate)), 1)
+
+        cumulative = np.zeros((n_frames + 1, 12))
+        np.cumsum(chroma.T, axis=0, out=cumulative[1:])
+        starts = np.arange(0, n_frames - window_frames + 1, hop_frames)
+        window_sums = cumulative[starts + window_frames] - cumulative[starts]
+
+        # Correlation is scale-invariant, so window sums need not be turned into means
+        scores = self.correlate_batch(window_sums)
+        if smoothing:
+            key_indices = _viterbi_key_path(scores, transition_penalty)
         else:
-            return f"{keys[minor_key_index]} minor"
+            key_indices = scores.argmax(axis=1)
+
+        # Merge consecutive windows of the same key; each window owns the span up to the next window's start
+        segments = []
+        for i, (start, key_index) in enumerate(zip(starts, key_indices)):
+            end = starts[i + 1] if i + 1 < len(starts) else n_frames
+            if segments and segments[-1]["key"] == KEY_NAMES[key_index]:
+                segments[-1]["end"] = float(end / frame_rate)
+            else:
+                segments.append({"start": float(start / frame_rate), "end": float(end / frame_rate),
+                                 "key": KEY_NAMES[key_index]})
+        return segments
+
+    def rank_keys_all_genres(self, audio_file_path=None, sample_rate=44100, y=None, context=None):
+        """
+        Ranks all 24 keys under every registered genre profile from a single chroma pass.
+
+        Args:
+            audio_file_path (str): Path to the audio file. Ignored when a decoded signal is given.
+            sample_rate (int): The sample rate for the audio file, or of the decoded signal.
+            y (np.ndarray): An already-decoded mono signal, so the file is not read again.
+            context (AnalysisContext): A shared analysis context whose memoized chroma is reused.
 
-    def _correlate_profiles(self, chroma_profile, template_profile):
+        Returns:
+            dict: For each genre, a list of (key, correlation) pairs sorted from the best to the worst match.
         """
-        Correlates the given chroma profile with the template profile for all 12 key transpositions.
+        if context is None:
+            if y is None:
+                y, sample_rate = librosa.load(audio_file_path, sr=sample_rate)
+            context = AnalysisContext(y, sample_rate)
+        return self.rank_keys_all_genres_from_profile(np.mean(context.chroma, axis=1))
+
+    @classmethod
+    def rank_keys_all_genres_from_profile(cls, chroma_profile):
+        """
+        Ranks all 24 keys under every registered genre profile, scoring the chroma profile against the
+        stacked templates of all genres in a single matrix product.
 
         Args:
-            chroma_profile (np.ndarray): The chroma profile of the audio signal.
-            template_profile (list): The tonal template profile (either major or minor).
+            chroma_profile (np.ndarray): The average chroma profile (12,).
+
+        Returns:
+            dict: For each genre, a list of (key, correlation) pairs sorted from the best to the worst match.
+        """
+        genres, templates = cls._all_genre_templates()
+        scores = templates @ _normalize_profiles(chroma_profile)[0]  # (genres, 24)
+
+        ranking = {}
+        for genre, genre_scores in zip(genres, scores):
+            order = np.argsort(genre_scores)[::-1]
+            ranking[genre] = [(KEY_NAMES[i], float(genre_scores[i])) for i in order]
+        return ranking
+
+    @classmethod
+    def _all_genre_templates(cls):
+        """
+        Stacks, once per process, the normalized key templates of every registered genre profile.
 
         Returns:
-            np.ndarray: An array of correlation values for each key (0-11).
-        """
-        correlations = []
-        for i in range(12):
-            rotated_profile = np.roll(template_profile, i)  # Rotate template for all 12 keys
-            correlation = np.corrcoef(chroma_profile, rotated_profile)[0, 1]  # Compute Pearson correlation
-            correlations.append(correlation)
-        return np.array(correlations)
\ No newline at end of file
+            tuple: The genre names (list) and their templates (np.ndarray of shape genres x 24 x 12).
+        """
+        cached = getattr(cls, '_all_genre_templates_cache', None)
+        if cached is not None and cached[0] == list(GENRE_PROFILES):
+            return cached
+
+        templates = np.stack([profile_class().get_template_matrix() for profile_class in GENRE_PROFILES.values()])
+        cls._all_genre_templates_cache = (list(GENRE_PROFILES), templates)
+        return cls._all_genre_templates_cache
+
+
+def _normalize_profiles(chroma_profiles):
+    """
+    Mean-centers chroma profiles and scales them to unit norm, so their dot product with a normalized template
+    is the Pearson correlation.
+
+    Args:
+        chroma_profiles (np.ndarray): One chroma profile (12,) or a batch of them (N x 12).
+
+    Returns:
+        np.ndarray: The normalized profiles (N x 12).
+    """
+    profiles = np.atleast_2d(np.asarray(chroma_profiles, dtype=np.float64))
+    centered = profiles - profiles.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    return np.divide(centered, norms, out=np.zeros_like(centered), where=norms > 0)
+
+
+def _viterbi_key_path(scores, transition_penalty):
+    """
+    Finds the key sequence maximizing the summed correlation minus a fixed penalty per key change.
+
+    Args:
+        scores (np.ndarray): The correlation of each window with each key (windows x 24).
+        transition_penalty (float): The cost of changing key between consecutive windows.
+
+    Returns:
+        np.ndarray: The key index of each window.
+    """
+    n_windows, n_keys = scores.shape
+    transition = np.full((n_keys, n_keys), -transition_penalty)
+    np.fill_diagonal(transition, 0.0)
+
+    backpointers = np.empty((n_windows, n_keys), dtype=np.intp)
+    total = scores[0].copy()
+    for t in range(1, n_windows):
+        candidates = total[:, np.newaxis] + transition  # (previous key, next key)
+        backpointers[t] = candidates.argmax(axis=0)
+        total = candidates[backpointers[t], np.arange(n_keys)] + scores[t]
+
+    path = np.empty(n_windows, dtype=np.intp)
+    path[-1] = total.argmax()
+    for t in range(n_windows - 1, 0, -1):
+        path[t - 1] = backpointers[t, path[t]]
+    return path
@@ -5,9 +5,17 @@ Implements the extraction of musical features using the Librosa library,
 with key estimation handled by the Krumhansl-Schmuckler algorithm.
 """
 
-import librosa
+from functools import cached_property, partial
+
+from src.infrastructure.analysis_context import AnalysisContext
+from src.infrastructure.audio_cache import DecodedAudioCache
 from src.infrastructure.ks_key_finder import KrumhanslSchmucklerKeyFinder
+from src.infrastructure.performance_profile import DEFAULT_PROFILE, get_performance_profile
+from src.infrastructure.feature_stages import FeatureStages, tracks_pitch_per_beat
+from src.infrastructure.streaming_analysis import analyze_stream
 from src.entities.audio_file import AudioFile  # Corrected Import
+from src.entities.musical_feature import FEATURE_NAMES
+from src.use_cases.instrumentation import span
 
 
 class LibrosaFeatureExtractor:
@@ -19,57 +27,210 @@ class LibrosaFeatureExtractor:
         extract: Extracts musical features from the given audio file.
     """
 
-    def __init__(self, genre='general'):
+    # Bump whenever a change alters the extracted features, so persisted results are recomputed
+    VERSION = "1"
+
+    def __init__(self, genre='general', audio_cache: DecodedAudioCache = None, streaming=False,
+                 profile=DEFAULT_PROFILE, skip_silence=False):
+        """
+        Args:
+            genre (str): The genre profile used for key estimation.
+            audio_cache (DecodedAudioCache): The decoded-audio cache shared with other services (optional).
+            streaming (bool): Whether to analyze files block by block with bounded memory, for long recordings.
+            profile: The default performance profile (name or PerformanceProfile); an audio file's own profile
+                takes precedence.
+            skip_silence (bool): Whether to analyze only the active regions of a decoded signal, cutting long
+                silences (see AnalysisContext.over_active_regions); beat times stay on the original timeline.
+                Does not apply to streaming mode or to a caller's analysis context.
+        """
+        self.genre = genre
         self.ks_key_finder = KrumhanslSchmucklerKeyFinder(genre)
+        self.audio_cache = audio_cache if audio_cache is not None else DecodedAudioCache()
+        self.streaming = streaming
+        self.profile = get_performance_profile(profile)
+        self.skip_silence = skip_silence
 
-    def extract(self, audio_file: AudioFile):
+    def extract(self, audio_file: AudioFile, y=None, context: AnalysisContext = None, features=None,
+                pitch_mode='summary', pitch_resolution='raw', pitch_pooling='median'):
         """
         Extracts musical features such as tempo, key, pitch, and rhythm from the audio file.
 
+        Only the stages the requested features depend on run (see `_ExtractionStages`); the other entries of
+        the result are zero-argument callables that run their stages on demand, reusing the small results that
+        already ran. They rebuild the analysis context from the caller's context or signal, or by decoding the
+        file again (from the audio cache while it holds the signal), so they do not keep the spectrograms of
+        this extraction alive.
+
         Args:
             audio_file (AudioFile): The audio file to extract features from.
+            y (np.ndarray): An already-decoded mono signal at the audio file's analysis rate (optional).
+            context (AnalysisContext): A shared analysis context for the signal (optional).
+            features (iterable): The features to compute right away, among FEATURE_NAMES (all by default).
+            pitch_mode (str): "summary" for the first voiced pitches, "contour" to also return the whole pitch
+                track, or "off" to skip pitch tracking entirely.
+            pitch_resolution: The pitch track resolution: "raw", "beat" or a bin width in milliseconds.
+            pitch_pooling (str): How the pitch track pools each bin: "median" or "mean".
 
         Returns:
-            dict: A dictionary containing tempo, key, pitch, and rhythm data.
+            dict: A dictionary containing tempo, key, pitch, and rhythm data, plus "pitch_track" in contour
+                mode.
         """
-        # Load the audio file using librosa
-        y, sr = librosa.load(audio_file.file_path, sr=audio_file.sample_rate)
+        profile = get_performance_profile(audio_file.profile or self.profile)
+        pitch_options = {"mode": pitch_mode, "resolution": pitch_resolution, "pooling": pitch_pooling}
+        features = FEATURE_NAMES if features is None else tuple(features)
+        if self.streaming and y is None and context is None:
+            stages = _StreamingStages(audio_file.file_path, profile, self.ks_key_finder, pitch_options, features)
+            deferred = tuple(feature for feature in FEATURE_NAMES if feature not in features)
+            rebuild = partial(_StreamingStages, audio_file.file_path, profile, self.ks_key_finder, pitch_options,
+                              deferred)
+            return stages.outputs(features, rebuild)
+
+        # Reuse the caller's analysis context, or build one over the (cached) decoded signal
+        if context is not None:
+            rebuild = partial(_ExtractionStages, context, self.ks_key_finder, pitch_options)
+        else:
+            rebuild = partial(self._stages_over_signal, audio_file, y, profile, pitch_options)
+        return rebuild().outputs(features, rebuild)
+
+    def _stages_over_signal(self, audio_file, y, profile, pitch_options):
+        """
+        Builds the extraction stages over a caller's signal, or over the file decoded through the audio cache.
+        """
+        sample_rate = profile.analysis_rate_for(audio_file)
+        if y is None:
+            with span('decode'):
+                y, sample_rate = self.audio_cache.load(audio_file.file_path, sample_rate, res_type=profile.res_type)
+        build_context = AnalysisContext.over_active_regions if self.skip_silence else AnalysisContext
+        context = build_context(y, sample_rate, n_fft=profile.n_fft, hop_length=profile.hop_length)
+        return _ExtractionStages(context, self.ks_key_finder, pitch_options)
+
+    def cache_params(self, audio_file: AudioFile, pitch_mode='summary'):
+        """
+        Returns the parameters that, with the audio content and VERSION, determine the extracted features.
+        The pitch track is pooled from the stored contour on demand, so only whether a contour was tracked at
+        all is part of them.
 
-        # Extract tempo
-        tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
+        Args:
+            audio_file (AudioFile): The audio file features are extracted from.
+            pitch_mode (str): The requested pitch mode (see `extract`).
 
-        # Use K-S algorithm to estimate key
-        key = self.ks_key_finder.estimate_key(audio_file.file_path, audio_file.sample_rate)
+        Returns:
+            dict: The extraction parameters.
+        """
+        profile = get_performance_profile(audio_file.profile or self.profile)
+        params = {
+            "genre": self.genre,
+            "sample_rate": None if self.streaming else profile.analysis_rate_for(audio_file),
+            "streaming": self.streaming,
+            **profile.cache_params()
+        }
+        # Entries without a contour or over active regions only are kept apart; other entries keep their keys
+        if pitch_mode == 'off':
+            params["pitch"] = False
+        if self.skip_silence and not self.streaming:
+            params["skip_silence"] = True
+        return params
 
-        # Extract pitch using librosa's pitch detection
-        pitches, magnitudes = librosa.core.piptrack(y=y, sr=sr)
-        pitch_values = self._get_pitch_values(pitches, magnitudes)
 
-        # Rhythm (time of beats)
-        rhythm = librosa.frames_to_time(beat_frames, sr=sr)
+class _ExtractionStages(FeatureStages):
+    """
+    The stages of one extraction over an analysis context, each run on first use and memoized, so requesting
+    a feature runs exactly the stages it depends on:
 
-        return {
-            "tempo": tempo,
-            "key": key,
-            "pitch": pitch_values[:10],  # Return first 10 pitch values for simplicity
-            "rhythm": rhythm.tolist()  # Convert numpy array to list
-        }
+        tempo, rhythm -> beats -> stft
+        key -> chroma (CQT)
+        pitch -> pitch_contour -> stft (and beats, for the per-beat pitch track)
+    """
 
-    def _get_pitch_values(self, pitches, magnitudes):
-        """
-        Extract pitch values from the pitch tracking matrix.
+    def __init__(self, context: AnalysisContext, key_finder, pitch_options):
+        super().__init__(key_finder, pitch_options)
+        self.context = context
+
+    @cached_property
+    def stft(self):
+        # The STFT is shared by the beat and pitch stages, so it is timed on its own
+        with span('stft'):
+            return self.context.stft_magnitude
+
+    @cached_property
+    def beats(self):
+        self.stft
+        with span('beats'):
+            # Rhythm (time of beats)
+            return self.context.beat_times()
+
+    @cached_property
+    def chroma_profile(self):
+        with span('chroma'):
+            return self.context.chroma.mean(axis=1)
+
+    @cached_property
+    def pitch_contour(self):
+        # Extract pitch using librosa's pitch detection, unless no pitch output was requested
+        if self.pitch_options["mode"] == 'off':
+            return None
+        self.stft
+        with span('pitch_contour'):
+            return self.context.pitch_contour
+
+
+class _StreamingStages(FeatureStages):
+    """
+    The stages of one streaming extraction, from chroma, onset and pitch statistics accumulated block by
+    block, so peak memory does not depend on the length of the track. Streams are analyzed at the native
+    rate, so only the profile's FFT size and hop length apply.
 
-        Args:
-            pitches (np.ndarray): Pitch array.
-            magnitudes (np.ndarray): Magnitude array corresponding to the pitches.
+    One pass accumulates only the statistics the requested features need; a deferred feature that needs
+    others streams the file a second time for all of them.
+    """
+
+    # The statistics analyze_stream can accumulate
+    STATISTICS = ("chroma", "onsets", "pitch")
+
+    def __init__(self, file_path, profile, key_finder, pitch_options, features):
+        super().__init__(key_finder, pitch_options)
+        self.file_path = file_path
+        self.profile = profile
+        self.statistics = set()
+        if "key" in features:
+            self.statistics.add("chroma")
+        if "tempo" in features or "rhythm" in features or ("pitch" in features
+                                                           and tracks_pitch_per_beat(pitch_options)):
+            self.statistics.add("onsets")
+        if "pitch" in features and pitch_options["mode"] != 'off':
+            self.statistics.add("pitch")
+
+    @cached_property
+    def analysis(self):
+        return self._analyze(self.statistics)
+
+    @cached_property
+    def deferred_analysis(self):
+        return self._analyze(set(self.STATISTICS) - self.statistics)
+
+    def _analysis_with(self, statistic):
+        return self.analysis if statistic in self.statistics else self.deferred_analysis
+
+    def _analyze(self, statistics):
+        with span('stream_analysis'):
+            return analyze_stream(self.file_path, n_fft=self.profile.n_fft, hop_length=self.profile.hop_length,
+                                  **{statistic: statistic in statistics for statistic in self.STATISTICS})
+
+    @cached_property
+    def beats(self):
+        analysis = self._analysis_with("onsets")
+        with span('beats'):
+            tempo, beat_frames = analysis.beats()
+        return tempo, analysis.frames_to_time(beat_frames)
+
+    @cached_property
+    def chroma_profile(self):
+        # The accumulated chroma histogram
+        return self._analysis_with("chroma").chroma_mean()
+
+    @cached_property
+    def pitch_contour(self):
+        if self.pitch_options["mode"] == 'off':
+            return None
+        return self._analysis_with("pitch").pitch_contour
 
-        Returns:
-            list: Filtered pitch values (in Hz).
-        """
-        pitch_values = []
-        for t in range(pitches.shape[1]):
-            index = magnitudes[:, t].argmax()
-            pitch = pitches[index, t]
-            if pitch > 0:
-                pitch_values.append(pitch)
-        return pitch_values
\ No newline at end of file
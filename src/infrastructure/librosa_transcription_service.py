@@ -1,46 +1,94 @@
 """
 Module: Librosa Transcription Service
 Location: src/infrastructure/librosa_transcription_service.py
-Implements the transcription service using librosa for pitch detection and timing, simulating audio to MIDI.
+Implements the transcription service using librosa for pitch detection and timing, converting audio to MIDI.
 """
 
-import librosa
+import os
+
+import numpy as np
 from src.entities.audio_file import AudioFile
+from src.infrastructure.analysis_context import AnalysisContext
+from src.infrastructure.audio_cache import DecodedAudioCache
+from src.infrastructure.midi_writer import write_midi_bytes
+from src.infrastructure.musicxml_writer import MusicXMLDocument
+from src.infrastructure.note_segmentation import segment_notes
+from src.infrastructure.performance_profile import DEFAULT_PROFILE, get_performance_profile
+from src.use_cases.instrumentation import span
+from src.infrastructure.score_quantization import build_score
 
 
 class LibrosaTranscriptionService:
     """
-    Implements the transcription of an audio file into a basic MIDI-like data using librosa for pitch detection.
+    Implements the transcription of an audio file into MIDI note events using librosa for pitch and onset detection.
 
     Methods:
-        transcribe: Converts audio to MIDI-like data and MusicXML format.
+        transcribe: Converts audio to MIDI data and MusicXML format.
     """
 
-    def transcribe(self, audio_file: AudioFile):
+    def __init__(self, audio_cache: DecodedAudioCache = None, profile=DEFAULT_PROFILE, skip_silence=False):
+        """
+        Args:
+            audio_cache (DecodedAudioCache): The decoded-audio cache shared with other services (optional).
+            profile: The default performance profile (name or PerformanceProfile); an audio file's own profile
+                takes precedence.
+            skip_silence (bool): Whether to analyze only the active regions of a decoded signal, cutting long
+                silences (see AnalysisContext.over_active_regions); note and beat times stay on the original
+                timeline. Does not apply to a caller's analysis context.
+        """
+        self.audio_cache = audio_cache if audio_cache is not None else DecodedAudioCache()
+        self.profile = get_performance_profile(profile)
+        self.skip_silence = skip_silence
+
+    def transcribe(self, audio_file: AudioFile, y=None, context: AnalysisContext = None):
         """
-        Transcribes the audio file into basic pitch and timing information (MIDI-like data).
+        Transcribes the audio file into note events, serialized as a Standard MIDI File.
 
         Args:
             audio_file (AudioFile): The audio file to transcribe.
+            y (np.ndarray): An already-decoded mono signal at the audio file's analysis rate (optional).
+            context (AnalysisContext): A shared analysis context for the signal (optional).
 
         Returns:
-            tuple: A tuple containing the MIDI data (simulated) and MusicXML data (simulated).
+            tuple: A tuple containing the MIDI data (bytes) and the MusicXML document (MusicXMLDocument).
         """
-        # Load the audio file using librosa
-        y, sr = librosa.load(audio_file.file_path, sr=audio_file.sample_rate)
+        # Reuse the caller's analysis context, or build one over the (cached) decoded signal
+        if context is None:
+            profile = get_performance_profile(audio_file.profile or self.profile)
+            sample_rate = profile.analysis_rate_for(audio_file)
+            if y is None:
+                with span('decode'):
+                    y, sample_rate = self.audio_cache.load(audio_file.file_path, sample_rate,
+                                                           res_type=profile.res_type)
+            build_context = AnalysisContext.over_active_regions if self.skip_silence else AnalysisContext
+            context = build_context(y, sample_rate, n_fft=profile.n_fft, hop_length=profile.hop_length)
 
-        # Onset detection (identifying note start times)
-        onset_frames = librosa.onset.onset_detect(y=y, sr=sr)
-        onset_times = librosa.frames_to_time(onset_frames, sr=sr)
+        # The STFT is shared by the pitch, onset and level stages, so it is timed on its own
+        with span('stft'):
+            context.stft_magnitude
 
         # Pitch detection using librosa's piptrack
-        pitches, magnitudes = librosa.core.piptrack(y=y, sr=sr)
-        pitch_values = [p for pitch_row in pitches for p in pitch_row if p > 0]
+        with span('pitch_contour'):
+            contour = context.pitch_contour
+
+        # Onset detection (identifying note start times)
+        with span('onsets'):
+            onset_frames = context.onsets()
+
+        # Tempo and beat grid, shared by the MIDI file and the score
+        with span('beats'):
+            tempo, beat_times = context.beat_times()
 
-        # Simulate MIDI data (a simple list of pitch and timing pairs)
-        midi_data = [(onset_times[i], pitch_values[i]) for i in range(min(len(onset_times), len(pitch_values)))]
+        # Segment notes between onsets and serialize them as a Standard MIDI File
+        with span('note_segmentation'):
+            notes = segment_notes(onset_frames, contour, context.rms)
+        with span('midi'):
+            midi_data = write_midi_bytes(notes, tempo_bpm=float(np.atleast_1d(tempo)[0]))
 
-        # Simulate MusicXML data (simplified)
-        score_data = "<musicXML_placeholder>"
+        # Quantize the notes onto the beat grid; the MusicXML is rendered lazily, chunk by chunk
+        title = os.path.splitext(os.path.basename(audio_file.file_path))[0]
+        with span('score_quantization'):
+            score = build_score(notes, beat_times, tempo, title)
+        score_data = MusicXMLDocument(score)
 
         return midi_data, score_data
\ No newline at end of file
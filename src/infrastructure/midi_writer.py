@@ -0,0 +1,97 @@
+"""
+Module: MIDI Writer
+Location: src/infrastructure/midi_writer.py
+Serializes note events into Standard MIDI File bytes.
+"""
+
+import struct
+
+import numpy as np
+
+NOTE_ON = 0x90
+NOTE_OFF = 0x80
+
+# The largest tempo meta event value (3 bytes), about 3.58 BPM
+MAX_MICROSECONDS_PER_BEAT = 0xFFFFFF
+
+
+def write_midi_bytes(notes, tempo_bpm=120.0, ticks_per_beat=480, channel=0):
+    """
+    Serializes note events into a single-track (format 0) Standard MIDI File.
+
+    Args:
+        notes (np.ndarray): The notes as a structured array with onset, offset, pitch and velocity fields.
+        tempo_bpm (float): The tempo written to the file, used to convert seconds into ticks.
+        ticks_per_beat (int): The time resolution of the file.
+        channel (int): The MIDI channel of the notes (0-15).
+
+    Returns:
+        bytes: The Standard MIDI File.
+    """
+    tempo_bpm = float(tempo_bpm) if tempo_bpm and tempo_bpm > 0 else 120.0
+    # The tempo meta event holds 3 bytes, so very slow tempos are clamped; ticks follow the tempo written
+    microseconds_per_beat = min(int(round(60_000_000 / tempo_bpm)), MAX_MICROSECONDS_PER_BEAT)
+    ticks_per_second = ticks_per_beat * 1_000_000 / microseconds_per_beat
+
+    on_ticks = np.round(notes['onset'].astype(np.float64) * ticks_per_second).astype(np.int64)
+    off_ticks = np.maximum(np.round(notes['offset'].astype(np.float64) * ticks_per_second).astype(np.int64),
+                           on_ticks + 1)
+    on_ticks, off_ticks, pitches, velocities = _resolve_overlaps(on_ticks, off_ticks, notes['pitch'],
+                                                                 notes['velocity'])
+
+    # Note-offs sort before note-ons at the same tick, so repeated pitches retrigger cleanly
+    ticks = np.concatenate([off_ticks, on_ticks])
+    is_on = np.concatenate([np.zeros(len(pitches), dtype=bool), np.ones(len(pitches), dtype=bool)])
+    pitches = np.concatenate([pitches, pitches])
+    velocities = np.concatenate([np.zeros(len(velocities), dtype=np.uint8), velocities])
+    order = np.lexsort((is_on, ticks))
+
+    track = bytearray(b'\x00\xff\x51\x03' + microseconds_per_beat.to_bytes(3, 'big'))
+    previous_tick = 0
+    for i in order:
+        track += _variable_length(int(ticks[i]) - previous_tick)
+        status = (NOTE_ON if is_on[i] else NOTE_OFF) | (channel & 0x0F)
+        track += bytes((status, int(pitches[i]) & 0x7F, int(velocities[i]) & 0x7F))
+        previous_tick = int(ticks[i])
+    track += b'\x00\xff\x2f\x00'  # End of track
+
+    header = b'MThd' + struct.pack('>IHHH', 6, 0, 1, ticks_per_beat)
+    return header + b'MTrk' + struct.pack('>I', len(track)) + bytes(track)
+
+
+def _resolve_overlaps(on_ticks, off_ticks, pitches, velocities):
+    """
+    Rewrites overlapping notes of the same pitch so that no note-off cuts a later note short: a note sounding
+    when the next note of its pitch starts ends there (the next note retriggers it), and the last note of an
+    overlapping run lasts until the run's latest offset. Of notes of one pitch starting on the same tick, only
+    the last is kept.
+
+    Returns:
+        tuple: The note-on ticks, note-off ticks, pitches and velocities, ordered by pitch and onset.
+    """
+    pitches = pitches.astype(np.int64)
+    order = np.lexsort((on_ticks, pitches))
+    on_ticks, off_ticks, pitches, velocities = on_ticks[order], off_ticks[order], pitches[order], velocities[order]
+    if len(pitches) == 0:
+        return on_ticks, off_ticks, pitches, velocities
+
+    # The latest offset of each pitch's notes so far; pitches ascend, so offsetting by pitch keeps them apart
+    span = int(off_ticks.max()) + 1
+    ends = np.maximum.accumulate(off_ticks + pitches * span) - pitches * span
+    next_on = np.append(on_ticks[1:], 0)
+    next_same = np.append(pitches[1:] == pitches[:-1], False)
+    off_ticks = np.where(next_same & (next_on < ends), next_on, ends)
+    keep = ~(next_same & (next_on == on_ticks))
+    return on_ticks[keep], off_ticks[keep], pitches[keep], velocities[keep]
+
+
+def _variable_length(value):
+    """
+    Encodes a delta time as a MIDI variable-length quantity.
+    """
+    encoded = [value & 0x7F]
+    value >>= 7
+    while value:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(reversed(encoded))
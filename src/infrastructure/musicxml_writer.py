@@ -0,0 +1,176 @@
+"""
+Module: MusicXML Writer
+Location: src/infrastructure/musicxml_writer.py
+Serializes a MusicScore into MusicXML incrementally, one measure at a time, so long scores can be streamed to
+a file or an HTTP response with constant memory.
+"""
+
+from xml.sax.saxutils import escape
+
+from src.entities.music_score import MusicScore
+
+# Pitch spelling of the 12 pitch classes as (step, alter)
+PITCH_SPELLING = [('C', 0), ('C', 1), ('D', 0), ('D', 1), ('E', 0), ('F', 0),
+                  ('F', 1), ('G', 0), ('G', 1), ('A', 0), ('A', 1), ('B', 0)]
+
+# Note type names by length in beats (quarter notes)
+NOTE_TYPES = {4.0: 'whole', 3.0: 'half', 2.0: 'half', 1.5: 'quarter', 1.0: 'quarter', 0.75: 'eighth',
+              0.5: 'eighth', 0.375: '16th', 0.25: '16th', 0.125: '32nd'}
+DOTTED_LENGTHS = {3.0, 1.5, 0.75, 0.375}
+
+HEADER = ('<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+          '<!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD MusicXML 4.0 Partwise//EN" '
+          '"http://www.musicxml.org/dtds/partwise.dtd">\n'
+          '<score-partwise version="4.0">\n')
+
+
+class MusicXMLDocument:
+    """
+    A lazily serialized MusicXML document: iterating it yields the MusicXML text chunk by chunk.
+
+    Attributes:
+        score (MusicScore): The score being serialized.
+    """
+
+    def __init__(self, score: MusicScore):
+        self.score = score
+
+    def __iter__(self):
+        return iter_musicxml(self.score)
+
+    def write_to(self, sink):
+        """
+        Writes the document to a file-like sink one chunk at a time.
+
+        Args:
+            sink: An object with a `write(str)` method, such as a text file.
+        """
+        for chunk in self:
+            sink.write(chunk)
+
+    def __str__(self):
+        return ''.join(self)
+
+
+def iter_musicxml(score: MusicScore):
+    """
+    Generates the MusicXML text of a score, one header or measure at a time.
+
+    Notes crossing a barline are split and tied; gaps between notes become rests.
+
+    Args:
+        score (MusicScore): The score to serialize.
+
+    Yields:
+        str: Consecutive chunks of the MusicXML document.
+    """
+    divisions = score.divisions
+    measure_length = divisions * score.beats_per_measure
+
+    header = [HEADER, '  <work><work-title>', escape(score.title or ''), '</work-title></work>\n']
+    if score.composer:
+        header += ['  <identification><creator type="composer">', escape(score.composer),
+                   '</creator></identification>\n']
+    header.append('  <part-list><score-part id="P1"><part-name>Music</part-name></score-part></part-list>\n'
+                  '  <part id="P1">\n')
+    yield ''.join(header)
+
+    measure_number = 1
+    measure = [_measure_open(score, measure_number)]
+    position = 0  # Current position in divisions
+    for note in score.notes:
+        # Rest up to the note, then the note itself, each split at barlines
+        for start, length, pitch, tie_start, tie_stop in _split_at_barlines(position, note.start - position,
+                                                                            None, measure_length):
+            measure.append(_note_element(None, length, divisions))
+            if (start + length) % measure_length == 0:
+                measure.append('    </measure>\n')
+                yield ''.join(measure)
+                measure_number += 1
+                measure = [_measure_open(score, measure_number)]
+        for start, length, pitch, tie_start, tie_stop in _split_at_barlines(note.start, note.duration,
+                                                                            note.pitch, measure_length):
+            measure.append(_note_element(pitch, length, divisions, tie_start, tie_stop))
+            if (start + length) % measure_length == 0:
+                measure.append('    </measure>\n')
+                yield ''.join(measure)
+                measure_number += 1
+                measure = [_measure_open(score, measure_number)]
+        position = max(position, note.start + note.duration)
+
+    # Pad the last measure with a rest, unless the score ended exactly on a barline with no notes pending
+    remainder = position % measure_length
+    if remainder or measure_number == 1 and position == 0:
+        measure.append(_note_element(None, measure_length - remainder, divisions))
+        measure.append('    </measure>\n')
+        yield ''.join(measure)
+    yield '  </part>\n</score-partwise>\n'
+
+
+def _measure_open(score, number):
+    """
+    Opens a measure; the first one carries the divisions, time signature, clef and tempo.
+    """
+    if number > 1:
+        return f'    <measure number="{number}">\n'
+    return (f'    <measure number="1">\n'
+            f'      <attributes><divisions>{score.divisions}</divisions><key><fifths>0</fifths></key>'
+            f'<time><beats>{score.beats_per_measure}</beats><beat-type>4</beat-type></time>'
+            f'<clef><sign>G</sign><line>2</line></clef></attributes>\n'
+            f'      <direction placement="above"><direction-type><metronome><beat-unit>quarter</beat-unit>'
+            f'<per-minute>{round(score.tempo)}</per-minute></metronome></direction-type>'
+            f'<sound tempo="{score.tempo:.2f}"/></direction>\n')
+
+
+def _split_at_barlines(start, length, pitch, measure_length):
+    """
+    Splits a note or rest into pieces that do not cross barlines.
+
+    Yields:
+        tuple: The start, length, pitch, and whether the piece starts or stops a tie.
+    """
+    first = True
+    while length > 0:
+        piece = min(length, measure_length - start % measure_length)
+        length -= piece
+        yield start, piece, pitch, pitch is not None and length > 0, pitch is not None and not first
+        start += piece
+        first = False
+
+
+def _note_element(pitch, duration, divisions, tie_start=False, tie_stop=False):
+    """
+    Renders one <note> element; a pitch of None renders a rest.
+    """
+    parts = ['      <note>']
+    if pitch is None:
+        parts.append('<rest/>')
+    else:
+        # Score pitches are uint8; widen before the arithmetic so low octaves do not wrap around
+        pitch = int(pitch)
+        step, alter = PITCH_SPELLING[pitch % 12]
+        parts.append(f'<pitch><step>{step}</step>')
+        if alter:
+            parts.append(f'<alter>{alter}</alter>')
+        parts.append(f'<octave>{pitch // 12 - 1}</octave></pitch>')
+    parts.append(f'<duration>{duration}</duration>')
+    if tie_stop:
+        parts.append('<tie type="stop"/>')
+    if tie_start:
+        parts.append('<tie type="start"/>')
+
+    beats = duration / divisions
+    if beats in NOTE_TYPES:
+        parts.append(f'<type>{NOTE_TYPES[beats]}</type>')
+        if beats in DOTTED_LENGTHS:
+            parts.append('<dot/>')
+
+    if tie_start or tie_stop:
+        parts.append('<notations>')
+        if tie_stop:
+            parts.append('<tied type="stop"/>')
+        if tie_start:
+            parts.append('<tied type="start"/>')
+        parts.append('</notations>')
+    parts.append('</note>\n')
+    return ''.join(parts)
@@ -0,0 +1,70 @@
+"""
+Module: Note Segmentation
+Location: src/infrastructure/note_segmentation.py
+Segments a pitch contour into note events (onset, offset, MIDI pitch, velocity) anchored on detected onsets.
+"""
+
+import numpy as np
+import librosa
+
+# One structured record per note; times in seconds
+NOTE_DTYPE = np.dtype([('onset', '<f4'), ('offset', '<f4'), ('pitch', 'u1'), ('velocity', 'u1')])
+
+
+def segment_notes(onset_frames, contour, rms, min_duration=0.05, release_db=-20.0, min_voiced_ratio=0.3,
+                  velocity_floor_db=-60.0):
+    """
+    Builds note events from onsets, the pitch contour and the frame energy.
+
+    Each note starts at an onset and ends at the next onset, or earlier where its energy falls `release_db`
+    below its peak. Its pitch is the median of the voiced contour frames between onset and offset, and its
+    velocity maps the peak energy relative to the loudest frame of the signal onto 1-127. Notes that are too
+    short or mostly unvoiced are dropped.
+
+    Args:
+        onset_frames (np.ndarray): The onset frame indices, in increasing order.
+        contour (PitchContour): The per-frame dominant pitch.
+        rms (np.ndarray): The per-frame RMS energy, aligned with the contour.
+        min_duration (float): The shortest note kept, in seconds.
+        release_db (float): The drop below the note's peak energy that ends the note.
+        min_voiced_ratio (float): The smallest fraction of voiced frames a note must have.
+        velocity_floor_db (float): The energy, relative to the loudest frame, mapped to velocity 1.
+
+    Returns:
+        np.ndarray: The notes as a structured array of NOTE_DTYPE, ordered by onset.
+    """
+    n_frames = len(contour)
+    onset_frames = np.asarray(onset_frames, dtype=np.intp)
+    onset_frames = onset_frames[onset_frames < n_frames]
+    if len(onset_frames) == 0:
+        return np.zeros(0, dtype=NOTE_DTYPE)
+
+    rms = np.asarray(rms[:n_frames], dtype=np.float64)
+    reference = max(rms.max(), 1e-10)
+    release_ratio = 10.0 ** (release_db / 20.0)
+    boundaries = np.append(onset_frames[1:], n_frames)
+    frame_duration = contour.times[1] - contour.times[0] if n_frames > 1 else 0.0
+
+    notes = []
+    for start, stop in zip(onset_frames, boundaries):
+        if stop <= start:
+            continue
+        segment_rms = rms[start:stop]
+        peak = segment_rms.max()
+        released = np.flatnonzero(segment_rms[segment_rms.argmax():] < peak * release_ratio)
+        end = start + segment_rms.argmax() + released[0] if len(released) else stop
+
+        voiced = contour.voiced[start:end]
+        if end - start == 0 or voiced.mean() < min_voiced_ratio:
+            continue
+        onset_time = contour.times[start]
+        offset_time = contour.times[end - 1] + frame_duration
+        if offset_time - onset_time < min_duration:
+            continue
+
+        pitch = int(np.clip(np.round(librosa.hz_to_midi(np.median(contour.frequencies[start:end][voiced]))), 0, 127))
+        level_db = 20.0 * np.log10(max(peak, 1e-10) / reference)
+        velocity = int(np.clip(np.round(1 + 126 * (1 - level_db / velocity_floor_db)), 1, 127))
+        notes.append((onset_time, offset_time, pitch, velocity))
+
+    return np.array(notes, dtype=NOTE_DTYPE)
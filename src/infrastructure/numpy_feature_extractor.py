@@ -0,0 +1,360 @@
+"""
+Module: NumPy Feature Extractor
+Location: src/infrastructure/numpy_feature_extractor.py
+Implements a lightweight feature extraction backend on NumPy alone: a framed STFT, chroma folding, spectral
+flux onsets, autocorrelation tempo with phase-aligned beats, and a peak-picking pitch contour. It never touches
+librosa, SciPy or numba, so a fresh process extracts features without their import and JIT costs, at some cost
+in accuracy. Files are decoded with soundfile and analyzed at their native rate.
+"""
+
+from functools import cached_property, partial
+
+import numpy as np
+import soundfile as sf
+from src.entities.audio_file import AudioFile
+from src.entities.musical_feature import FEATURE_NAMES
+from src.infrastructure.feature_stages import FeatureStages
+from src.infrastructure.ks_key_finder import KrumhanslSchmucklerKeyFinder
+from src.infrastructure.pitch_contour import PitchContour
+from src.use_cases.instrumentation import span
+
+# The analysis window and hop durations, matching the balanced librosa profile (2048 / 512 at 22050 Hz)
+WINDOW_SECONDS = 0.093
+HOP_RATIO = 4
+
+# The frames processed at once by the STFT, chroma and onset stages, bounding their temporaries; only the
+# float32 magnitude spectrogram itself grows with the length of the signal
+BLOCK_FRAMES = 512
+
+# The frequency range folded into chroma (C3 to C8): lower bins are too coarse to separate semitones
+CHROMA_FMIN = 130.81
+CHROMA_FMAX = 4186.0
+
+# The frequency range and relative threshold of the pitch contour, as in librosa's piptrack defaults
+PITCH_FMIN = 150.0
+PITCH_FMAX = 4000.0
+PITCH_THRESHOLD = 0.1
+
+# The tempo range searched and the log-normal tempo prior (centered at 120 BPM, one octave deviation)
+MIN_BPM = 30.0
+MAX_BPM = 300.0
+PRIOR_BPM = 120.0
+PRIOR_OCTAVES = 1.0
+
+
+class NumpyFeatureExtractor:
+    """
+    Extracts musical features (tempo, key, pitch, rhythm) with NumPy only, estimating the key with the
+    Krumhansl-Schmuckler algorithm.
+
+    Methods:
+        extract: Extracts musical features from the given audio file.
+    """
+
+    # Bump whenever a change alters the extracted features, so persisted results are recomputed
+    VERSION = "1"
+
+    def __init__(self, genre='general'):
+        """
+        Args:
+            genre (str): The genre profile used for key estimation.
+        """
+        self.genre = genre
+        self.ks_key_finder = KrumhanslSchmucklerKeyFinder(genre)
+
+    def extract(self, audio_file: AudioFile, y=None, sample_rate=None, features=None, pitch_mode='summary',
+                pitch_resolution='raw', pitch_pooling='median'):
+        """
+        Extracts musical features such as tempo, key, pitch, and rhythm from the audio file.
+
+        Only the stages the requested features depend on run; the other entries of the result are
+        zero-argument callables that run their stages on demand, over the caller's signal or the file decoded
+        again.
+
+        Args:
+            audio_file (AudioFile): The audio file to extract features from.
+            y (np.ndarray): An already-decoded mono signal (optional).
+            sample_rate (int): The sample rate of `y`; required with `y`.
+            features (iterable): The features to compute right away, among FEATURE_NAMES (all by default).
+            pitch_mode (str): "summary", "contour" or "off", as for the librosa backend.
+            pitch_resolution: The pitch track resolution: "raw", "beat" or a bin width in milliseconds.
+            pitch_pooling (str): How the pitch track pools each bin: "median" or "mean".
+
+        Returns:
+            dict: A dictionary containing tempo, key, pitch, and rhythm data, plus "pitch_track" in contour
+                mode.
+
+        Raises:
+            ValueError: If `y` is given without its sample rate.
+        """
+        if y is not None and not sample_rate:
+            raise ValueError("sample_rate is required with a decoded signal y")
+        pitch_options = {"mode": pitch_mode, "resolution": pitch_resolution, "pooling": pitch_pooling}
+        rebuild = partial(self._stages, audio_file, y, sample_rate, pitch_options)
+        return rebuild().outputs(FEATURE_NAMES if features is None else tuple(features), rebuild)
+
+    def _stages(self, audio_file, y, sample_rate, pitch_options):
+        """
+        Builds the extraction stages over a caller's signal, or over the decoded file.
+        """
+        if y is None:
+            with span('decode'):
+                y, sample_rate = sf.read(audio_file.file_path, dtype='float32', always_2d=True)
+                y = y.mean(axis=1)
+        return _NumpyStages(y, sample_rate, self.ks_key_finder, pitch_options)
+
+    def cache_params(self, audio_file: AudioFile, pitch_mode='summary'):
+        """
+        Returns the parameters that, with the audio content and VERSION, determine the extracted features.
+
+        Args:
+            audio_file (AudioFile): The audio file features are extracted from.
+            pitch_mode (str): The requested pitch mode (see `extract`).
+
+        Returns:
+            dict: The extraction parameters.
+        """
+        params = {"backend": "numpy", "genre": self.genre}
+        if pitch_mode == 'off':
+            params["pitch"] = False
+        return params
+
+
+class _NumpyStages(FeatureStages):
+    """
+    The stages of one NumPy extraction, each run on first use and memoized:
+
+        tempo, rhythm -> beats -> onset_envelope -> stft
+        key -> chroma -> stft
+        pitch -> pitch_contour -> stft (and beats, for the per-beat pitch track)
+    """
+
+    def __init__(self, y, sr, key_finder, pitch_options):
+        super().__init__(key_finder, pitch_options)
+        self.y = y
+        self.sr = sr
+        self.n_fft = 1 << int(np.ceil(np.log2(WINDOW_SECONDS * sr)))
+        self.hop_length = self.n_fft // HOP_RATIO
+
+    @cached_property
+    def stft(self):
+        with span('stft'):
+            return framed_stft(self.y, self.n_fft, self.hop_length)
+
+    @cached_property
+    def onset_envelope(self):
+        magnitude = self.stft
+        with span('onsets'):
+            return onset_flux(magnitude)
+
+    @cached_property
+    def beats(self):
+        envelope = self.onset_envelope
+        with span('beats'):
+            frame_rate = self.sr / self.hop_length
+            tempo, period = autocorrelation_tempo(envelope, frame_rate)
+            beat_frames = phase_aligned_beats(envelope, period)
+        return tempo, beat_frames * (self.hop_length / self.sr)
+
+    @cached_property
+    def chroma_profile(self):
+        magnitude = self.stft
+        with span('chroma'):
+            return mean_chroma(magnitude, chroma_fold_matrix(self.sr, self.n_fft))
+
+    @cached_property
+    def pitch_contour(self):
+        if self.pitch_options["mode"] == 'off':
+            return None
+        magnitude = self.stft
+        with span('pitch_contour'):
+            return peak_pitch_contour(magnitude, self.sr, self.n_fft, self.hop_length)
+
+
+def framed_stft(y, n_fft, hop_length):
+    """
+    Computes the magnitude STFT of a centered, zero-padded signal with a Hann window.
+
+    Args:
+        y (np.ndarray): The mono signal.
+        n_fft (int): The FFT size.
+        hop_length (int): The hop length between frames.
+
+    Returns:
+        np.ndarray: The magnitude spectrogram (n_fft // 2 + 1 bins x frames, float32); frame t is centered on
+            sample t * hop_length.
+    """
+    padded = np.pad(np.asarray(y, dtype=np.float32), n_fft // 2)
+    if len(padded) < n_fft:
+        padded = np.pad(padded, (0, n_fft - len(padded)))
+    frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop_length]
+    window = np.hanning(n_fft + 1)[:-1].astype(np.float32)  # periodic Hann window
+    magnitude = np.empty((n_fft // 2 + 1, len(frames)), dtype=np.float32)
+    for start in range(0, len(frames), BLOCK_FRAMES):
+        block = frames[start:start + BLOCK_FRAMES]
+        magnitude[:, start:start + len(block)] = np.abs(np.fft.rfft(block * window, axis=1)).T
+    return magnitude
+
+
+def chroma_fold_matrix(sr, n_fft):
+    """
+    Builds the matrix folding STFT bins onto the 12 pitch classes: each bin between CHROMA_FMIN and CHROMA_FMAX
+    goes to the pitch class of its nearest equal-tempered note.
+
+    Returns:
+        np.ndarray: The fold matrix (12 x bins).
+    """
+    frequencies = np.fft.rfftfreq(n_fft, 1.0 / sr)
+    in_range = (frequencies >= CHROMA_FMIN) & (frequencies <= CHROMA_FMAX)
+    pitch_classes = np.round(12 * np.log2(frequencies[in_range] / 440.0) + 69).astype(int) % 12
+    fold = np.zeros((12, len(frequencies)), dtype=np.float32)
+    fold[pitch_classes, np.flatnonzero(in_range)] = 1.0
+    return fold
+
+
+def mean_chroma(magnitude, fold):
+    """
+    Averages the chroma of every frame, each frame scaled to a unit maximum as librosa's chroma is.
+
+    Args:
+        magnitude (np.ndarray): The magnitude spectrogram (bins x frames).
+        fold (np.ndarray): The chroma fold matrix (see `chroma_fold_matrix`).
+
+    Returns:
+        np.ndarray: The mean chroma profile (12).
+    """
+    n_frames = magnitude.shape[1]
+    total = np.zeros(12)
+    for start in range(0, n_frames, BLOCK_FRAMES):
+        chroma = fold @ np.square(magnitude[:, start:start + BLOCK_FRAMES])
+        peaks = chroma.max(axis=0, keepdims=True)
+        chroma = np.divide(chroma, peaks, out=np.zeros_like(chroma), where=peaks > 0)
+        total += chroma.sum(axis=1)
+    return total / n_frames if n_frames else total
+
+
+def onset_flux(magnitude):
+    """
+    Computes the onset strength envelope as the mean positive spectral flux of the log-compressed magnitude.
+
+    Returns:
+        np.ndarray: The onset strength of each frame (float32); the first frame has none.
+    """
+    n_frames = magnitude.shape[1]
+    envelope = np.zeros(n_frames, dtype=np.float32)
+    for start in range(0, n_frames, BLOCK_FRAMES):
+        # Each block starts from the last frame of the previous one
+        first = max(start - 1, 0)
+        compressed = np.log1p(100.0 * magnitude[:, first:start + BLOCK_FRAMES])
+        flux = np.maximum(0.0, np.diff(compressed, axis=1))
+        envelope[first + 1:first + 1 + flux.shape[1]] = flux.mean(axis=0)
+    return envelope
+
+
+def autocorrelation_tempo(envelope, frame_rate):
+    """
+    Estimates the tempo as the autocorrelation peak of the onset envelope, weighted by a log-normal tempo prior.
+
+    Args:
+        envelope (np.ndarray): The onset strength envelope.
+        frame_rate (float): The envelope frames per second.
+
+    Returns:
+        tuple: The tempo in BPM (0.0 when the envelope is too short or flat) and the beat period in frames.
+    """
+    centered = envelope - envelope.mean()
+    n = len(centered)
+    if not centered.any():
+        return 0.0, 0.0
+
+    # Linear (not circular) autocorrelation through a zero-padded FFT
+    spectrum = np.fft.rfft(centered, 2 * n)
+    autocorrelation = np.fft.irfft(spectrum * np.conj(spectrum))[:n]
+    tempo, lag, _ = tempo_from_autocorrelation(autocorrelation, frame_rate)
+    return tempo, lag
+
+
+def tempo_from_autocorrelation(autocorrelation, frame_rate):
+    """
+    Picks the beat period from an onset autocorrelation: the lag between MIN_BPM and MAX_BPM with the highest
+    prior-weighted autocorrelation, refined with a parabola through its neighbors.
+
+    Args:
+        autocorrelation (np.ndarray): The onset autocorrelation by lag in frames, from lag 0.
+        frame_rate (float): The envelope frames per second.
+
+    Returns:
+        tuple: The tempo in BPM, the beat period in frames and the autocorrelation at that period relative to
+            lag 0 (a periodicity strength up to 1); zeros when too few lags are known.
+    """
+    min_lag = max(int(np.floor(60.0 * frame_rate / MAX_BPM)), 1)
+    max_lag = min(int(np.ceil(60.0 * frame_rate / MIN_BPM)), len(autocorrelation) - 2)
+    if max_lag <= min_lag or autocorrelation[0] <= 0:
+        return 0.0, 0.0, 0.0
+
+    lags = np.arange(min_lag, max_lag + 1)
+    prior = np.exp(-0.5 * (np.log2(60.0 * frame_rate / lags / PRIOR_BPM) / PRIOR_OCTAVES) ** 2)
+    scores = autocorrelation[lags] * prior
+    best = int(np.argmax(scores))
+    strength = float(autocorrelation[lags[best]] / autocorrelation[0])
+
+    lag = float(lags[best])
+    if 0 < best < len(scores) - 1:
+        left, center, right = scores[best - 1:best + 2]
+        curvature = left - 2 * center + right
+        if curvature < 0:
+            lag += 0.5 * (left - right) / curvature
+    return 60.0 * frame_rate / lag, lag, strength
+
+
+def phase_aligned_beats(envelope, period):
+    """
+    Places beats on a constant-period grid, choosing the phase that collects the most onset strength.
+
+    Args:
+        envelope (np.ndarray): The onset strength envelope.
+        period (float): The beat period in frames.
+
+    Returns:
+        np.ndarray: The beat frame positions (float64).
+    """
+    n = len(envelope)
+    if period <= 0 or n == 0:
+        return np.zeros(0)
+    phases = np.arange(max(int(np.ceil(period)), 1))
+    grid = phases[:, np.newaxis] + np.arange(int(n / period) + 1)[np.newaxis, :] * period
+    positions = np.round(grid).astype(np.int64)
+    valid = positions < n
+    scores = np.where(valid, envelope[np.minimum(positions, n - 1)], 0.0).sum(axis=1)
+    best = int(np.argmax(scores))
+    return grid[best][valid[best]].astype(np.float64)
+
+
+def peak_pitch_contour(magnitude, sr, n_fft, hop_length):
+    """
+    Tracks the strongest spectral peak of each frame between PITCH_FMIN and PITCH_FMAX, refined by parabolic
+    interpolation of the log magnitude. A frame is voiced when its peak holds at least PITCH_THRESHOLD of the
+    loudest frame's peak.
+
+    Returns:
+        PitchContour: The pitch contour of the signal.
+    """
+    n_frames = magnitude.shape[1]
+    low = max(int(np.ceil(PITCH_FMIN * n_fft / sr)), 1)
+    high = min(int(np.floor(PITCH_FMAX * n_fft / sr)), magnitude.shape[0] - 2)
+    band = magnitude[low:high + 1]
+    peaks = band.argmax(axis=0) if n_frames else np.zeros(0, dtype=np.int64)
+    columns = np.arange(n_frames)
+    peak_magnitudes = band[peaks, columns] if n_frames else np.zeros(0, dtype=np.float32)
+
+    bins = peaks + low
+    left, center, right = (np.log(magnitude[bins + offset, columns] + 1e-10) for offset in (-1, 0, 1))
+    curvature = left - 2 * center + right
+    offsets = np.divide(0.5 * (left - right), curvature, out=np.zeros_like(curvature), where=curvature < 0)
+    frequencies = ((bins + np.clip(offsets, -0.5, 0.5)) * (sr / n_fft)).astype(np.float32)
+
+    loudest = peak_magnitudes.max() if n_frames else 0.0
+    voiced = peak_magnitudes >= PITCH_THRESHOLD * loudest if loudest > 0 else np.zeros(n_frames, dtype=bool)
+    frequencies[~voiced] = 0.0
+    times = (np.arange(n_frames) * (hop_length / sr)).astype(np.float32)
+    return PitchContour(frequencies, voiced, times)
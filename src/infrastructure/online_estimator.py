@@ -0,0 +1,172 @@
+"""
+Module: Online Estimator
+Location: src/infrastructure/online_estimator.py
+Implements a key and tempo estimator for live audio: PCM chunks are pushed one at a time, and the estimate is
+updated after each one from exponentially decayed chroma and onset statistics. The work per chunk depends only
+on the chunk length, not on how long the stream has run, so a 100 ms chunk is processed in a few milliseconds.
+"""
+
+import numpy as np
+from src.entities.online_estimate import OnlineEstimate
+from src.infrastructure.ks_key_finder import KEY_NAMES, KrumhanslSchmucklerKeyFinder
+from src.infrastructure.numpy_feature_extractor import (HOP_RATIO, MIN_BPM, WINDOW_SECONDS, chroma_fold_matrix,
+                                                        onset_flux, tempo_from_autocorrelation)
+
+
+class OnlineKeyTempoEstimator:
+    """
+    Estimates the key and tempo of a live stream chunk by chunk.
+
+    Incoming samples are framed through a short carry-over buffer. Each frame's chroma is added to a running
+    chroma profile that decays with `key_half_life`, and its onset strength updates a running onset
+    autocorrelation that decays with `tempo_half_life`. The last onset values are kept in a ring buffer
+    spanning the slowest beat period. Keys are scored against the genre profile's key templates, and the tempo is
+    picked from the autocorrelation with the same prior as the NumPy feature backend.
+
+    Attributes:
+        sample_rate (int): The sample rate of the pushed PCM.
+        n_fft (int): The analysis window length in samples.
+        hop_length (int): The hop length between analysis frames.
+        key_half_life (float): The seconds after which a frame's weight in the chroma profile has halved.
+        tempo_half_life (float): The seconds after which a frame's weight in the onset autocorrelation has halved.
+    """
+
+    def __init__(self, sample_rate, genre='general', key_half_life=10.0, tempo_half_life=8.0):
+        """
+        Args:
+            sample_rate (int): The sample rate of the pushed PCM.
+            genre (str): The genre profile whose key templates are used.
+            key_half_life (float): The half-life of the chroma statistics in seconds.
+            tempo_half_life (float): The half-life of the onset statistics in seconds.
+        """
+        self.sample_rate = sample_rate
+        self.n_fft = 1 << int(np.ceil(np.log2(WINDOW_SECONDS * sample_rate)))
+        self.hop_length = self.n_fft // HOP_RATIO
+        self.key_half_life = key_half_life
+        self.tempo_half_life = tempo_half_life
+        self.key_finder = KrumhanslSchmucklerKeyFinder(genre)
+
+        self._frame_rate = sample_rate / self.hop_length
+        self._chroma_decay = 0.5 ** (1.0 / (key_half_life * self._frame_rate))
+        self._onset_decay = 0.5 ** (1.0 / (tempo_half_life * self._frame_rate))
+        self._window = np.hanning(self.n_fft + 1)[:-1].astype(np.float32)
+        self._fold = chroma_fold_matrix(sample_rate, self.n_fft)
+
+        # Lags up to the slowest beat period, plus the neighbors the peak refinement needs
+        n_lags = int(np.ceil(60.0 * self._frame_rate / MIN_BPM)) + 2
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._previous_magnitude = None
+        self._chroma = np.zeros(12)
+        self._onset_mean = 0.0
+        self._onset_weight = 0.0
+        self._onsets = _RingBuffer(n_lags)
+        self._autocorrelation = np.zeros(n_lags)
+        self._n_samples = 0
+        self._n_frames = 0
+
+    def push(self, chunk):
+        """
+        Adds a chunk of PCM to the stream and updates the estimate.
+
+        Args:
+            chunk (np.ndarray): The samples, mono or as frames x channels; integer PCM is scaled to [-1, 1).
+
+        Returns:
+            OnlineEstimate: The estimate including the chunk.
+        """
+        y = _as_mono(chunk)
+        self._n_samples += len(y)
+        samples = np.concatenate([self._carry, y])
+        n_frames = (len(samples) - self.n_fft) // self.hop_length + 1 if len(samples) >= self.n_fft else 0
+        if n_frames:
+            frames = np.lib.stride_tricks.sliding_window_view(samples, self.n_fft)[::self.hop_length][:n_frames]
+            self._update(np.abs(np.fft.rfft(frames * self._window, axis=1)).T)
+        self._carry = samples[n_frames * self.hop_length:]
+        return self.estimate()
+
+    def estimate(self):
+        """
+        Returns the current estimate without adding audio.
+
+        Returns:
+            OnlineEstimate: The key and tempo of the stream so far. The tempo stays 0.0 until the onset history
+                spans the slowest beat period.
+        """
+        key, key_confidence = None, 0.0
+        if self._chroma.any():
+            key = self.key_finder.estimate_key_from_profile(self._chroma)
+            correlations = self.key_finder.correlate_batch(self._chroma)[0]
+            best = KEY_NAMES.index(key)
+            key_confidence = float(np.clip(correlations[best] - np.delete(correlations, best).max(), 0.0, 1.0))
+
+        tempo, tempo_confidence = 0.0, 0.0
+        if self._n_frames >= self._onsets.capacity:
+            tempo, _, strength = tempo_from_autocorrelation(self._autocorrelation, self._frame_rate)
+            tempo_confidence = float(np.clip(strength, 0.0, 1.0))
+        return OnlineEstimate(self._n_samples / self.sample_rate, key, key_confidence, tempo, tempo_confidence)
+
+    def _update(self, magnitude):
+        """
+        Folds the magnitude spectra of new frames (bins x frames) into the decayed statistics.
+        """
+        n_frames = magnitude.shape[1]
+
+        # The decayed chroma profile: each frame is scaled to a unit maximum, as in the offline chroma
+        chroma = self._fold @ (magnitude ** 2)
+        peaks = chroma.max(axis=0, keepdims=True)
+        chroma = np.divide(chroma, peaks, out=np.zeros_like(chroma), where=peaks > 0)
+        weights = self._chroma_decay ** np.arange(n_frames - 1, -1, -1)
+        self._chroma = self._chroma * self._chroma_decay ** n_frames + chroma @ weights
+
+        # The onset strength of each frame against its predecessor, carried over from the previous chunk
+        previous = magnitude[:, :1] if self._previous_magnitude is None else self._previous_magnitude
+        flux = onset_flux(np.hstack([previous, magnitude]))[1:]
+        self._previous_magnitude = magnitude[:, -1:]
+
+        decay = self._onset_decay
+        for value in flux:
+            # Center on the decayed mean, so the autocorrelation measures periodicity rather than loudness
+            self._onset_weight = decay * self._onset_weight + (1.0 - decay)
+            self._onset_mean = decay * self._onset_mean + (1.0 - decay) * value
+            self._onsets.append(value - self._onset_mean / self._onset_weight)
+            recent = self._onsets.recent()
+            self._autocorrelation *= decay
+            self._autocorrelation[:len(recent)] += recent[0] * recent
+        self._n_frames += n_frames
+
+
+class _RingBuffer:
+    """
+    A fixed-capacity buffer of floats that overwrites its oldest value when full.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._values = np.zeros(capacity)
+        self._position = 0
+        self._size = 0
+
+    def append(self, value):
+        self._values[self._position] = value
+        self._position = (self._position + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def recent(self):
+        """
+        Returns the buffered values, newest first.
+        """
+        return self._values[(self._position - 1 - np.arange(self._size)) % self.capacity]
+
+
+def _as_mono(chunk):
+    """
+    Converts a PCM chunk to mono float32, scaling integer samples to [-1, 1); unsigned PCM is offset binary.
+    """
+    chunk = np.asarray(chunk)
+    if np.issubdtype(chunk.dtype, np.integer):
+        full_scale = 2.0 ** (8 * chunk.dtype.itemsize - 1)
+        offset = full_scale if np.issubdtype(chunk.dtype, np.unsignedinteger) else 0.0
+        chunk = (chunk - offset) / full_scale
+    if chunk.ndim > 1:
+        chunk = chunk.mean(axis=1)
+    return chunk.astype(np.float32, copy=False)
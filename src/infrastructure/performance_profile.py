@@ -0,0 +1,100 @@
+"""
+Module: Performance Profiles
+Location: src/infrastructure/performance_profile.py
+Defines the named performance profiles that trade analysis accuracy for throughput: each sets the rate audio is
+decoded at, the resampler used to get there, and the FFT size and hop length of the analysis.
+
+Every profile keeps the STFT window and hop at roughly the same duration (about 93 ms and 23 ms or finer), so
+beat and onset times stay comparable across profiles; what changes is the bandwidth analyzed, the resampler
+quality and the frequency resolution. The speed and accuracy of each profile are measured by the benchmark
+harness rather than recorded here.
+"""
+
+
+class PerformanceProfile:
+    """
+    A named set of analysis parameters.
+
+    Attributes:
+        name (str): The profile name.
+        analysis_rate: The rate audio is decoded at, in Hz, or "native" to skip resampling. A fixed rate is
+            never above the file's native rate, since upsampling adds cost and no information.
+        res_type (str): The librosa resampler, from "soxr_qq" (fastest) to "soxr_vhq" (most accurate).
+        n_fft (int): The FFT size.
+        hop_length (int): The number of samples between analysis frames.
+    """
+
+    def __init__(self, name, analysis_rate, res_type, n_fft, hop_length):
+        self.name = name
+        self.analysis_rate = analysis_rate
+        self.res_type = res_type
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+
+    def analysis_rate_for(self, audio_file):
+        """
+        Returns the rate to decode an audio file at under this profile.
+
+        A rate already chosen for the file (e.g. by an AudioProbe policy) takes precedence over the profile's.
+
+        Args:
+            audio_file (AudioFile): The audio file to analyze.
+
+        Returns:
+            int: The analysis rate, or None to decode at the native rate when it is not known in advance.
+        """
+        if audio_file.analysis_sample_rate:
+            return audio_file.analysis_sample_rate
+        if self.analysis_rate == 'native':
+            return audio_file.sample_rate
+        if audio_file.sample_rate:
+            return min(self.analysis_rate, audio_file.sample_rate)
+        return self.analysis_rate
+
+    def cache_params(self):
+        """
+        Returns the profile parameters that determine analysis results, for cache and store keys.
+        """
+        return {
+            "profile": self.name,
+            "res_type": self.res_type,
+            "n_fft": self.n_fft,
+            "hop_length": self.hop_length
+        }
+
+
+# Registered profiles. "fast" analyzes up to 5.5 kHz, which still covers the 7 CQT octaves above C1 used for
+# chroma and piptrack's 4 kHz ceiling; "balanced" is the librosa default setup; "accurate" keeps the full
+# bandwidth with the best resampler and doubles the frequency resolution.
+PERFORMANCE_PROFILES = {
+    'fast': PerformanceProfile('fast', analysis_rate=11025, res_type='soxr_lq', n_fft=1024, hop_length=256),
+    'balanced': PerformanceProfile('balanced', analysis_rate=22050, res_type='soxr_hq', n_fft=2048,
+                                   hop_length=512),
+    'accurate': PerformanceProfile('accurate', analysis_rate=44100, res_type='soxr_vhq', n_fft=4096,
+                                   hop_length=512),
+}
+
+DEFAULT_PROFILE = 'balanced'
+
+
+def get_performance_profile(profile):
+    """
+    Returns a registered profile, or the balanced profile when none is named.
+
+    Args:
+        profile: The profile name, None, or a PerformanceProfile, which is returned as is.
+
+    Returns:
+        PerformanceProfile: The performance profile.
+
+    Raises:
+        ValueError: If no profile is registered under the name.
+    """
+    if isinstance(profile, PerformanceProfile):
+        return profile
+    if profile is None:
+        return PERFORMANCE_PROFILES[DEFAULT_PROFILE]
+    if profile not in PERFORMANCE_PROFILES:
+        raise ValueError(f"Unknown performance profile: {profile!r} "
+                         f"(expected one of {', '.join(PERFORMANCE_PROFILES)})")
+    return PERFORMANCE_PROFILES[profile]
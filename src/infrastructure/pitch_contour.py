@@ -0,0 +1,155 @@
+"""
+Module: Pitch Contour Extraction
+Location: src/infrastructure/pitch_contour.py
+Implements a vectorized pitch-contour stage on top of librosa's piptrack, shared by the feature extractor
+and the transcription service, and the pooling of a contour into a pitch track at a coarser resolution.
+"""
+
+import numpy as np
+import librosa
+from src.entities.musical_feature import PITCH_TRACK_DTYPE
+
+
+class PitchContour:
+    """
+    Represents the dominant pitch of every analysis frame as compact arrays.
+
+    Attributes:
+        frequencies (np.ndarray): The dominant pitch of each frame in Hz (float32, 0 when unvoiced).
+        voiced (np.ndarray): A boolean mask of frames holding a detected pitch.
+        times (np.ndarray): The time of each frame in seconds (float32).
+    """
+
+    def __init__(self, frequencies, voiced, times):
+        self.frequencies = frequencies
+        self.voiced = voiced
+        self.times = times
+
+    def __len__(self):
+        return len(self.frequencies)
+
+    def voiced_frequencies(self):
+        """
+        Returns the pitch of the voiced frames only, in frame order.
+        """
+        return self.frequencies[self.voiced]
+
+
+def extract_pitch_contour(magnitude, sr, n_fft=2048, hop_length=512, block_frames=2048):
+    """
+    Extracts the per-frame dominant pitch from an STFT magnitude spectrogram.
+
+    piptrack is run over fixed-size blocks of frames and reduced to the strongest peak per frame right away,
+    so the full-resolution pitch and magnitude matrices never exist at once: the working memory is bounded
+    by the block size, and the result is three arrays with one entry per frame.
+
+    Args:
+        magnitude (np.ndarray): The STFT magnitude spectrogram (bins x frames).
+        sr (int): The sample rate of the signal.
+        n_fft (int): The FFT size the spectrogram was computed with.
+        hop_length (int): The hop length the spectrogram was computed with.
+        block_frames (int): The number of frames handed to piptrack at a time.
+
+    Returns:
+        PitchContour: The pitch contour of the signal.
+    """
+    n_frames = magnitude.shape[1]
+    frequencies = np.zeros(n_frames, dtype=np.float32)
+
+    # piptrack only differentiates along frequency, so frame blocks are independent
+    for start in range(0, n_frames, block_frames):
+        stop = min(start + block_frames, n_frames)
+        pitches, magnitudes = librosa.core.piptrack(S=magnitude[:, start:stop], sr=sr, n_fft=n_fft,
+                                                    hop_length=hop_length)
+        strongest = magnitudes.argmax(axis=0)[np.newaxis, :]
+        frequencies[start:stop] = np.take_along_axis(pitches, strongest, axis=0)[0]
+
+    voiced = frequencies > 0
+    times = librosa.frames_to_time(np.arange(n_frames), sr=sr, hop_length=hop_length).astype(np.float32)
+    return PitchContour(frequencies, voiced, times)
+
+
+def pool_pitch_contour(contour: PitchContour, resolution='raw', pooling='median', beat_times=None):
+    """
+    Reduces a pitch contour to a pitch track at the requested resolution.
+
+    Frames are assigned to bins with one `searchsorted` (or a floor division), and only voiced frames are
+    pooled, so unvoiced gaps do not drag a bin towards zero. Bins without a voiced frame hold 0 Hz.
+
+    Args:
+        contour (PitchContour): The per-frame pitch contour.
+        resolution: "raw" for one row per frame, "beat" for one row per inter-beat interval (plus the lead-in
+            before the first beat), or a bin width in milliseconds.
+        pooling (str): "median" or "mean", applied to the voiced frames of each bin.
+        beat_times (np.ndarray): The beat times in seconds, required for the "beat" resolution.
+
+    Returns:
+        np.ndarray: A structured array of PITCH_TRACK_DTYPE, with the start time of each bin.
+    """
+    if resolution == 'raw':
+        track = np.empty(len(contour), dtype=PITCH_TRACK_DTYPE)
+        track['time'] = contour.times
+        track['frequency'] = contour.frequencies
+        return track
+
+    times = contour.times.astype(np.float64)
+    if resolution == 'beat':
+        if beat_times is None:
+            raise ValueError("The beat resolution requires beat times")
+        starts = np.concatenate(([0.0], np.asarray(beat_times, dtype=np.float64)))
+        bins = np.searchsorted(starts, times, side='right') - 1
+        n_bins = len(starts)
+    else:
+        step = float(resolution) / 1000.0
+        if step <= 0:
+            raise ValueError(f"Invalid pitch resolution: {resolution!r}")
+        bins = np.floor(times / step).astype(np.int64)
+        n_bins = int(bins[-1]) + 1 if len(bins) else 0
+        starts = np.arange(n_bins) * step
+
+    voiced_bins = bins[contour.voiced]
+    voiced_frequencies = contour.frequencies[contour.voiced].astype(np.float64)
+    counts = np.bincount(voiced_bins, minlength=n_bins)
+    pooled = np.zeros(n_bins, dtype=np.float64)
+    occupied = counts > 0
+    if pooling == 'mean':
+        sums = np.bincount(voiced_bins, weights=voiced_frequencies, minlength=n_bins)
+        pooled[occupied] = sums[occupied] / counts[occupied]
+    elif pooling == 'median':
+        # Sort by bin, then by frequency within a bin, and pick the middle element(s) of every group
+        ordered = voiced_frequencies[np.lexsort((voiced_frequencies, voiced_bins))]
+        offsets = np.cumsum(counts) - counts
+        lower = offsets[occupied] + (counts[occupied] - 1) // 2
+        upper = offsets[occupied] + counts[occupied] // 2
+        pooled[occupied] = (ordered[lower] + ordered[upper]) / 2
+    else:
+        raise ValueError(f"Unknown pitch pooling: {pooling!r}")
+
+    track = np.empty(n_bins, dtype=PITCH_TRACK_DTYPE)
+    track['time'] = starts
+    track['frequency'] = pooled
+    return track
+
+
+def pitch_outputs(contour: PitchContour, beat_times, mode='summary', resolution='raw', pooling='median'):
+    """
+    Builds the pitch entries of a feature extractor's output from a pitch contour.
+
+    Args:
+        contour (PitchContour): The pitch contour, or None when pitch tracking was skipped.
+        beat_times (np.ndarray): The beat times in seconds.
+        mode (str): "summary" for the first voiced pitches only, "contour" to add the pooled pitch track, or
+            "off" for no pitch output.
+        resolution: The pitch track resolution (see `pool_pitch_contour`).
+        pooling (str): The pitch track pooling (see `pool_pitch_contour`).
+
+    Returns:
+        dict: The "pitch" summary, plus the "pitch_track" in contour mode.
+    """
+    if mode == 'off' or contour is None:
+        return {"pitch": np.zeros(0, dtype=np.float32)}
+    # First 10 pitch values; a copy, so the contour is not kept alive
+    outputs = {"pitch": contour.voiced_frequencies()[:10].copy()}
+    if mode == 'contour':
+        outputs["pitch_track"] = pool_pitch_contour(contour, resolution, pooling, beat_times=beat_times)
+    return outputs
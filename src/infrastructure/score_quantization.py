@@ -0,0 +1,75 @@
+"""
+Module: Score Quantization
+Location: src/infrastructure/score_quantization.py
+Places transcribed note events on the detected beat grid and fills a MusicScore with them.
+"""
+
+import numpy as np
+from src.entities.music_score import MusicScore
+from src.entities.note import SCORE_NOTE_DTYPE
+
+
+def build_score(notes, beat_times, tempo, title, composer=None, divisions=4, beats_per_measure=4):
+    """
+    Builds a monophonic MusicScore from note events and the beat grid they were played against.
+
+    Note times are mapped to fractional beat positions by interpolating between the detected beats (and
+    extrapolating at the detected tempo outside them), so the score follows tempo drift, then rounded to the
+    nearest division. Overlapping notes are cut at the start of the next note.
+
+    Args:
+        notes (np.ndarray): The note events, a structured array with onset, offset, pitch and velocity fields.
+        beat_times (np.ndarray): The detected beat times in seconds.
+        tempo (float): The detected tempo in BPM.
+        title (str): The title of the score.
+        composer (str): The composer of the piece (optional).
+        divisions (int): The number of divisions per beat.
+        beats_per_measure (int): The number of beats in a measure.
+
+    Returns:
+        MusicScore: The score holding the quantized notes.
+    """
+    tempo = float(np.atleast_1d(tempo)[0]) if np.size(tempo) else 120.0
+    tempo = tempo if tempo > 0 else 120.0
+    score = MusicScore(title, composer=composer, tempo=tempo, divisions=divisions,
+                       beats_per_measure=beats_per_measure)
+    if len(notes) == 0:
+        return score
+
+    positions = _times_to_beats(np.concatenate([notes['onset'], notes['offset']]), beat_times, tempo)
+    grid = np.round(positions * divisions).astype(np.int64)
+    starts, ends = grid[:len(notes)], grid[len(notes):]
+
+    # Keep one note per grid position, then cut each note at the start of the next one
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    pitches, velocities = notes['pitch'][order], notes['velocity'][order]
+    keep = np.append(starts[1:] != starts[:-1], True)
+    starts, ends, pitches, velocities = starts[keep], ends[keep], pitches[keep], velocities[keep]
+    ends = np.minimum(ends, np.append(starts[1:], np.iinfo(np.int64).max))
+    durations = np.maximum(ends - starts, 1)
+
+    score_notes = np.empty(len(starts), dtype=SCORE_NOTE_DTYPE)
+    score_notes['pitch'], score_notes['start'] = pitches, starts
+    score_notes['duration'], score_notes['velocity'] = durations, velocities
+    score.add_notes(score_notes)
+    return score
+
+
+def _times_to_beats(times, beat_times, tempo):
+    """
+    Converts times in seconds into fractional beat positions along the beat grid.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    beat_times = np.asarray(beat_times, dtype=np.float64)
+    seconds_per_beat = 60.0 / tempo
+    if len(beat_times) < 2:
+        return times / seconds_per_beat
+
+    positions = np.interp(times, beat_times, np.arange(len(beat_times), dtype=np.float64))
+    before, after = times < beat_times[0], times > beat_times[-1]
+    positions[before] = (times[before] - beat_times[0]) / seconds_per_beat
+    positions[after] = len(beat_times) - 1 + (times[after] - beat_times[-1]) / seconds_per_beat
+
+    # Shift by whole beats so notes preceding the first beat still land at non-negative positions
+    return positions - min(np.floor(positions.min()), 0.0)
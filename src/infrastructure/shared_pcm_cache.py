@@ -0,0 +1,206 @@
+"""
+Module: Shared PCM Cache
+Location: src/infrastructure/shared_pcm_cache.py
+Implements an on-disk cache of decoded float32 PCM shared by every worker process: a file is decoded once per
+content and analysis rate, written to a cache file, and memory-mapped read-only by each process that needs it,
+so the transcription and feature workers of one upload share the decoded pages instead of decoding twice.
+
+Each process holds a shared advisory lock (flock) on every entry it has mapped, which the kernel releases when
+the mapping is dropped or the process dies; these locks are the entries' reference counts. Eviction keeps the
+cache within a disk budget by deleting the least recently used entries no process holds.
+"""
+
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+import weakref
+
+import librosa
+import numpy as np
+from src.infrastructure.content_hash import content_hash
+from src.use_cases.instrumentation import span
+
+# Cache file layout: a fixed header (magic, sample rate, channels, frames), then C-ordered float32 samples.
+# The header is padded to 64 bytes so the samples stay aligned for vectorized reads.
+_HEADER = struct.Struct('<8sIIQ')
+_HEADER_SIZE = 64
+_MAGIC = b'PCMF32\x00\x01'
+_SUFFIX = '.pcm'
+
+
+class SharedPCMCache:
+    """
+    Caches decoded audio as memory-mapped float32 files keyed by content hash, analysis rate, channel layout
+    and resampler.
+
+    Entries are written to a temporary file and renamed into place, so a reader never sees a partial entry;
+    concurrent misses on the same key wait on a per-key lock and the first one decodes. Arrays returned by
+    `load` are read-only views of the shared pages and must not be written to.
+
+    Attributes:
+        root_dir (str): The directory holding the cache files.
+        max_bytes (int): The disk budget of the cache files; least recently used entries that no process has
+            mapped are evicted beyond it.
+    """
+
+    def __init__(self, root_dir, max_bytes=4 * 1024 * 1024 * 1024):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        os.makedirs(root_dir, exist_ok=True)
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def load(self, file_path, sample_rate=None, mono=True, res_type='soxr_hq'):
+        """
+        Returns the decoded signal of an audio file, mapping the shared entry or decoding it on a miss.
+
+        Args:
+            file_path (str): Path to the audio file.
+            sample_rate (int): The target sample rate, or None to keep the native rate.
+            mono (bool): Whether to downmix the signal to mono.
+            res_type (str): The librosa resampler used when the target rate differs from the native rate.
+
+        Returns:
+            tuple: The decoded signal (a read-only float32 array over the mapped entry) and its sample rate (int).
+        """
+        key = self._make_key(file_path, sample_rate, mono, res_type)
+        path = os.path.join(self.root_dir, key + _SUFFIX)
+        entry = self._map(path)
+        if entry is not None:
+            return entry
+
+        # Serialize decoders of the same key; whoever waited finds the entry written
+        with open(os.path.join(self.root_dir, key + '.lock'), 'a+') as key_lock:
+            fcntl.flock(key_lock, fcntl.LOCK_EX)
+            entry = self._map(path)
+            if entry is None:
+                y, sr = librosa.load(file_path, sr=sample_rate, mono=mono, res_type=res_type)
+                self._write(path, y, sr)
+                entry = self._map(path)
+        self.evict()
+        return entry
+
+    def evict(self, max_bytes=None):
+        """
+        Deletes the least recently used entries that no process has mapped until the cache fits the budget.
+
+        Args:
+            max_bytes (int): The budget to enforce (defaults to `max_bytes`); 0 deletes every unmapped entry.
+
+        Returns:
+            int: The number of bytes the remaining entries occupy.
+        """
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        for name in os.listdir(self.root_dir):
+            if name.endswith(_SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(self.root_dir, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, name in sorted(entries):
+            if total <= budget:
+                break
+            path = os.path.join(self.root_dir, name)
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                total -= size
+                continue
+            try:
+                # A mapped entry holds a shared lock, so the exclusive lock fails while any process uses it
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            finally:
+                os.close(fd)
+            total -= size
+            try:
+                os.remove(path[:-len(_SUFFIX)] + '.lock')
+            except FileNotFoundError:
+                pass
+        return total
+
+    def __getstate__(self):
+        # Memoized hashes and the lock are process-local
+        return {'root_dir': self.root_dir, 'max_bytes': self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state['root_dir'], state['max_bytes'])
+
+    def _make_key(self, file_path, sample_rate, mono, res_type):
+        """
+        Builds the entry key from the file's content hash, memoized while the file is unchanged.
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with self._lock:
+            digest = self._hashes.get((path, stat.st_size, stat.st_mtime_ns))
+        if digest is None:
+            with span('content_hash'):
+                digest = content_hash(path)
+            with self._lock:
+                self._hashes[(path, stat.st_size, stat.st_mtime_ns)] = digest
+        layout = 'mono' if mono else 'multi'
+        return f"{digest}-{sample_rate or 'native'}-{layout}-{res_type}"
+
+    def _map(self, path):
+        """
+        Maps an entry read-only and takes a shared lock on it for as long as the mapping lives.
+
+        The entry is mapped from the locked descriptor rather than reopened by name, so the mapping is the
+        locked file even if the entry is evicted or replaced meanwhile; an evicted file stays readable until
+        unmapped.
+
+        Returns:
+            tuple: The signal and its sample rate, or None if the entry does not exist.
+        """
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            magic, sr, channels, frames = _HEADER.unpack(os.pread(fd, _HEADER.size, 0))
+            if magic != _MAGIC:
+                raise ValueError(f"Not a PCM cache entry: {path}")
+            mapping = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            os.close(fd)
+            raise
+        # The lock is released once the mapping (and every array over it) is garbage collected
+        weakref.finalize(mapping, os.close, fd)
+        shape = (frames,) if channels == 1 else (channels, frames)
+        y = np.frombuffer(mapping, dtype=np.float32, count=channels * frames, offset=_HEADER_SIZE).reshape(shape)
+        # Mark the entry as recently used for eviction
+        now = time.time()
+        os.utime(fd, (now, now))
+        return y, sr
+
+    def _write(self, path, y, sr):
+        """
+        Writes an entry to a temporary file and renames it into place.
+        """
+        y = np.ascontiguousarray(y, dtype=np.float32)
+        channels, frames = (1, y.shape[0]) if y.ndim == 1 else y.shape
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, 'wb') as sink:
+                sink.write(_HEADER.pack(_MAGIC, int(sr), channels, frames).ljust(_HEADER_SIZE, b'\0'))
+                sink.write(y.tobytes())
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
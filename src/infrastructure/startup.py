@@ -0,0 +1,93 @@
+"""
+Module: Startup
+Location: src/infrastructure/startup.py
+Prepares a process for analysis ahead of its first request. librosa loads its submodules lazily, so importing
+the services is cheap, but the first STFT, beat track and CQT pull in SciPy and numba, compile (or load from
+the numba cache) librosa's JIT kernels and build filterbanks, which takes seconds. The warm-up routine pays
+those costs on a short synthetic signal, and the numba cache directory can be pointed at persistent storage
+so compiled kernels survive restarts and fresh containers.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import soundfile as sf
+from src.entities.audio_file import AudioFile
+from src.infrastructure.audio_cache import DecodedAudioCache
+from src.infrastructure.librosa_feature_extractor import LibrosaFeatureExtractor
+from src.infrastructure.librosa_transcription_service import LibrosaTranscriptionService
+from src.infrastructure.performance_profile import DEFAULT_PROFILE, get_performance_profile
+from src.use_cases.instrumentation import SpanRecorder, span
+
+# The rate the synthetic warm-up file is written at, so decoding also exercises the resampler
+WARM_UP_FILE_RATE = 44100
+
+
+def configure_numba_cache(cache_dir):
+    """
+    Points numba's on-disk cache of compiled kernels at a directory, e.g. a volume shared by the workers or
+    baked into the image after a warm-up. Must be called before the first analysis: kernels compiled earlier
+    in the process keep the cache location they were created with.
+
+    Args:
+        cache_dir (str): The cache directory; created if missing.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    os.environ['NUMBA_CACHE_DIR'] = os.path.abspath(cache_dir)
+    if 'numba' in sys.modules:
+        sys.modules['numba'].core.config.reload_config()
+
+
+def synthetic_signal(sr, duration=4.0, tempo=120.0):
+    """
+    Builds a short signal touching every analysis stage: a sustained A major triad with a click on every beat.
+
+    Args:
+        sr (int): The sample rate.
+        duration (float): The length in seconds.
+        tempo (float): The click rate in BPM.
+
+    Returns:
+        np.ndarray: The mono signal (float32).
+    """
+    t = np.arange(int(sr * duration)) / sr
+    y = sum(0.2 * np.sin(2 * np.pi * frequency * t) for frequency in (220.0, 277.18, 329.63))
+    click = np.exp(-np.arange(int(0.02 * sr)) / (0.003 * sr))
+    for start in (np.arange(0, duration, 60.0 / tempo) * sr).astype(int):
+        stop = min(start + len(click), len(y))
+        y[start:stop] += click[:stop - start]
+    return (y / np.abs(y).max()).astype(np.float32)
+
+
+def warm_up(profile=DEFAULT_PROFILE, genre='general', duration=4.0):
+    """
+    Runs decoding, feature extraction and transcription once on a synthetic signal, so the first real request
+    does not pay for imports, JIT compilation and filterbank construction.
+
+    Args:
+        profile: The performance profile whose analysis rate and FFT sizes to warm (name or PerformanceProfile).
+        genre (str): The genre profile for key estimation.
+        duration (float): The length of the synthetic signal in seconds.
+
+    Returns:
+        Diagnostics: The timings of the warm-up stages.
+    """
+    profile = get_performance_profile(profile)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'warm_up.wav')
+        sf.write(path, synthetic_signal(WARM_UP_FILE_RATE, duration), WARM_UP_FILE_RATE)
+        # No profile name on the file, so the services use the profile object, which may not be registered
+        audio_file = AudioFile(path, 'wav', duration, WARM_UP_FILE_RATE, channels=1)
+
+        # A private cache, so the warm-up signal never occupies the services' caches
+        audio_cache = DecodedAudioCache()
+        with SpanRecorder() as recorder, span('warm_up'):
+            with span('decode'):
+                y, _ = audio_cache.load(path, profile.analysis_rate_for(audio_file), res_type=profile.res_type)
+            with span('features'):
+                LibrosaFeatureExtractor(genre, audio_cache, profile=profile).extract(audio_file, y=y)
+            with span('transcription'):
+                LibrosaTranscriptionService(audio_cache, profile=profile).transcribe(audio_file, y=y)
+    return recorder.diagnostics()
@@ -0,0 +1,135 @@
+"""
+Module: Streaming Analysis
+Location: src/infrastructure/streaming_analysis.py
+Implements a block-wise analysis mode for long recordings: the file is decoded in fixed-size blocks with
+librosa.stream, and chroma, onset and pitch statistics are accumulated incrementally, so peak memory does
+not depend on the length of the track.
+"""
+
+import numpy as np
+import librosa
+from src.infrastructure.pitch_contour import PitchContour, extract_pitch_contour
+
+
+class StreamingAnalysis:
+    """
+    Holds the statistics accumulated by a streaming pass over an audio file.
+
+    Only per-frame scalars (onset strength, pitch) grow with the track, at a few bytes per frame; the
+    chroma is kept as a running sum.
+
+    Attributes:
+        sr (int): The native sample rate the file was analyzed at.
+        hop_length (int): The hop length between analysis frames.
+        n_frames (int): The number of analyzed frames.
+        chroma_sum (np.ndarray): The sum of the per-frame normalized chroma vectors (12,), or None.
+        onset_envelope (np.ndarray): The onset strength envelope (mean aggregation), or None.
+        beat_onset_envelope (np.ndarray): The onset strength envelope (median aggregation), or None.
+        pitch_contour (PitchContour): The per-frame dominant pitch, or None.
+        time_offset (float): The time of frame 0 in seconds (frames are not centered in streaming mode).
+    """
+
+    def __init__(self, sr, hop_length, n_frames, chroma_sum, onset_envelope, beat_onset_envelope, pitch_contour,
+                 time_offset):
+        self.sr = sr
+        self.hop_length = hop_length
+        self.n_frames = n_frames
+        self.chroma_sum = chroma_sum
+        self.onset_envelope = onset_envelope
+        self.beat_onset_envelope = beat_onset_envelope
+        self.pitch_contour = pitch_contour
+        self.time_offset = time_offset
+
+    def chroma_mean(self):
+        """
+        Returns the average chroma profile across the whole file.
+        """
+        return self.chroma_sum / max(self.n_frames, 1)
+
+    def beats(self):
+        """
+        Tracks beats from the accumulated onset envelope.
+
+        Returns:
+            tuple: The estimated tempo (float) and the beat frame indices (np.ndarray).
+        """
+        return librosa.beat.beat_track(onset_envelope=self.beat_onset_envelope, sr=self.sr,
+                                       hop_length=self.hop_length)
+
+    def frames_to_time(self, frames):
+        """
+        Converts frame indices of this analysis into times in seconds.
+        """
+        return librosa.frames_to_time(frames, sr=self.sr, hop_length=self.hop_length) + self.time_offset
+
+
+def analyze_stream(file_path, n_fft=2048, hop_length=512, block_length=256, chroma=True, onsets=True, pitch=True):
+    """
+    Analyzes an audio file block by block without loading it whole.
+
+    Each block holds `block_length` frames; librosa.stream overlaps consecutive blocks so the frames line up
+    exactly with an uncentered STFT of the whole file. The onset flux is carried across block boundaries by
+    keeping the last log-mel frame of the previous block. Blocks are decoded at the file's native sample rate,
+    since librosa.stream does not resample.
+
+    Args:
+        file_path (str): Path to the audio file.
+        n_fft (int): The FFT size.
+        hop_length (int): The hop length between frames.
+        block_length (int): The number of frames per decoded block.
+        chroma (bool): Whether to accumulate the chroma histogram.
+        onsets (bool): Whether to accumulate the onset strength envelopes.
+        pitch (bool): Whether to accumulate the pitch contour.
+
+    Returns:
+        StreamingAnalysis: The accumulated statistics.
+    """
+    sr = librosa.get_samplerate(file_path)
+    stream = librosa.stream(file_path, block_length=block_length, frame_length=n_fft, hop_length=hop_length,
+                            mono=True, fill_value=0)
+    mel_basis = librosa.filters.mel(sr=sr, n_fft=n_fft) if onsets else None
+
+    n_frames = 0
+    chroma_sum = np.zeros(12) if chroma else None
+    onset_blocks, beat_onset_blocks, pitch_blocks = [], [], []
+    previous_log_mel = None
+
+    for y_block in stream:
+        magnitude = np.abs(librosa.stft(y_block, n_fft=n_fft, hop_length=hop_length, center=False))
+        n_frames += magnitude.shape[1]
+
+        if chroma:
+            # A fixed tuning keeps the per-block chroma consistent and skips per-block tuning estimation
+            chroma_block = librosa.feature.chroma_stft(S=magnitude ** 2, sr=sr, n_fft=n_fft, tuning=0.0)
+            chroma_sum += chroma_block.sum(axis=1)
+
+        if onsets:
+            log_mel = librosa.power_to_db(mel_basis @ magnitude ** 2, top_db=None)
+            reference = log_mel[:, :1] if previous_log_mel is None else previous_log_mel
+            flux = np.maximum(0.0, np.diff(log_mel, axis=1, prepend=reference))
+            onset_blocks.append(flux.mean(axis=0).astype(np.float32))
+            beat_onset_blocks.append(np.median(flux, axis=0).astype(np.float32))
+            previous_log_mel = log_mel[:, -1:]
+
+        if pitch:
+            contour = extract_pitch_contour(magnitude, sr, n_fft=n_fft, hop_length=hop_length)
+            pitch_blocks.append(contour.frequencies)
+
+    time_offset = n_fft / (2.0 * sr)
+    pitch_contour = None
+    if pitch:
+        frequencies = np.concatenate(pitch_blocks) if pitch_blocks else np.zeros(0, dtype=np.float32)
+        times = (librosa.frames_to_time(np.arange(n_frames), sr=sr, hop_length=hop_length)
+                 + time_offset).astype(np.float32)
+        pitch_contour = PitchContour(frequencies, frequencies > 0, times)
+
+    return StreamingAnalysis(
+        sr=sr,
+        hop_length=hop_length,
+        n_frames=n_frames,
+        chroma_sum=chroma_sum,
+        onset_envelope=np.concatenate(onset_blocks) if onsets and onset_blocks else None,
+        beat_onset_envelope=np.concatenate(beat_onset_blocks) if onsets and beat_onset_blocks else None,
+        pitch_contour=pitch_contour,
+        time_offset=time_offset
+    )
@@ -5,5 +5,9 @@ Contains controllers to interface between the external world (e.g., HTTP request
 
 from .audio_upload_controller import AudioUploadController
 from .feature_extraction_controller import FeatureExtractionController
+from .http_service import AudioHttpService
+from .metrics import StageMetrics, diagnostics_to_dict
+from .result_codec import decode_result, encode_result, result_to_json
 
-__all__ = ['AudioUploadController', 'FeatureExtractionController']
\ No newline at end of file
+__all__ = ['AudioUploadController', 'FeatureExtractionController', 'AudioHttpService', 'StageMetrics', 'diagnostics_to_dict',
+           'encode_result', 'decode_result', 'result_to_json']
\ No newline at end of file
@@ -13,26 +13,46 @@ class AudioUploadController:
 
     Attributes:
         transcribe_audio_to_score_use_case (TranscribeAudioToScore): The use case for audio transcription.
+        audio_probe: Reads the audio file's metadata from its header (optional; the request's metadata is
+         used otherwise).
     """
 
-    def __init__(self, transcribe_audio_to_score_use_case: TranscribeAudioToScore):
+    def __init__(self, transcribe_audio_to_score_use_case: TranscribeAudioToScore, audio_probe=None):
         self.transcribe_audio_to_score_use_case = transcribe_audio_to_score_use_case
+        self.audio_probe = audio_probe
 
     def upload_audio(self, request):
         """
         Handles the audio upload request, converts it to an AudioFile entity, and invokes the transcription use case.
 
         Args:
-            request: The incoming request object that contains the audio file.
+            request: The incoming request object that contains the audio file; it may also set 'profile',
+                'diagnostics' (record stage timings), 'capture' ("cprofile" or "tracemalloc") and 'backend' (the
+                analysis backend's name).
 
         Returns:
             TranscriptionResult: The result of the audio transcription process.
         """
-        audio_file = AudioFile(
+        audio_file = self._build_audio_file(request)
+        result = self.transcribe_audio_to_score_use_case.execute(audio_file,
+                                                                 diagnostics=request.get('diagnostics', False),
+                                                                 capture=request.get('capture'),
+                                                                 backend=request.get('backend'))
+        return result
+
+    def _build_audio_file(self, request):
+        """
+        Builds the AudioFile entity, probing the file itself when a probe is configured instead of trusting the
+        request-supplied metadata. The request may select a performance profile under 'profile'.
+        """
+        if self.audio_probe is not None:
+            audio_file = self.audio_probe.probe(request['file']['path'])
+            audio_file.profile = request.get('profile')
+            return audio_file
+        return AudioFile(
             file_path=request['file']['path'],
             format=request['file']['format'],
             duration=request['file']['duration'],
-            sample_rate=request['file']['sample_rate']
+            sample_rate=request['file']['sample_rate'],
+            profile=request.get('profile')
         )
-        result = self.transcribe_audio_to_score_use_case.execute(audio_file)
-        return result
\ No newline at end of file
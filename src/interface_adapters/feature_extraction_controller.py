@@ -14,26 +14,54 @@ class FeatureExtractionController:
 
     Attributes:
         extract_musical_features_use_case (ExtractMusicalFeatures): The use case for extracting musical features.
+        audio_probe: Reads the audio file's metadata from its header (optional; the request's metadata is
+         used otherwise).
     """
 
-    def __init__(self, extract_musical_features_use_case: ExtractMusicalFeatures):
+    def __init__(self, extract_musical_features_use_case: ExtractMusicalFeatures, audio_probe=None):
         self.extract_musical_features_use_case = extract_musical_features_use_case
+        self.audio_probe = audio_probe
 
     def extract_features(self, request):
         """
         Handles the request to extract musical features from an uploaded audio file.
 
         Args:
-            request: The incoming request object that contains the audio file.
+            request: The incoming request object that contains the audio file; it may also set 'profile',
+                'diagnostics' (record stage timings), 'capture' ("cprofile" or "tracemalloc"), 'features' (the
+                features to compute, e.g. ["key"]; all by default), 'pitch_mode'
+                ("summary", "contour" or "off"), 'pitch_resolution' ("raw", "beat" or milliseconds) and
+                'pitch_pooling' ("median" or "mean") and 'backend' (the analysis backend's name).
 
         Returns:
             MusicalFeature: The extracted musical features.
         """
-        audio_file = AudioFile(
+        audio_file = self._build_audio_file(request)
+        features = self.extract_musical_features_use_case.execute(audio_file,
+                                                                  diagnostics=request.get('diagnostics', False),
+                                                                  capture=request.get('capture'),
+                                                                  features=request.get('features'),
+                                                                  pitch_mode=request.get('pitch_mode', 'summary'),
+                                                                  pitch_resolution=request.get('pitch_resolution',
+                                                                                               'raw'),
+                                                                  pitch_pooling=request.get('pitch_pooling',
+                                                                                            'median'),
+                                                                  backend=request.get('backend'))
+        return features
+
+    def _build_audio_file(self, request):
+        """
+        Builds the AudioFile entity, probing the file itself when a probe is configured instead of trusting the
+        request-supplied metadata. The request may select a performance profile under 'profile'.
+        """
+        if self.audio_probe is not None:
+            audio_file = self.audio_probe.probe(request['file']['path'])
+            audio_file.profile = request.get('profile')
+            return audio_file
+        return AudioFile(
             file_path=request['file']['path'],
             format=request['file']['format'],
             duration=request['file']['duration'],
-            sample_rate=request['file']['sample_rate']
+            sample_rate=request['file']['sample_rate'],
+            profile=request.get('profile')
         )
-        features = self.extract_musical_features_use_case.execute(audio_file)
-        return features
\ No newline at end of file
@@ -0,0 +1,578 @@
+"""
+Module: HTTP Service
+Location: interface_adapters/http_service.py
+Exposes the audio upload and feature extraction controllers over a small asyncio HTTP/1.1 service.
+Uploads are streamed to disk, jobs go through a JobScheduler (coalescing identical uploads, prioritizing short
+recordings) into a process pool, and clients poll job status and fetch results. Stage timings of every job are
+aggregated and exposed for Prometheus.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from src.entities.musical_feature import FEATURE_NAMES
+from src.interface_adapters.metrics import StageMetrics, diagnostics_to_dict
+from src.interface_adapters.result_codec import NPZ_MEDIA_TYPE, encode_result, result_to_json
+from src.use_cases.extract_musical_features import PITCH_MODES, PITCH_POOLINGS, parse_pitch_resolution
+from src.use_cases.instrumentation import CAPTURE_MODES, DeadlineExceededError, deadline
+from src.use_cases.job_scheduler import JobScheduler, QueueFullError
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+
+# The controllers of a pool worker, built once per worker process and genre by `_controllers_for`
+_worker_controller_factory = None
+_worker_controllers = {}
+
+
+class HttpError(Exception):
+    """
+    Raised while handling a request to answer it with an HTTP error status.
+    """
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class Job:
+    """
+    Represents one transcription or feature extraction request handled by the service.
+
+    Attributes:
+        job_id (str): The identifier clients poll with.
+        kind (str): Either "transcription" or "features".
+        status (str): One of "queued", "running", "done", "failed" or "timeout".
+        result: The MusicalFeature or TranscriptionResult once done.
+        error (str): The failure description, if any.
+        created_at (float): The time the job was accepted.
+        finished_at (float): The time the job finished, if it did.
+    """
+
+    def __init__(self, job_id, kind):
+        self.job_id = job_id
+        self.kind = kind
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.future = None
+
+    def describe(self):
+        status = self.status
+        if status == "queued" and self.future is not None and self.future.running():
+            status = "running"
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+class AudioHttpService:
+    """
+    An asyncio HTTP service in front of the upload and feature extraction controllers.
+
+    Endpoints:
+        POST /transcriptions, POST /features: The request body is the raw audio file; the query string may carry
+            `filename` (for the format), `genre`, `profile` (the performance profile) and `capture`
+            ("cprofile" or "tracemalloc", to profile the job); feature requests may add `features` (a
+            comma-separated subset of tempo, key, pitch and rhythm; only their stages run), `pitch_mode` ("summary",
+            "contour" or "off"), `pitch_resolution` ("raw", "beat" or milliseconds) and `pitch_pooling`
+            ("median" or "mean"); any request may select an analysis backend with `backend`. Answers 202 with the
+            job id, 400 for an unknown backend, genre, profile or option, 413 when the upload is too large, 415 when it cannot be
+            read as audio and 503 when the scheduler queue is full. Concurrent uploads of the same content with the
+            same parameters get their own job ids but share one execution.
+        GET /jobs/{id}: The job status.
+        GET /jobs/{id}/result: The result as an .npz archive of typed arrays (see result_codec); as JSON
+            (MIDI data base64-encoded) with `?format=json` or `Accept: application/json`.
+        GET /jobs/{id}/midi, GET /jobs/{id}/score: The transcription as a MIDI file or MusicXML document; the
+            document is generated measure by measure and sent with chunked transfer encoding.
+        GET /jobs/{id}/diagnostics: The job's stage timings, and its profile or allocation capture if requested.
+        GET /metrics: The stage timings of all jobs so far, in the Prometheus text format.
+
+    Attributes:
+        upload_dir (str): The directory uploads are streamed into.
+        scheduler (JobScheduler): The scheduler jobs are submitted to.
+        metrics (StageMetrics): The stage timings aggregated over every executed job.
+        job_timeout (float): The seconds a job may take from its upload before it is reported as timed out; its
+            execution is abandoned at the next stage boundary, freeing its worker and scheduler slot.
+        max_upload_bytes (int): The largest accepted upload.
+        io_timeout (float): The seconds a client may stall while sending its request.
+        jobs (dict): The known jobs by id.
+    """
+
+    def __init__(self, controller_factory, upload_dir, max_workers=None, max_pending_jobs=8, job_timeout=600.0,
+                 max_upload_bytes=512 * 1024 * 1024, io_timeout=30.0, max_retained_jobs=1000, scheduler=None,
+                 audio_probe=None, warm_up=None, backends=None, genres=None, profiles=None):
+        """
+        Args:
+            controller_factory: A picklable callable taking a genre and returning the
+                (AudioUploadController, FeatureExtractionController) pair; called once per worker and genre.
+            upload_dir (str): The directory uploads are streamed into.
+            max_workers (int): The number of worker processes (defaults to the CPU count).
+            max_pending_jobs (int): The number of waiting jobs beyond which uploads are rejected (ignored when a
+                scheduler is given).
+            job_timeout (float): The seconds a job may run before it is reported as timed out.
+            max_upload_bytes (int): The largest accepted upload.
+            io_timeout (float): The seconds a client may stall while sending its request.
+            max_retained_jobs (int): The number of finished jobs kept for polling.
+            scheduler (JobScheduler): The scheduler to submit jobs to; by default one with a thread per worker
+                process.
+            audio_probe: Reads each upload's metadata from its header before it is scheduled, so jobs are
+                laned by their real duration and keyed by the rate they are analyzed at (optional).
+            warm_up: A picklable zero-argument callable preparing a process for analysis, run before the service
+                starts listening (optional). With forked workers it runs once in the service process and the
+                workers inherit its effect; otherwise it runs in each worker as it starts.
+            backends (BackendRegistry): The analysis backends the controllers resolve, used to reject requests for
+                an unknown backend, or one lacking the requested service, before their upload (optional).
+            genres: The names of the genre profiles requests may select; others are rejected before their upload,
+                since each worker keeps a set of controllers per genre (optional).
+            profiles: The names of the performance profiles requests may select; others are rejected before
+                their upload (optional).
+        """
+        self.controller_factory = controller_factory
+        self.upload_dir = upload_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.scheduler = scheduler if scheduler is not None else JobScheduler(workers=self.max_workers,
+                                                                                max_queue=max_pending_jobs)
+        self.job_timeout = job_timeout
+        self.max_upload_bytes = max_upload_bytes
+        self.io_timeout = io_timeout
+        self.max_retained_jobs = max_retained_jobs
+        self.audio_probe = audio_probe
+        self.warm_up = warm_up
+        self.backends = backends
+        self.genres = None if genres is None else frozenset(genres)
+        self.profiles = None if profiles is None else frozenset(profiles)
+        self.metrics = StageMetrics()
+        self.jobs = {}
+        self._executor = None
+        self._server = None
+        self._tasks = set()
+
+    async def start(self, host='127.0.0.1', port=8000):
+        """
+        Starts the worker pool and begins listening.
+
+        Returns:
+            asyncio.base_events.Server: The listening server; its sockets give the bound port when port is 0.
+        """
+        os.makedirs(self.upload_dir, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        forks = multiprocessing.get_start_method() == 'fork'
+        if self.warm_up is not None and forks:
+            await loop.run_in_executor(None, self.warm_up)
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                             initargs=(self.controller_factory, None if forks else self.warm_up))
+        # Start the workers before listening: workers forked later would inherit open client sockets and keep
+        # those connections from closing
+        await loop.run_in_executor(self._executor, os.getpid)
+        self._server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        return self._server
+
+    async def close(self):
+        """
+        Stops listening, waits for running jobs and shuts the worker pool down.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.scheduler.shutdown(wait=False)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def serve_forever(self, host='127.0.0.1', port=8000):
+        server = await self.start(host, port)
+        try:
+            await server.serve_forever()
+        finally:
+            await self.close()
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Handles one request per connection and closes it.
+        """
+        try:
+            try:
+                method, target, headers = await asyncio.wait_for(self._read_head(reader), self.io_timeout)
+                status, content_type, body, extra_headers = await self._route(method, target, headers, reader)
+            except HttpError as error:
+                status, content_type, extra_headers = error.status, 'application/json', error.headers
+                body = json.dumps({"error": error.message}).encode('utf-8')
+            except asyncio.TimeoutError:
+                status, content_type, extra_headers = 408, 'application/json', {}
+                body = json.dumps({"error": "Request timeout"}).encode('utf-8')
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as error:
+                # Still answer the client; the upload, if any, has been removed by the handler
+                status, content_type, extra_headers = 500, 'application/json', {}
+                body = json.dumps({"error": f"{type(error).__name__}: {error}"}).encode('utf-8')
+            await self._write_response(writer, status, content_type, body, extra_headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_head(self, reader):
+        """
+        Reads and parses the request line and headers.
+        """
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.LimitOverrunError:
+            raise HttpError(431, "Request headers too large")
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, headers
+
+    async def _route(self, method, target, headers, reader):
+        """
+        Dispatches a request to its handler.
+
+        Returns:
+            tuple: The status, content type, body (bytes) and extra headers of the response.
+        """
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split('/') if part]
+
+        if method == 'POST' and parts in (['transcriptions'], ['features']):
+            kind = 'transcription' if parts[0] == 'transcriptions' else 'features'
+            job = await self._accept_upload(kind, query, headers, reader)
+            return 202, 'application/json', _json_bytes(job.describe()), {'Location': f'/jobs/{job.job_id}'}
+
+        if method == 'GET' and parts == ['metrics']:
+            return 200, 'text/plain; version=0.0.4; charset=utf-8', self.metrics.render().encode('utf-8'), {}
+
+        if method == 'GET' and len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.jobs.get(parts[1])
+            if job is None:
+                raise HttpError(404, "Unknown job")
+            if len(parts) == 2:
+                return 200, 'application/json', _json_bytes(job.describe()), {}
+            return self._job_result(job, parts[2], query, headers)
+
+        raise HttpError(404, "Not found")
+
+    async def _accept_upload(self, kind, query, headers, reader):
+        """
+        Streams an upload to disk and schedules its job, rejecting it when the service is saturated.
+        """
+        if self.scheduler.is_full():
+            raise HttpError(503, "Too many pending jobs", {'Retry-After': '5'})
+        if 'content-length' not in headers:
+            raise HttpError(411, "Content-Length required")
+        try:
+            length = int(headers['content-length'])
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length")
+        if length <= 0:
+            raise HttpError(400, "Empty upload")
+        if length > self.max_upload_bytes:
+            raise HttpError(413, "Upload too large")
+        try:
+            sample_rate = int(query.get('sample_rate', 44100))
+        except ValueError:
+            raise HttpError(400, f"Invalid sample rate: {query['sample_rate']}")
+        if sample_rate <= 0:
+            raise HttpError(400, f"Invalid sample rate: {query['sample_rate']}")
+        genre = query.get('genre', 'general')
+        if self.genres is not None and genre not in self.genres:
+            raise HttpError(400, f"Unknown genre: {genre}")
+        capture = query.get('capture')
+        if capture is not None and capture not in CAPTURE_MODES:
+            raise HttpError(400, f"Unknown capture mode: {capture}")
+        profile = query.get('profile')
+        if profile is not None and self.profiles is not None and profile not in self.profiles:
+            raise HttpError(400, f"Unknown profile: {profile}")
+        backend = query.get('backend')
+        service = 'transcription_service' if kind == 'transcription' else 'feature_extractor'
+        if backend is not None and self.backends is not None and not self.backends.provides(backend, service):
+            raise HttpError(400, f"Unknown backend for {kind}: {backend}")
+        feature_options = {}
+        if kind == 'features':
+            features = None
+            if query.get('features'):
+                features = tuple(sorted(set(query['features'].split(','))))
+                unknown = [feature for feature in features if feature not in FEATURE_NAMES]
+                if unknown:
+                    raise HttpError(400, f"Unknown features: {', '.join(unknown)}")
+            feature_options = {'features': features,
+                               'pitch_mode': query.get('pitch_mode', 'summary'),
+                               'pitch_pooling': query.get('pitch_pooling', 'median')}
+            if feature_options['pitch_mode'] not in PITCH_MODES:
+                raise HttpError(400, f"Unknown pitch mode: {feature_options['pitch_mode']}")
+            if feature_options['pitch_pooling'] not in PITCH_POOLINGS:
+                raise HttpError(400, f"Unknown pitch pooling: {feature_options['pitch_pooling']}")
+            try:
+                feature_options['pitch_resolution'] = parse_pitch_resolution(query.get('pitch_resolution', 'raw'))
+            except ValueError:
+                raise HttpError(400, f"Invalid pitch resolution: {query.get('pitch_resolution')}")
+
+        filename = os.path.basename(query.get('filename', 'upload'))
+        extension = os.path.splitext(filename)[1].lower()
+        job = Job(uuid.uuid4().hex, kind)
+        path = os.path.join(self.upload_dir, f"{job.job_id}{extension}")
+        request = {
+            'file': {
+                'path': path,
+                'format': extension.lstrip('.') or query.get('format'),
+                'duration': None,
+                'sample_rate': sample_rate
+            },
+            'genre': genre,
+            'profile': profile,
+            'diagnostics': True,
+            'deadline': None,
+            'capture': capture,
+            'backend': backend,
+            **feature_options
+        }
+
+        # Every parameter is validated by now; from here on, any failure removes the written upload
+        try:
+            digest = await self._stream_to_file(reader, path, length)
+            key = (kind, digest, genre, profile, capture, backend, tuple(sorted(feature_options.items())))
+            job.future = await self._schedule(key, kind, request)
+        except BaseException:
+            _remove_quietly(path)
+            raise
+        # Each upload is removed once its execution has finished
+        job.future.add_done_callback(lambda _: _remove_quietly(path))
+
+        self._retain(job)
+        task = asyncio.create_task(self._run_job(job, job.future))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _schedule(self, key, kind, request):
+        """
+        Probes a written upload and submits its job to the scheduler under its key, extended with the rate the
+        upload is analyzed at. Identical content and parameters share one execution.
+
+        Returns:
+            concurrent.futures.Future: The future of the (possibly shared) execution.
+        """
+        # The execution is bounded by the timeout of the job that starts it; jobs joining it later share it
+        request['deadline'] = time.time() + self.job_timeout
+        analysis_rate = request['file']['sample_rate']
+        if self.audio_probe is not None:
+            path = request['file']['path']
+            try:
+                audio_file = await asyncio.get_running_loop().run_in_executor(None, self.audio_probe.probe, path)
+            except Exception:
+                raise HttpError(415, "Unsupported or unreadable audio file")
+            request['file'].update(format=audio_file.format, duration=audio_file.duration,
+                                   sample_rate=audio_file.sample_rate)
+            analysis_rate = audio_file.analysis_rate
+        try:
+            return self.scheduler.submit(key + (analysis_rate,), self._run_in_pool, kind, request,
+                                         duration=request['file']['duration'])
+        except QueueFullError:
+            raise HttpError(503, "Too many pending jobs", {'Retry-After': '5'})
+
+    async def _stream_to_file(self, reader, path, length):
+        """
+        Copies the request body to a file in fixed-size chunks, hashing it on the way; the file write runs off
+        the event loop.
+
+        Returns:
+            str: The SHA-256 digest of the uploaded content.
+        """
+        loop = asyncio.get_running_loop()
+        digest = hashlib.sha256()
+        with open(path, 'wb') as f:
+            remaining = length
+            while remaining:
+                chunk = await asyncio.wait_for(reader.read(min(UPLOAD_CHUNK_SIZE, remaining)), self.io_timeout)
+                if not chunk:
+                    raise HttpError(400, "Upload ended before Content-Length bytes")
+                digest.update(chunk)
+                await loop.run_in_executor(None, f.write, chunk)
+                remaining -= len(chunk)
+        return digest.hexdigest()
+
+    def _run_in_pool(self, kind, request):
+        """
+        Runs a job in the worker pool; called on a scheduler thread, which blocks until the job is done. A job
+        whose deadline passed while it was queued is not started.
+        """
+        if time.time() > request['deadline']:
+            raise DeadlineExceededError("Deadline exceeded while queued")
+        result = self._executor.submit(_execute_job, kind, request).result()
+        if result.diagnostics is not None:
+            self.metrics.observe(kind, result.diagnostics)
+        return result
+
+    async def _run_job(self, job, future):
+        """
+        Waits for a scheduled job under the job timeout.
+        """
+        try:
+            # Shielded, so a timeout does not cancel an execution other jobs may share
+            execution = asyncio.wrap_future(future)
+            job.result = await asyncio.wait_for(asyncio.shield(execution), self.job_timeout)
+            job.status = "done"
+        except (asyncio.TimeoutError, DeadlineExceededError):
+            job.status, job.error = "timeout", f"Job exceeded {self.job_timeout} seconds"
+            # The execution is abandoned at its deadline; retrieve its late outcome so it is not reported
+            execution.add_done_callback(lambda done: done.cancelled() or done.exception())
+        except Exception as error:
+            job.status, job.error = "failed", f"{type(error).__name__}: {error}"
+        finally:
+            job.finished_at = time.time()
+
+    def _job_result(self, job, view, query, headers):
+        """
+        Renders a finished job's result in the requested view.
+        """
+        if job.status != "done":
+            raise HttpError(409, f"Job is {job.status}")
+        if view == 'diagnostics':
+            if job.result.diagnostics is None:
+                raise HttpError(404, "No diagnostics recorded")
+            return 200, 'application/json', _json_bytes(diagnostics_to_dict(job.result.diagnostics)), {}
+        if view == 'result':
+            if query.get('format') == 'json' or 'application/json' in headers.get('accept', ''):
+                return 200, 'application/json', _json_bytes(result_to_json(job.result)), {}
+            return 200, NPZ_MEDIA_TYPE, encode_result(job.result), {}
+        if job.kind == 'transcription' and view == 'midi':
+            return 200, 'audio/midi', job.result.midi_data, {}
+        if job.kind == 'transcription' and view == 'score':
+            score_data = job.result.score_data
+            body = score_data.encode('utf-8') if isinstance(score_data, str) else score_data
+            return 200, 'application/vnd.recordare.musicxml+xml', body, {}
+        raise HttpError(404, "Not found")
+
+    def _retain(self, job):
+        """
+        Registers a job, forgetting the oldest finished jobs beyond the retention limit.
+        """
+        self.jobs[job.job_id] = job
+        if len(self.jobs) > self.max_retained_jobs:
+            finished = sorted((j for j in self.jobs.values() if j.finished_at is not None),
+                              key=lambda j: j.finished_at)
+            for old in finished[:len(self.jobs) - self.max_retained_jobs]:
+                del self.jobs[old.job_id]
+
+    async def _write_response(self, writer, status, content_type, body, extra_headers):
+        """
+        Writes a response. A body given as bytes is sent whole; any other body is an iterable of text chunks
+        (such as a MusicXML document), generated off the event loop and sent with chunked transfer encoding.
+        """
+        reason = _REASONS.get(status, 'Unknown')
+        streamed = not isinstance(body, bytes)
+        length = "Transfer-Encoding: chunked" if streamed else f"Content-Length: {len(body)}"
+        head = [f"HTTP/1.1 {status} {reason}", f"Content-Type: {content_type}", length, "Connection: close"]
+        head += [f"{name}: {value}" for name, value in extra_headers.items()]
+        head = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1')
+        if not streamed:
+            writer.write(head + body)
+            await writer.drain()
+            return
+
+        writer.write(head)
+        loop = asyncio.get_running_loop()
+        batches = _batched_utf8(body, UPLOAD_CHUNK_SIZE)
+        while True:
+            batch = await loop.run_in_executor(None, next, batches, None)
+            if batch is None:
+                break
+            writer.write(f"{len(batch):X}\r\n".encode('latin-1') + batch + b'\r\n')
+            await writer.drain()
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+
+_REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 408: 'Request Timeout',
+            409: 'Conflict', 411: 'Length Required', 413: 'Payload Too Large',
+            415: 'Unsupported Media Type', 431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+            503: 'Service Unavailable'}
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _batched_utf8(chunks, size):
+    """
+    Encodes text chunks to UTF-8 and joins them into batches of at least `size` bytes (the last may be shorter).
+    """
+    batch, length = [], 0
+    for chunk in chunks:
+        encoded = chunk.encode('utf-8')
+        batch.append(encoded)
+        length += len(encoded)
+        if length >= size:
+            yield b''.join(batch)
+            batch, length = [], 0
+    if batch:
+        yield b''.join(batch)
+
+
+def _json_bytes(payload):
+    return json.dumps(payload, default=_to_json).encode('utf-8')
+
+
+def _to_json(value):
+    """
+    Converts NumPy scalars and arrays (and other sequences) found in results into JSON values.
+    """
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _init_worker(controller_factory, warm_up=None):
+    global _worker_controller_factory
+    _worker_controller_factory = controller_factory
+    if warm_up is not None:
+        warm_up()
+
+
+def _controllers_for(genre):
+    if genre not in _worker_controllers:
+        _worker_controllers[genre] = _worker_controller_factory(genre)
+    return _worker_controllers[genre]
+
+
+def _execute_job(kind, request):
+    """
+    Runs a job in a pool worker and returns its result entity. A transcription's score stays a lazy MusicXML
+    document, which pickles back to the service as its score and is only rendered while a client downloads it.
+    """
+    audio_upload_controller, feature_extraction_controller = _controllers_for(request.get('genre', 'general'))
+    # Each stage checks the job's deadline as it starts, so a timed-out job releases the worker early
+    with deadline(request.get('deadline')):
+        if kind == 'transcription':
+            return audio_upload_controller.upload_audio(request)
+        return feature_extraction_controller.extract_features(request)
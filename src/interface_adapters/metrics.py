@@ -0,0 +1,86 @@
+"""
+Module: Metrics
+Location: interface_adapters/metrics.py
+Aggregates the diagnostics of finished use case executions into per-stage and per-measurement counters and
+renders them in the Prometheus text exposition format.
+"""
+
+import threading
+
+from src.entities.diagnostics import Diagnostics
+
+
+class StageMetrics:
+    """
+    Thread-safe running totals of stage calls, wall time and CPU time, labeled by job kind and stage path, and of
+    the measurements the stages reported, labeled by job kind and measurement name.
+    """
+
+    def __init__(self, namespace='audiong'):
+        self.namespace = namespace
+        self._totals = {}
+        self._measurements = {}
+        self._executions = {}
+        self._lock = threading.Lock()
+
+    def observe(self, kind, diagnostics: Diagnostics):
+        """
+        Adds the spans and measurements of one execution to the totals.
+
+        Args:
+            kind (str): The job kind, e.g. "transcription" or "features".
+            diagnostics (Diagnostics): The diagnostics of the execution.
+        """
+        with self._lock:
+            self._executions[kind] = self._executions.get(kind, 0) + 1
+            for timing in diagnostics.spans:
+                totals = self._totals.setdefault((kind, timing.name), [0, 0.0, 0.0])
+                totals[0] += timing.calls
+                totals[1] += timing.wall_seconds
+                totals[2] += timing.cpu_seconds
+            for name, value in diagnostics.measurements.items():
+                self._measurements[(kind, name)] = self._measurements.get((kind, name), 0.0) + value
+
+    def render(self):
+        """
+        Returns the totals in the Prometheus text exposition format (version 0.0.4).
+        """
+        with self._lock:
+            executions = sorted(self._executions.items())
+            totals = sorted(self._totals.items())
+            measurements = sorted(self._measurements.items())
+
+        prefix = self.namespace
+        lines = [f"# HELP {prefix}_executions_total Use case executions with recorded diagnostics.",
+                 f"# TYPE {prefix}_executions_total counter"]
+        lines += [f'{prefix}_executions_total{{kind="{_escape(kind)}"}} {count}' for kind, count in executions]
+        for index, (metric, description) in enumerate([
+                ('stage_calls_total', "Times a processing stage ran."),
+                ('stage_wall_seconds_total', "Elapsed seconds spent in a processing stage."),
+                ('stage_cpu_seconds_total', "Process CPU seconds spent in a processing stage.")]):
+            lines += [f"# HELP {prefix}_{metric} {description}", f"# TYPE {prefix}_{metric} counter"]
+            lines += [f'{prefix}_{metric}{{kind="{_escape(kind)}",stage="{_escape(stage)}"}} {values[index]}'
+                      for (kind, stage), values in totals]
+        lines += [f"# HELP {prefix}_measurement_total Quantities reported by the processing stages.",
+                  f"# TYPE {prefix}_measurement_total counter"]
+        lines += [f'{prefix}_measurement_total{{kind="{_escape(kind)}",name="{_escape(name)}"}} {value}'
+                  for (kind, name), value in measurements]
+        return '\n'.join(lines) + '\n'
+
+
+def diagnostics_to_dict(diagnostics: Diagnostics):
+    """
+    Returns a JSON-serializable view of diagnostics.
+    """
+    return {
+        "spans": [{"name": timing.name, "calls": timing.calls, "wall_seconds": timing.wall_seconds,
+                   "cpu_seconds": timing.cpu_seconds, "peak_allocated_bytes": timing.peak_allocated_bytes}
+                  for timing in diagnostics.spans],
+        "profile": diagnostics.profile,
+        "allocations": diagnostics.allocations,
+        "measurements": diagnostics.measurements
+    }
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
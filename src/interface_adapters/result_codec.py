@@ -0,0 +1,154 @@
+"""
+Module: Result Codec
+Location: interface_adapters/result_codec.py
+Serializes MusicalFeature and TranscriptionResult entities to a binary .npz container holding one typed array
+per field, and back, without creating a Python object per element. A JSON view is kept for clients that opt
+into it.
+"""
+
+import base64
+import io
+
+import numpy as np
+
+from src.entities.diagnostics import Diagnostics, SpanTiming
+from src.entities.musical_feature import PITCH_TRACK_DTYPE, MusicalFeature
+from src.entities.transcription_result import TranscriptionResult
+
+# The media type of encoded results
+NPZ_MEDIA_TYPE = 'application/x-npz'
+
+# Bump whenever the layout of the encoded arrays changes
+FORMAT_VERSION = 1
+
+
+def encode_result(result):
+    """
+    Encodes a result entity as an uncompressed .npz archive.
+
+    Args:
+        result: A MusicalFeature or a TranscriptionResult (whose score is rendered to MusicXML).
+
+    Returns:
+        bytes: The archive.
+    """
+    if isinstance(result, MusicalFeature):
+        arrays = {'kind': np.array('musical_feature')}
+        # Features that were neither requested nor evaluated are left out rather than computed here
+        tempo, key, pitch, rhythm, pitch_track = (_evaluated(result, name) for name in _FEATURE_ATTRIBUTES)
+        if tempo is not None:
+            arrays['tempo'] = np.array(tempo, dtype=np.float64)
+        if key is not None:
+            arrays['key'] = np.array(key)
+        if pitch is not None:
+            arrays['pitch'] = pitch
+        if rhythm is not None:
+            arrays['rhythm'] = rhythm
+        if pitch_track is not None:
+            # Stored as two plain columns, so the archive loads without pickling
+            arrays['pitch_track_time'] = pitch_track['time']
+            arrays['pitch_track_frequency'] = pitch_track['frequency']
+    elif isinstance(result, TranscriptionResult):
+        arrays = {'kind': np.array('transcription'),
+                  'midi_data': np.frombuffer(result.midi_data, dtype=np.uint8),
+                  'score_data': np.frombuffer(str(result.score_data).encode('utf-8'), dtype=np.uint8)}
+    else:
+        raise TypeError(f"Cannot encode {type(result).__name__}")
+    arrays['format_version'] = np.array(FORMAT_VERSION)
+    if result.diagnostics is not None:
+        arrays.update(_diagnostics_arrays(result.diagnostics))
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def decode_result(data):
+    """
+    Decodes an archive written by `encode_result`.
+
+    Args:
+        data (bytes): The archive.
+
+    Returns:
+        The MusicalFeature or TranscriptionResult it holds.
+    """
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        if int(archive['format_version']) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported result format version {int(archive['format_version'])}")
+        diagnostics = _diagnostics_from_arrays(archive) if 'span_names' in archive.files else None
+        kind = str(archive['kind'])
+        if kind == 'musical_feature':
+            pitch_track = None
+            if 'pitch_track_time' in archive.files:
+                pitch_track = np.empty(len(archive['pitch_track_time']), dtype=PITCH_TRACK_DTYPE)
+                pitch_track['time'] = archive['pitch_track_time']
+                pitch_track['frequency'] = archive['pitch_track_frequency']
+            return MusicalFeature(tempo=float(archive['tempo']) if 'tempo' in archive.files else None,
+                                  key=str(archive['key']) or None if 'key' in archive.files else None,
+                                  pitch=archive['pitch'] if 'pitch' in archive.files else None,
+                                  rhythm=archive['rhythm'] if 'rhythm' in archive.files else None,
+                                  pitch_track=pitch_track, diagnostics=diagnostics)
+        if kind == 'transcription':
+            return TranscriptionResult(archive['midi_data'].tobytes(),
+                                       archive['score_data'].tobytes().decode('utf-8'), diagnostics=diagnostics)
+    raise ValueError(f"Unknown result kind: {kind}")
+
+
+def result_to_json(result):
+    """
+    Returns the JSON view of a result entity (MIDI data base64-encoded), without its diagnostics. Features that
+    were not evaluated are null.
+    """
+    if isinstance(result, MusicalFeature):
+        tempo, key, pitch, rhythm, pitch_track = (_evaluated(result, name) for name in _FEATURE_ATTRIBUTES)
+        view = {"tempo": tempo, "key": key, "pitch": None if pitch is None else pitch.tolist(),
+                "rhythm": None if rhythm is None else rhythm.tolist()}
+        if pitch_track is not None:
+            view["pitch_track"] = {"time": pitch_track['time'].tolist(),
+                                   "frequency": pitch_track['frequency'].tolist()}
+        return view
+    return {"midi_data": base64.b64encode(result.midi_data).decode('ascii'), "score_data": str(result.score_data)}
+
+
+_FEATURE_ATTRIBUTES = ('tempo', 'key', 'pitch', 'rhythm', 'pitch_track')
+
+
+def _evaluated(result, name):
+    return getattr(result, name) if result.is_evaluated(name) else None
+
+
+def _diagnostics_arrays(diagnostics):
+    spans = diagnostics.spans
+    arrays = {
+        'span_names': np.array([span.name for span in spans], dtype=np.str_),
+        'span_calls': np.array([span.calls for span in spans], dtype=np.int64),
+        'span_wall_seconds': np.array([span.wall_seconds for span in spans], dtype=np.float64),
+        'span_cpu_seconds': np.array([span.cpu_seconds for span in spans], dtype=np.float64),
+        # -1 stands for "not traced"
+        'span_peak_allocated_bytes': np.array([-1 if span.peak_allocated_bytes is None
+                                               else span.peak_allocated_bytes for span in spans], dtype=np.int64)
+    }
+    if diagnostics.profile is not None:
+        arrays['profile'] = np.array(diagnostics.profile)
+    if diagnostics.allocations is not None:
+        arrays['allocations'] = np.array(diagnostics.allocations, dtype=np.str_)
+    if diagnostics.measurements:
+        arrays['measurement_names'] = np.array(list(diagnostics.measurements), dtype=np.str_)
+        arrays['measurement_values'] = np.array(list(diagnostics.measurements.values()), dtype=np.float64)
+    return arrays
+
+
+def _diagnostics_from_arrays(archive):
+    spans = [SpanTiming(str(name), int(calls), float(wall), float(cpu), None if peak < 0 else int(peak))
+             for name, calls, wall, cpu, peak in zip(archive['span_names'], archive['span_calls'],
+                                                     archive['span_wall_seconds'], archive['span_cpu_seconds'],
+                                                     archive['span_peak_allocated_bytes'])]
+    measurements = None
+    if 'measurement_names' in archive.files:
+        measurements = {str(name): float(value)
+                        for name, value in zip(archive['measurement_names'], archive['measurement_values'])}
+    return Diagnostics(spans=spans,
+                       profile=str(archive['profile']) if 'profile' in archive.files else None,
+                       allocations=archive['allocations'].tolist() if 'allocations' in archive.files else None,
+                       measurements=measurements)
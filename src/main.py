@@ -3,16 +3,30 @@ Main entry point for the music interpreter backend service.
 This script sets up the controllers, use cases, and services for the application and processes an audio file.
 """
 
+import argparse
+import asyncio
+import functools
 import os
+import tempfile
 from src.interface_adapters import AudioUploadController, FeatureExtractionController
-from src.use_cases import TranscribeAudioToScore, ExtractMusicalFeatures
+from src.interface_adapters.http_service import AudioHttpService
+from src.use_cases import BackendRegistry, TranscribeAudioToScore, ExtractMusicalFeatures
 from src.infrastructure.librosa_feature_extractor import LibrosaFeatureExtractor
 from src.infrastructure.librosa_transcription_service import LibrosaTranscriptionService
+from src.infrastructure.numpy_feature_extractor import NumpyFeatureExtractor
+from src.infrastructure.audio_cache import DecodedAudioCache
+from src.infrastructure.shared_pcm_cache import SharedPCMCache
+from src.infrastructure.audio_probe import AudioProbe
+from src.infrastructure.genre_profile import GENRE_PROFILES
+from src.infrastructure.performance_profile import DEFAULT_PROFILE, PERFORMANCE_PROFILES
+from src.infrastructure.feature_store import FeatureStore, StoredFeatureExtractor
+from src.infrastructure.startup import configure_numba_cache, warm_up
 
 
 def mock_request(file_path):
     """
     Mock request object to simulate a real file upload request.
+    The format, duration and sample rate are left to the controllers' audio probe, which reads them from the file.
     Args:
         file_path (str): The path to the audio file to be processed.
     Returns:
@@ -21,9 +35,9 @@ def mock_request(file_path):
     return {
         'file': {
             'path': file_path,
-            'format': 'mp3',
-            'duration': 240.0,  # Example duration in seconds
-            'sample_rate': 44100  # Standard sample rate for audio files
+            'format': os.path.splitext(file_path)[1].lstrip('.').lower(),
+            'duration': None,
+            'sample_rate': None
         }
     }
 
@@ -58,24 +72,292 @@ def get_genre_from_user_input():
         return "general"
 
 
-def main():
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.mp3', '.ogg', '.m4a', '.aiff')
+
+# The analysis backends, the first being the default
+BACKENDS = ('librosa', 'numpy')
+
+
+def parse_args(argv=None):
+    """
+    Parses the command-line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Music interpreter backend service.")
+    parser.add_argument('--batch', metavar='DIR', help="Process every audio file in DIR with a process pool.")
+    parser.add_argument('--task', choices=['features', 'transcribe'], default='features',
+                        help="The use case to run in batch mode (default: features).")
+    parser.add_argument('--genre', choices=['general', 'classical', 'jazz', 'pop'],
+                        help="The genre profile for key estimation (prompted for when omitted).")
+    parser.add_argument('--workers', type=int, default=None, help="The number of worker processes.")
+    parser.add_argument('--chunksize', type=chunksize_arg, default=1, help="The number of files sent to a worker per task.")
+    parser.add_argument('--feature-store', metavar='DIR',
+                        help="Persist extracted features in DIR and serve repeat requests from it.")
+    parser.add_argument('--serve', metavar='HOST:PORT', help="Run the HTTP service on HOST:PORT.")
+    parser.add_argument('--upload-dir', default=os.path.join(tempfile.gettempdir(), 'audiong_uploads'),
+                        help="The directory the HTTP service streams uploads into.")
+    parser.add_argument('--profile', choices=sorted(PERFORMANCE_PROFILES), default=DEFAULT_PROFILE,
+                        help="The performance profile: analysis rate, resampler, FFT size and hop length "
+                             f"(default: {DEFAULT_PROFILE}).")
+    parser.add_argument('--analysis-rate', type=analysis_rate_arg, default=None,
+                        help="Override the profile's analysis rate with a sample rate in Hz, or 'native' to skip "
+                             "resampling.")
+    parser.add_argument('--backend', choices=BACKENDS, default=BACKENDS[0],
+                        help="The analysis backend of batch and sample runs; HTTP requests select one with "
+                             f"`?backend=` (default: {BACKENDS[0]}).")
+    parser.add_argument('--skip-silence', action='store_true',
+                        help="Analyze only the active regions of each recording, cutting long silences and gaps "
+                             "before the expensive librosa stages; times stay on the original timeline.")
+    parser.add_argument('--pcm-cache', metavar='DIR',
+                        help="Share decoded audio across worker processes through memory-mapped files in DIR, so "
+                             "each file is decoded once per analysis rate.")
+    parser.add_argument('--pcm-cache-mb', type=int, default=4096,
+                        help="The disk budget of the --pcm-cache directory in MiB (default: 4096).")
+    parser.add_argument('--warm-up', action='store_true',
+                        help="Warm up the analysis stages on a synthetic signal before serving or batch processing, "
+                             "so the first files do not pay for JIT compilation and filterbank construction.")
+    parser.add_argument('--numba-cache-dir', metavar='DIR', default=os.environ.get('NUMBA_CACHE_DIR'),
+                        help="Keep numba's compiled kernels in DIR, e.g. a persistent volume shared by restarts "
+                             "(default: $NUMBA_CACHE_DIR, else numba's own location).")
+    return parser.parse_args(argv)
+
+
+def chunksize_arg(value):
+    """
+    Parses the --chunksize argument: a positive number of files.
+    """
+    chunksize = int(value)
+    if chunksize < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {chunksize}")
+    return chunksize
+
+
+def analysis_rate_arg(value):
+    """
+    Parses the --analysis-rate argument: "native" or a sample rate in Hz.
+    """
+    return value if value == 'native' else int(value)
+
+
+def build_feature_extractor(genre, feature_store_dir=None, audio_cache=None, profile=DEFAULT_PROFILE,
+                            skip_silence=False):
+    """
+    Builds the Librosa feature extractor, backed by a persistent feature store when a directory is given.
+
+    Args:
+        genre (str): The genre profile for key estimation.
+        feature_store_dir (str): The feature store directory (optional).
+        audio_cache (DecodedAudioCache): The decoded-audio cache shared with other services (optional).
+        profile (str): The default performance profile.
+        skip_silence (bool): Whether to analyze only the active regions of each recording.
+
+    Returns:
+        The feature extractor service.
+    """
+    feature_extractor = LibrosaFeatureExtractor(genre=genre, audio_cache=audio_cache, profile=profile,
+                                                skip_silence=skip_silence)
+    return _with_feature_store(feature_extractor, feature_store_dir)
+
+
+def build_numpy_feature_extractor(genre, feature_store_dir=None):
+    """
+    Builds the NumPy feature extractor, backed by a persistent feature store when a directory is given.
+
+    Args:
+        genre (str): The genre profile for key estimation.
+        feature_store_dir (str): The feature store directory (optional).
+
+    Returns:
+        The feature extractor service.
+    """
+    return _with_feature_store(NumpyFeatureExtractor(genre=genre), feature_store_dir)
+
+
+def _with_feature_store(feature_extractor, feature_store_dir):
+    if feature_store_dir:
+        return StoredFeatureExtractor(feature_extractor, FeatureStore(feature_store_dir))
+    return feature_extractor
+
+
+def build_backends(genre, feature_store_dir=None, audio_cache=None, profile=DEFAULT_PROFILE, skip_silence=False):
+    """
+    Registers the analysis backends: "librosa" (the default) extracts features and transcribes, "numpy" only
+    extracts features. Each backend's services are built when a request first selects it.
+
+    Args:
+        genre (str): The genre profile for key estimation.
+        feature_store_dir (str): The feature store directory (optional).
+        audio_cache (DecodedAudioCache): The decoded-audio cache shared by the librosa services (optional).
+        profile (str): The default performance profile of the librosa services.
+        skip_silence (bool): Whether the librosa services analyze only the active regions of each recording.
+
+    Returns:
+        BackendRegistry: The registered backends.
+    """
+    return (BackendRegistry()
+            .register('librosa',
+                      feature_extractor=functools.partial(build_feature_extractor, genre, feature_store_dir,
+                                                          audio_cache, profile, skip_silence),
+                      transcription_service=functools.partial(LibrosaTranscriptionService, audio_cache=audio_cache,
+                                                              profile=profile, skip_silence=skip_silence))
+            .register('numpy', feature_extractor=functools.partial(build_numpy_feature_extractor, genre,
+                                                                   feature_store_dir)))
+
+
+def build_pcm_cache(directory, budget_mb):
+    """
+    Builds the cross-process decoded-audio cache, or returns None when no directory is given.
+    """
+    return SharedPCMCache(directory, budget_mb * 1024 * 1024) if directory else None
+
+
+def build_controllers(genre, feature_store_dir=None, analysis_rate=None, profile=DEFAULT_PROFILE,
+                      skip_silence=False, pcm_cache=None):
+    """
+    Builds the upload and feature extraction controllers for a genre over the registered analysis backends,
+    sharing one decoded-audio cache and probing uploaded files for their metadata. Also used by the HTTP service
+    to set up each worker process.
+
+    Args:
+        genre (str): The genre profile for key estimation.
+        feature_store_dir (str): The feature store directory (optional).
+        analysis_rate: An analysis rate overriding the profile's, "native" or a sample rate in Hz (optional).
+        profile (str): The default performance profile; requests may select another.
+        skip_silence (bool): Whether to analyze only the active regions of each recording.
+        pcm_cache (SharedPCMCache): The cross-process cache backing the decoded-audio cache (optional).
+
+    Returns:
+        tuple: The AudioUploadController and the FeatureExtractionController.
+    """
+    audio_cache = DecodedAudioCache(shared=pcm_cache)
+    audio_probe = AudioProbe(analysis_rate)
+    backends = build_backends(genre, feature_store_dir, audio_cache, profile, skip_silence)
+    return (AudioUploadController(TranscribeAudioToScore(backends=backends), audio_probe),
+            FeatureExtractionController(ExtractMusicalFeatures(backends=backends), audio_probe))
+
+
+def run_http_service(address, upload_dir, workers, feature_store_dir=None, analysis_rate=None,
+                     profile=DEFAULT_PROFILE, warm=False, skip_silence=False, pcm_cache=None):
+    """
+    Runs the HTTP service until interrupted.
+
+    Args:
+        address (str): The HOST:PORT to listen on.
+        upload_dir (str): The directory uploads are streamed into.
+        workers (int): The number of worker processes.
+        feature_store_dir (str): The feature store directory (optional).
+        analysis_rate: An analysis rate overriding the profile's, "native" or a sample rate in Hz (optional).
+        profile (str): The default performance profile; requests may select another with `?profile=`.
+        warm (bool): Whether to warm up the workers before listening.
+        skip_silence (bool): Whether to analyze only the active regions of each recording.
+        pcm_cache (SharedPCMCache): The cache through which the workers share decoded audio (optional).
+    """
+    host, _, port = address.rpartition(':')
+    controller_factory = functools.partial(build_controllers, feature_store_dir=feature_store_dir,
+                                           analysis_rate=analysis_rate, profile=profile, skip_silence=skip_silence,
+                                           pcm_cache=pcm_cache)
+    # The service only checks requested backends against this registry; each worker builds its own services
+    service = AudioHttpService(controller_factory, upload_dir, max_workers=workers,
+                               audio_probe=AudioProbe(analysis_rate),
+                               warm_up=functools.partial(warm_up, profile) if warm else None,
+                               backends=build_backends('general'), genres=GENRE_PROFILES,
+                               profiles=PERFORMANCE_PROFILES)
+    print(f"HTTP service listening on {host or '127.0.0.1'}:{port}...")
+    try:
+        asyncio.run(service.serve_forever(host or '127.0.0.1', int(port)))
+    except KeyboardInterrupt:
+        pass
+
+
+def run_batch_mode(directory, task, genre, workers, chunksize, feature_store_dir=None, analysis_rate=None,
+                   profile=DEFAULT_PROFILE, warm=False, backend=BACKENDS[0], skip_silence=False, pcm_cache=None):
+    """
+    Runs one use case over every audio file of a directory and prints each result as it finishes.
+
+    Args:
+        directory (str): The directory holding the audio files.
+        task (str): The use case to run ("features" or "transcribe").
+        genre (str): The genre profile for key estimation.
+        workers (int): The number of worker processes.
+        chunksize (int): The number of files sent to a worker per task.
+        feature_store_dir (str): The feature store directory (optional).
+        analysis_rate: An analysis rate overriding the profile's, "native" or a sample rate in Hz (optional).
+        profile (str): The performance profile.
+        warm (bool): Whether to warm up before starting the pool; forked workers inherit the warmed state.
+        backend (str): The analysis backend, one of BACKENDS.
+        skip_silence (bool): Whether to analyze only the active regions of each recording.
+        pcm_cache (SharedPCMCache): The cache through which the workers share decoded audio (optional).
+    """
+    if warm:
+        print(f"Warm-up took {warm_up(profile, genre).span('warm_up').wall_seconds:.2f} s.")
+    audio_probe = AudioProbe(analysis_rate)
+    audio_files = []
+    failures = 0
+    for name in sorted(os.listdir(directory)):
+        if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS:
+            try:
+                audio_files.append(audio_probe.probe(os.path.join(directory, name)))
+            except Exception as error:
+                failures += 1
+                print(f"{name}: FAILED ({type(error).__name__}: {error})")
+
+    if task == 'transcribe' and backend != 'librosa':
+        print(f"The {backend} backend does not transcribe.")
+        return
+    audio_cache = DecodedAudioCache(shared=pcm_cache)
+    if task == 'transcribe':
+        use_case = TranscribeAudioToScore(LibrosaTranscriptionService(audio_cache, profile=profile,
+                                                                      skip_silence=skip_silence))
+    elif backend == 'numpy':
+        use_case = ExtractMusicalFeatures(build_numpy_feature_extractor(genre, feature_store_dir))
+    else:
+        use_case = ExtractMusicalFeatures(build_feature_extractor(genre, feature_store_dir, audio_cache,
+                                                                  profile, skip_silence))
+
+    print(f"Batch {task} over {len(audio_files)} files starts (genre: {genre}, profile: {profile}, "
+          f"backend: {backend})...")
+    total = len(audio_files) + failures
+    for item in use_case.execute_batch(audio_files, max_workers=workers, chunksize=chunksize):
+        name = os.path.basename(item.audio_file.file_path)
+        if not item.ok:
+            failures += 1
+            print(f"{name}: FAILED ({item.error})")
+        elif task == 'transcribe':
+            print(f"{name}: MIDI Data: {len(item.result.midi_data)} bytes")
+        else:
+            print(f"{name}: Tempo: {item.result.tempo}, Key: {item.result.key}")
+    print(f"Batch finished: {total - failures} succeeded, {failures} failed.")
+
+
+def main(argv=None):
     """
     Main function to set up the backend services, controllers, and process the sample audio file.
     """
-    # Get the genre from user input
-    genre = get_genre_from_user_input()
+    args = parse_args(argv)
+    if args.numba_cache_dir:
+        configure_numba_cache(args.numba_cache_dir)
+
+    pcm_cache = build_pcm_cache(args.pcm_cache, args.pcm_cache_mb)
 
-    # Set up the services and use cases using Librosa
-    transcription_service = LibrosaTranscriptionService()
-    feature_extractor_service = LibrosaFeatureExtractor(genre=genre)
+    if args.serve:
+        run_http_service(args.serve, args.upload_dir, args.workers, args.feature_store, args.analysis_rate,
+                         args.profile, args.warm_up, args.skip_silence, pcm_cache)
+        return
 
-    # Set up use cases
-    transcribe_audio_use_case = TranscribeAudioToScore(transcription_service)
-    extract_features_use_case = ExtractMusicalFeatures(feature_extractor_service)
+    # Get the genre from the command line or from user input
+    genre = args.genre or get_genre_from_user_input()
 
-    # Set up controllers
-    audio_upload_controller = AudioUploadController(transcribe_audio_use_case)
-    feature_extraction_controller = FeatureExtractionController(extract_features_use_case)
+    if args.batch:
+        run_batch_mode(args.batch, args.task, genre, args.workers, args.chunksize, args.feature_store,
+                       args.analysis_rate, args.profile, args.warm_up, args.backend, args.skip_silence, pcm_cache)
+        return
+
+    # Set up the services, use cases and controllers using Librosa, sharing one decoded-audio cache
+    audio_upload_controller, feature_extraction_controller = build_controllers(genre, args.feature_store,
+                                                                               args.analysis_rate, args.profile,
+                                                                               args.skip_silence, pcm_cache)
 
     # Load the sample audio file
     audio_file_path = '/home/ono/Projects/Audiong/sample_audio/02 - XII. Allegro.flac'
@@ -86,12 +368,14 @@ def main():
     # Process the audio file with the audio upload controller
     print(f"Audio upload and transcription process starts (using Librosa, genre: {genre})...")
     transcription_result = audio_upload_controller.upload_audio(request)
-    print(
-        f"Transcription Result: MIDI Data (sample): {transcription_result.midi_data[:5]}, Score Data: {transcription_result.score_data[:100]}...")
+    # Only the first chunk of the MusicXML document is rendered for the preview
+    score_preview = next(iter(transcription_result.score_data), '')[:100]
+    print(f"Transcription Result: MIDI Data: {len(transcription_result.midi_data)} bytes, "
+          f"Score Data: {score_preview}...")
 
     # Extract musical features
-    print(f"Musical feature extraction starts (using Librosa with K-S algorithm for {genre})...")
-    feature_result = feature_extraction_controller.extract_features(request)
+    print(f"Musical feature extraction starts (using the {args.backend} backend with K-S algorithm for {genre})...")
+    feature_result = feature_extraction_controller.extract_features(dict(request, backend=args.backend))
     print(
         f"Musical Features - Tempo: {feature_result.tempo}, Key: {feature_result.key}, Pitch: {feature_result.pitch[:10]}, Rhythm: {feature_result.rhythm[:5]}")
 
@@ -4,6 +4,14 @@ Contains the application-specific business logic.
 """
 
 from .transcribe_audio_to_score import TranscribeAudioToScore
-from .extract_musical_features import ExtractMusicalFeatures
+from .extract_musical_features import PITCH_MODES, PITCH_POOLINGS, ExtractMusicalFeatures, parse_pitch_resolution
+from .batch_execution import BatchItemResult, run_batch
+from .job_scheduler import JobScheduler, QueueFullError
+from .instrumentation import CAPTURE_MODES, DeadlineExceededError, SpanRecorder, deadline, measure, span
+from .backend_registry import BACKEND_SERVICES, BackendRegistry, UnknownBackendError
 
-__all__ = ['TranscribeAudioToScore', 'ExtractMusicalFeatures']
\ No newline at end of file
+__all__ = ['TranscribeAudioToScore', 'ExtractMusicalFeatures', 'PITCH_MODES', 'PITCH_POOLINGS',
+           'parse_pitch_resolution', 'BatchItemResult', 'run_batch',
+           'JobScheduler', 'QueueFullError', 'CAPTURE_MODES', 'DeadlineExceededError', 'SpanRecorder', 'deadline',
+           'measure', 'span',
+           'BACKEND_SERVICES', 'BackendRegistry', 'UnknownBackendError']
\ No newline at end of file
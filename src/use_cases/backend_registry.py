@@ -0,0 +1,88 @@
+"""
+Module: Backend Registry
+Location: use_cases/backend_registry.py
+Maps analysis backend names to the services they provide, so use cases can resolve the backend a request
+selects by name while the composition root decides which backends exist.
+"""
+
+# The services a backend may provide
+BACKEND_SERVICES = ('feature_extractor', 'transcription_service')
+
+
+class UnknownBackendError(ValueError):
+    """
+    Raised when a request selects a backend that is not registered or does not provide the service it needs.
+    """
+
+
+class BackendRegistry:
+    """
+    Holds the service factories of each registered backend.
+
+    Services are built on first use and memoized, so registering a backend costs nothing until a request
+    selects it and an unused backend never imports its libraries. Factories must be picklable (classes or
+    functools.partial objects, not lambdas) when the registry is sent to worker processes.
+
+    Attributes:
+        default (str): The backend used when a request names none; the first registered one if not set.
+    """
+
+    def __init__(self, default=None):
+        self.default = default
+        self._factories = {}
+        self._services = {}
+
+    def register(self, name, feature_extractor=None, transcription_service=None):
+        """
+        Registers a backend, replacing any previous registration under the same name.
+
+        Args:
+            name (str): The backend name requests select it by.
+            feature_extractor: A zero-argument factory of the backend's feature extractor (optional).
+            transcription_service: A zero-argument factory of the backend's transcription service (optional).
+
+        Returns:
+            BackendRegistry: The registry, so registrations can be chained.
+        """
+        factories = {'feature_extractor': feature_extractor, 'transcription_service': transcription_service}
+        self._factories[name] = {service: factory for service, factory in factories.items() if factory is not None}
+        for service in BACKEND_SERVICES:
+            self._services.pop((name, service), None)
+        if self.default is None:
+            self.default = name
+        return self
+
+    def names(self, service=None):
+        """
+        Returns the registered backend names, optionally only those providing a service.
+        """
+        return [name for name, factories in self._factories.items() if service is None or service in factories]
+
+    def provides(self, name, service):
+        """
+        Returns whether a backend is registered and provides a service; None names the default backend.
+        """
+        return service in self._factories.get(self.default if name is None else name, {})
+
+    def resolve(self, service, name=None):
+        """
+        Returns a backend's service, building it on first use.
+
+        Args:
+            service (str): One of BACKEND_SERVICES.
+            name (str): The backend name, or None for the default backend.
+
+        Returns:
+            The service.
+
+        Raises:
+            UnknownBackendError: If the backend is not registered or does not provide the service.
+        """
+        name = self.default if name is None else name
+        if name not in self._factories:
+            raise UnknownBackendError(f"Unknown backend: {name!r} (expected one of {', '.join(self.names())})")
+        if service not in self._factories[name]:
+            raise UnknownBackendError(f"Backend {name!r} does not provide a {service.replace('_', ' ')}")
+        if (name, service) not in self._services:
+            self._services[(name, service)] = self._factories[name][service]()
+        return self._services[(name, service)]
@@ -0,0 +1,117 @@
+"""
+Module: Batch Execution
+Location: use_cases/batch_execution.py
+Fans a use case out over many audio files with a process pool, streaming results back as they finish.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from src.entities.audio_file import AudioFile
+
+# The use case a pool worker runs and the batch's chunk start flags, installed once per worker process by
+# `_init_worker`
+_worker_use_case = None
+_started_chunks = None
+
+
+class BatchItemResult:
+    """
+    Represents the outcome of one file in a batch.
+
+    Attributes:
+        audio_file (AudioFile): The processed audio file.
+        result: The use case result, or None if processing failed.
+        error (str): A description of the failure, or None on success.
+    """
+
+    def __init__(self, audio_file: AudioFile, result=None, error: str = None):
+        self.audio_file = audio_file
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def run_batch(use_case, audio_files, max_workers=None, chunksize=1):
+    """
+    Runs `use_case.execute` over many audio files in a process pool.
+
+    Files are grouped into chunks of `chunksize` to amortize inter-process overhead, and results are yielded as
+    each chunk finishes rather than in input order. A failing file is reported as a failed item instead of
+    aborting the batch. If a worker process dies, the pool is broken and terminates its other workers: the
+    chunks that had started by then are reported as failed, and the chunks that had not are rerun in a new pool.
+
+    Args:
+        use_case: The use case to run; it must be picklable, and is sent to each worker once.
+        audio_files (iterable): The audio files to process.
+        max_workers (int): The number of worker processes (defaults to the CPU count).
+        chunksize (int): The number of files sent to a worker per task.
+
+    Yields:
+        BatchItemResult: The outcome of each file, in completion order.
+
+    Raises:
+        ValueError: If `chunksize` is less than 1.
+    """
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be at least 1, got {chunksize}")
+    audio_files = list(audio_files)
+    pending = dict(enumerate(audio_files[i:i + chunksize] for i in range(0, len(audio_files), chunksize)))
+    max_workers = max_workers or os.cpu_count() or 1
+    # Set by a worker as it starts a chunk, so a broken pool tells the chunks that ran from those only queued
+    started = multiprocessing.RawArray('b', len(pending))
+
+    while pending:
+        requeued = []
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(use_case, started)) as executor:
+            futures = {executor.submit(_execute_chunk, index, chunk): index for index, chunk in pending.items()}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    items = future.result()
+                except BrokenProcessPool as error:
+                    if not started[index]:
+                        requeued.append(index)
+                        continue
+                    items = _failed_items(pending[index], error)
+                yield from items
+                del pending[index]
+
+        if requeued and len(requeued) == len(futures):
+            # The pool broke before any chunk started (e.g. its workers cannot start); a new pool would too
+            for index in requeued:
+                yield from _failed_items(pending.pop(index), "no chunk started")
+
+
+def _failed_items(chunk, error):
+    return [BatchItemResult(audio_file, error=f"Worker process died: {error}") for audio_file in chunk]
+
+
+def _init_worker(use_case, started):
+    """
+    Installs the use case and the shared chunk start flags in a freshly started worker process.
+    """
+    global _worker_use_case, _started_chunks
+    _worker_use_case = use_case
+    _started_chunks = started
+
+
+def _execute_chunk(index, chunk):
+    """
+    Runs the worker's use case on each file of a chunk, isolating per-file failures.
+    """
+    _started_chunks[index] = 1
+    items = []
+    for audio_file in chunk:
+        try:
+            items.append(BatchItemResult(audio_file, result=_worker_use_case.execute(audio_file)))
+        except Exception as error:
+            # Exceptions are reported as text, since arbitrary exception types may not pickle back
+            items.append(BatchItemResult(audio_file, error=f"{type(error).__name__}: {error}"))
+    return items
@@ -3,8 +3,44 @@ Module: Extract Musical Features Use Case
 Location: use_cases/extract_musical_features.py
 Defines the use case for extracting musical features from an audio file.
 """
+from contextlib import nullcontext
+
 from src.entities.audio_file import AudioFile
-from src.entities.musical_feature import MusicalFeature
+from src.use_cases.backend_registry import BackendRegistry, UnknownBackendError
+from src.use_cases.batch_execution import run_batch
+from src.use_cases.instrumentation import SpanRecorder, span
+from src.entities.musical_feature import FEATURE_NAMES, MusicalFeature
+
+# The pitch outputs a caller can request: the first voiced pitches, the whole pooled contour, or none at all
+PITCH_MODES = ('summary', 'contour', 'off')
+
+# How the pitch track pools the frames of a beat or time bin
+PITCH_POOLINGS = ('median', 'mean')
+
+
+def parse_pitch_resolution(value):
+    """
+    Parses a pitch track resolution: "raw" (one row per frame), "beat" (one row per beat) or a bin width in
+    milliseconds.
+
+    Args:
+        value: The resolution, as given by the caller.
+
+    Returns:
+        The resolution as "raw", "beat" or a positive float.
+
+    Raises:
+        ValueError: If the resolution is none of these.
+    """
+    if value in ('raw', 'beat'):
+        return value
+    try:
+        milliseconds = float(value)
+    except (TypeError, ValueError):
+        milliseconds = None
+    if milliseconds is None or not milliseconds > 0 or milliseconds == float('inf'):
+        raise ValueError(f"Invalid pitch resolution: {value!r} (expected 'raw', 'beat' or milliseconds)")
+    return milliseconds
 
 
 class ExtractMusicalFeatures:
@@ -15,25 +51,85 @@ class ExtractMusicalFeatures:
     Attributes:
         feature_extractor: A service responsible for extracting musical
          features from the audio file.
+        backends (BackendRegistry): The analysis backends requests may select by name (optional); its default
+         backend is used when no feature extractor is given.
     """
 
-    def __init__(self, feature_extractor):
+    def __init__(self, feature_extractor=None, backends: BackendRegistry = None):
         self.feature_extractor = feature_extractor
+        self.backends = backends
 
-    def execute(self, audio_file: AudioFile) -> MusicalFeature:
+    def execute(self, audio_file: AudioFile, diagnostics=False, capture=None, features=None, pitch_mode='summary',
+                pitch_resolution='raw', pitch_pooling='median', backend=None) -> MusicalFeature:
         """
         Executes the extraction of musical features from the audio file.
 
         Args:
             audio_file (AudioFile): The audio file to extract features from.
+            diagnostics (bool): Whether to record the timings of each stage into the result's diagnostics.
+            capture (str): An optional "cprofile" or "tracemalloc" capture, added to the diagnostics.
+            features (iterable): The features to compute, among FEATURE_NAMES (all by default). Only the stages
+                they depend on run; the others are computed on first access of the result's attribute.
+            pitch_mode (str): "summary" for the first voiced pitches only, "contour" to also return the whole
+                pitch track, or "off" to skip pitch tracking.
+            pitch_resolution: The pitch track resolution: "raw", "beat" or a bin width in milliseconds.
+            pitch_pooling (str): How the pitch track pools each bin: "median" or "mean".
+            backend (str): The name of the analysis backend to extract with (optional).
 
         Returns:
             MusicalFeature: An object containing the extracted musical features.
+
+        Raises:
+            ValueError: If a requested feature or a pitch option is invalid.
+            UnknownBackendError: If the backend is unknown or does not extract features.
         """
-        features = self.feature_extractor.extract(audio_file)
+        feature_extractor = self._feature_extractor(backend)
+        if features is not None:
+            features = tuple(features)
+            unknown = [feature for feature in features if feature not in FEATURE_NAMES]
+            if unknown:
+                raise ValueError(f"Unknown features: {', '.join(map(str, unknown))} "
+                                 f"(expected some of {', '.join(FEATURE_NAMES)})")
+        if pitch_mode not in PITCH_MODES:
+            raise ValueError(f"Unknown pitch mode: {pitch_mode!r} (expected one of {', '.join(PITCH_MODES)})")
+        if pitch_pooling not in PITCH_POOLINGS:
+            raise ValueError(f"Unknown pitch pooling: {pitch_pooling!r} "
+                             f"(expected one of {', '.join(PITCH_POOLINGS)})")
+        pitch_resolution = parse_pitch_resolution(pitch_resolution)
+
+        recorder = SpanRecorder(capture) if diagnostics or capture else None
+        with recorder or nullcontext(), span('extract_musical_features'):
+            extracted = feature_extractor.extract(audio_file, features=features, pitch_mode=pitch_mode,
+                                                  pitch_resolution=pitch_resolution, pitch_pooling=pitch_pooling)
         return MusicalFeature(
-            tempo=features["tempo"],
-            key=features["key"],
-            pitch=features["pitch"],
-            rhythm=features["rhythm"]
-        )
\ No newline at end of file
+            tempo=extracted["tempo"],
+            key=extracted["key"],
+            pitch=extracted["pitch"],
+            rhythm=extracted["rhythm"],
+            pitch_track=extracted.get("pitch_track"),
+            diagnostics=recorder.diagnostics() if recorder else None
+        )
+
+    def _feature_extractor(self, backend):
+        """
+        Resolves the feature extractor of a backend, or the configured one when no backend is named.
+        """
+        if backend is None and self.feature_extractor is not None:
+            return self.feature_extractor
+        if self.backends is None:
+            raise UnknownBackendError(f"Unknown backend: {backend!r} (no backends are registered)")
+        return self.backends.resolve('feature_extractor', backend)
+
+    def execute_batch(self, audio_files, max_workers=None, chunksize=1):
+        """
+        Executes the use case over many audio files in a process pool.
+
+        Args:
+            audio_files (iterable): The audio files to extract musical features from.
+            max_workers (int): The number of worker processes (defaults to the CPU count).
+            chunksize (int): The number of files sent to a worker per task.
+
+        Yields:
+            BatchItemResult: The outcome of each file, in completion order; failures are reported per file.
+        """
+        yield from run_batch(self, audio_files, max_workers=max_workers, chunksize=chunksize)
@@ -0,0 +1,205 @@
+"""
+Module: Instrumentation
+Location: use_cases/instrumentation.py
+Provides the spans services wrap their processing stages in, the measurements they report, and the recorder
+that collects both into Diagnostics while a use case runs. Spans and measurements cost nothing but a
+context-variable lookup when no recorder is active, so they stay in the code paths permanently.
+
+Spans also serve as cancellation points: under an active deadline, entering a span after the deadline has
+passed aborts the execution, so a timed-out job stops at its next stage instead of running to the end.
+"""
+
+import contextvars
+import cProfile
+import functools
+import io
+import pstats
+import time
+import tracemalloc
+
+from src.entities.diagnostics import Diagnostics, SpanTiming
+
+# The capture modes a recorder supports besides span timing
+CAPTURE_MODES = ('cprofile', 'tracemalloc')
+
+_active_recorder = contextvars.ContextVar('active_recorder', default=None)
+_active_deadline = contextvars.ContextVar('active_deadline', default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    """
+    Raised when a stage starts after the deadline of the execution it belongs to.
+    """
+
+
+class span:
+    """
+    Times a processing stage into the active SpanRecorder, if any. Usable as a context manager or a decorator:
+
+        with span('beats'):
+            ...
+
+        @span('segmentation')
+        def segment(...):
+            ...
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._recorder = None
+
+    def __enter__(self):
+        expires_at = _active_deadline.get()
+        if expires_at is not None and time.time() > expires_at:
+            raise DeadlineExceededError(f"Deadline exceeded before stage {self.name!r}")
+        self._recorder = _active_recorder.get()
+        if self._recorder is not None:
+            self._recorder.start_span(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._recorder is not None:
+            self._recorder.end_span()
+            self._recorder = None
+        return False
+
+    def __call__(self, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            # A fresh span per call, so recursive and concurrent calls do not share state
+            with span(self.name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+
+class deadline:
+    """
+    Sets the time by which the enclosed execution must finish; stages started later raise DeadlineExceededError.
+    A stage already running is not interrupted.
+
+        with deadline(time.time() + 60):
+            use_case.execute(audio_file)
+    """
+
+    def __init__(self, expires_at):
+        """
+        Args:
+            expires_at (float): The deadline as a `time.time()` timestamp, comparable across processes of a host,
+                or None for no deadline.
+        """
+        self.expires_at = expires_at
+        self._token = None
+
+    def __enter__(self):
+        self._token = _active_deadline.set(self.expires_at)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active_deadline.reset(self._token)
+        return False
+
+
+def measure(name, value):
+    """
+    Adds a value to a named measurement of the active SpanRecorder, if any, e.g. the seconds of audio a stage
+    skipped. Values reported under the same name during one recording are summed.
+    """
+    recorder = _active_recorder.get()
+    if recorder is not None:
+        recorder.add_measurement(name, value)
+
+
+class SpanRecorder:
+    """
+    Collects the spans started while it is active, aggregated by stage path.
+
+    Wall time is measured with `time.perf_counter` and CPU time with `time.process_time`, which counts every
+    thread of the process (including BLAS and FFT worker threads). Peak allocated bytes are measured only while
+    tracemalloc is tracing, either because the process runs with PYTHONTRACEMALLOC or because of the
+    "tracemalloc" capture mode.
+
+    Attributes:
+        capture (str): An optional capture mode: "cprofile" to profile the execution, or "tracemalloc" to trace
+            allocations and report the top allocation sites.
+    """
+
+    def __init__(self, capture=None, top=25):
+        if capture is not None and capture not in CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode: {capture!r} (expected one of {', '.join(CAPTURE_MODES)})")
+        self.capture = capture
+        self.top = top
+        self._timings = {}
+        self._measurements = {}
+        self._stack = []
+        self._token = None
+        self._profiler = None
+        self._started_tracing = False
+        self._profile = None
+        self._allocations = None
+
+    def __enter__(self):
+        self._token = _active_recorder.set(self)
+        if self.capture == 'tracemalloc' and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        elif self.capture == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active_recorder.reset(self._token)
+        if self._profiler is not None:
+            self._profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(self._profiler, stream=stream).sort_stats('cumulative').print_stats(self.top)
+            self._profile = stream.getvalue()
+            self._profiler = None
+        if self.capture == 'tracemalloc' and tracemalloc.is_tracing():
+            statistics = tracemalloc.take_snapshot().statistics('lineno')
+            self._allocations = [str(statistic) for statistic in statistics[:self.top]]
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+        return False
+
+    def start_span(self, name):
+        path = f"{self._stack[-1]['path']}/{name}" if self._stack else name
+        allocated = None
+        if tracemalloc.is_tracing():
+            allocated, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+        self._stack.append({'path': path, 'wall': time.perf_counter(), 'cpu': time.process_time(),
+                            'allocated': allocated, 'peak': allocated})
+        if path not in self._timings:
+            self._timings[path] = SpanTiming(path)
+
+    def end_span(self):
+        wall, cpu = time.perf_counter(), time.process_time()
+        frame = self._stack.pop()
+        timing = self._timings[frame['path']]
+        timing.calls += 1
+        timing.wall_seconds += wall - frame['wall']
+        timing.cpu_seconds += cpu - frame['cpu']
+
+        if frame['allocated'] is not None and tracemalloc.is_tracing():
+            # Peaks are tracked per frame because reset_peak is global: a parent's peak is the largest of its
+            # own and its children's
+            frame['peak'] = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            allocated = frame['peak'] - frame['allocated']
+            timing.peak_allocated_bytes = max(timing.peak_allocated_bytes or 0, allocated)
+            if self._stack and self._stack[-1]['peak'] is not None:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], frame['peak'])
+
+    def add_measurement(self, name, value):
+        self._measurements[name] = self._measurements.get(name, 0.0) + float(value)
+
+    def diagnostics(self):
+        """
+        Returns the recorded spans, measurements and captures.
+        """
+        return Diagnostics(spans=list(self._timings.values()), profile=self._profile,
+                           allocations=self._allocations, measurements=dict(self._measurements))
@@ -0,0 +1,141 @@
+"""
+Module: Job Scheduler
+Location: use_cases/job_scheduler.py
+Schedules use case executions in-process: identical in-flight requests are coalesced into one execution,
+short recordings are served from a higher-priority lane than long ones, and the queue is bounded so the
+service rejects work when overloaded instead of thrashing.
+"""
+
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from functools import partial
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is submitted while the scheduler's queue is full.
+    """
+    pass
+
+
+class JobScheduler:
+    """
+    Runs submitted jobs on a fixed set of worker threads.
+
+    Jobs are keyed by the caller (typically content hash, use case and parameters): submitting a key that is
+    already queued or running returns the existing future instead of scheduling the work again. Each job is
+    assigned to the first lane whose duration threshold it does not exceed, and lower lanes are always served
+    first. Jobs of unknown duration go to the last lane.
+
+    Attributes:
+        max_queue (int): The number of waiting (not yet running) jobs beyond which submissions are rejected.
+        lane_thresholds (tuple): The upper duration bounds, in seconds, of every lane but the last.
+    """
+
+    def __init__(self, workers=2, max_queue=32, lane_thresholds=(60.0, 600.0)):
+        self.max_queue = max_queue
+        self.lane_thresholds = tuple(lane_thresholds)
+        self._queue = []
+        self._in_flight = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._work, name=f"job-scheduler-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key, fn, *args, duration=None, **kwargs):
+        """
+        Schedules `fn(*args, **kwargs)` unless an identical job is already in flight.
+
+        Args:
+            key: A hashable identity of the job; jobs with equal keys share one execution.
+            fn (callable): The work to run, e.g. a use case's `execute`.
+            duration (float): The duration of the audio in seconds, used to pick the priority lane.
+
+        Returns:
+            concurrent.futures.Future: The future of the (possibly shared) execution.
+
+        Raises:
+            QueueFullError: If the queue already holds `max_queue` waiting jobs.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down")
+            existing = self._in_flight.get(key)
+            if existing is not None:
+                return existing
+            if len(self._queue) >= self.max_queue:
+                raise QueueFullError(f"{len(self._queue)} jobs are already waiting")
+
+            future = Future()
+            self._in_flight[key] = future
+            heapq.heappush(self._queue, (self.lane_for(duration), next(self._sequence), key, fn, args, kwargs,
+                                         future))
+            self._condition.notify()
+            return future
+
+    def lane_for(self, duration):
+        """
+        Returns the lane index of a job of the given duration (0 is served first).
+        """
+        if duration is None:
+            return len(self.lane_thresholds)
+        for lane, threshold in enumerate(self.lane_thresholds):
+            if duration <= threshold:
+                return lane
+        return len(self.lane_thresholds)
+
+    def is_full(self):
+        with self._condition:
+            return len(self._queue) >= self.max_queue
+
+    def queued(self):
+        """
+        Returns the number of jobs waiting for a worker.
+        """
+        with self._condition:
+            return len(self._queue)
+
+    def shutdown(self, wait=True):
+        """
+        Stops accepting jobs, cancels the waiting ones and lets running ones finish.
+        """
+        with self._condition:
+            self._closed = True
+            for *_, key, _fn, _args, _kwargs, future in self._queue:
+                self._in_flight.pop(key, None)
+                future.cancel()
+            self._queue.clear()
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._queue:
+                    return
+                _, _, key, fn, args, kwargs, future = heapq.heappop(self._queue)
+
+            outcome = None
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as error:
+                    outcome = partial(future.set_exception, error)
+                else:
+                    outcome = partial(future.set_result, result)
+            # Retire the key before resolving the future, so a submission racing the completion starts a new
+            # execution instead of joining a finished one, and never retires another execution's key
+            with self._condition:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+            if outcome is not None:
+                outcome()
@@ -4,8 +4,13 @@ Location: use_cases/transcribe_audio_to_score.py
 Defines the use case for transcribing audio into a musical score.
 """
 
+from contextlib import nullcontext
+
 from src.entities.transcription_result import TranscriptionResult
 from src.entities.audio_file import AudioFile
+from src.use_cases.backend_registry import BackendRegistry, UnknownBackendError
+from src.use_cases.batch_execution import run_batch
+from src.use_cases.instrumentation import SpanRecorder, span
 
 
 class TranscribeAudioToScore:
@@ -14,20 +19,56 @@ class TranscribeAudioToScore:
 
     Attributes:
         transcription_service: A service that handles the transcription process (audio to score).
+        backends (BackendRegistry): The analysis backends requests may select by name (optional); its default
+            backend is used when no transcription service is given.
     """
 
-    def __init__(self, transcription_service):
+    def __init__(self, transcription_service=None, backends: BackendRegistry = None):
         self.transcription_service = transcription_service
+        self.backends = backends
 
-    def execute(self, audio_file: AudioFile) -> TranscriptionResult:
+    def execute(self, audio_file: AudioFile, diagnostics=False, capture=None, backend=None) -> TranscriptionResult:
         """
         Executes the transcription of the given audio file.
 
         Args:
             audio_file (AudioFile): The audio file to be transcribed.
+            diagnostics (bool): Whether to record the timings of each stage into the result's diagnostics.
+            capture (str): An optional "cprofile" or "tracemalloc" capture, added to the diagnostics.
+            backend (str): The name of the analysis backend to transcribe with (optional).
 
         Returns:
             TranscriptionResult: The result containing MIDI data and MusicXML score data.
+
+        Raises:
+            UnknownBackendError: If the backend is unknown or does not transcribe.
+        """
+        transcription_service = self._transcription_service(backend)
+        recorder = SpanRecorder(capture) if diagnostics or capture else None
+        with recorder or nullcontext(), span('transcribe_audio_to_score'):
+            midi_data, score_data = transcription_service.transcribe(audio_file)
+        return TranscriptionResult(midi_data, score_data, diagnostics=recorder.diagnostics() if recorder else None)
+
+    def _transcription_service(self, backend):
+        """
+        Resolves the transcription service of a backend, or the configured one when no backend is named.
+        """
+        if backend is None and self.transcription_service is not None:
+            return self.transcription_service
+        if self.backends is None:
+            raise UnknownBackendError(f"Unknown backend: {backend!r} (no backends are registered)")
+        return self.backends.resolve('transcription_service', backend)
+
+    def execute_batch(self, audio_files, max_workers=None, chunksize=1):
+        """
+        Executes the use case over many audio files in a process pool.
+
+        Args:
+            audio_files (iterable): The audio files to transcribe.
+            max_workers (int): The number of worker processes (defaults to the CPU count).
+            chunksize (int): The number of files sent to a worker per task.
+
+        Yields:
+            BatchItemResult: The outcome of each file, in completion order; failures are reported per file.
         """
-        midi_data, score_data = self.transcription_service.transcribe(audio_file)
-        return TranscriptionResult(midi_data, score_data)
\ No newline at end of file
+        yield from run_batch(self, audio_files, max_workers=max_workers, chunksize=chunksize)
@@ -0,0 +1,88 @@
+"""
+Tests for the active-region pre-pass and the mapping from the compacted to the original timeline.
+"""
+
+import numpy as np
+
+from src.infrastructure.active_regions import ActiveRegions, find_active_regions
+
+SR = 8000
+HOP = 512
+
+
+def _tone(seconds, frequency=440.0):
+    t = np.arange(int(seconds * SR)) / SR
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def _silence(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+def test_long_gaps_are_cut_and_short_pauses_kept():
+    # Leading silence, tone, a pause too short to cut, tone, a long gap, tone, trailing silence
+    y = np.concatenate([_silence(2.0), _tone(1.0), _silence(0.5), _tone(1.0), _silence(4.0), _tone(1.0),
+                        _silence(2.0)])
+
+    regions = find_active_regions(y, SR, block_length=HOP)
+
+    assert len(regions.regions) == 2
+    assert (regions.regions[:, 0] % HOP == 0).all()
+    (first_start, first_stop), (second_start, second_stop) = regions.regions / SR
+    # Each region holds its sound plus about the padding on either side, to block precision
+    assert 1.6 < first_start < 2.0 and 4.5 < first_stop < 4.9
+    assert 8.1 < second_start < 8.5 and 9.5 < second_stop < 9.9
+    assert regions.n_active_samples == sum(len(y[start:stop]) for start, stop in regions.regions)
+    assert np.isclose(regions.active_seconds + regions.skipped_seconds, len(y) / SR)
+    assert not regions.covers_all()
+
+
+def test_continuous_and_silent_signals():
+    y = _tone(3.0)
+    regions = find_active_regions(y, SR, block_length=HOP)
+    assert regions.covers_all() and regions.compact(y) is y
+
+    silent = find_active_regions(_silence(3.0), SR, block_length=HOP)
+    assert len(silent.regions) == 0 and silent.n_active_samples == 0
+    assert len(find_active_regions(np.zeros(0, dtype=np.float32), SR).regions) == 0
+
+
+def test_partial_last_block_counts():
+    # The only sound lies in the final, partial block
+    y = np.concatenate([_silence(3.0), _tone(0.03)])
+    regions = find_active_regions(y, SR, block_length=HOP, padding=0.0)
+    assert regions.regions[-1, 1] == len(y)
+
+
+def test_times_map_back_to_the_original_timeline():
+    regions = ActiveRegions([[SR, 3 * SR], [10 * SR, 11 * SR]], SR, 12 * SR)
+    assert regions.active_seconds == 3.0 and regions.skipped_seconds == 9.0
+
+    # Compacted seconds 0-2 lie in the first region, 2-3 in the second
+    mapped = regions.to_original_time([0.0, 1.5, 1.999, 2.0, 2.5])
+    assert np.allclose(mapped, [1.0, 2.5, 2.999, 10.0, 10.5])
+
+    y = np.arange(12 * SR, dtype=np.float32)
+    compacted = regions.compact(y)
+    assert len(compacted) == 3 * SR
+    assert compacted[0] == SR and compacted[2 * SR] == 10 * SR
+
+
+def test_frames_are_placed_on_the_original_grid():
+    regions = ActiveRegions([[2 * HOP, 4 * HOP], [8 * HOP, 10 * HOP]], SR, 12 * HOP)
+    values = np.arange(1, 5, dtype=np.float32)
+
+    expanded = regions.expand_frames(values, HOP)
+
+    assert len(expanded) == 13 and expanded.dtype == np.float32
+    assert np.array_equal(np.flatnonzero(expanded), [2, 3, 8, 9])
+    assert np.array_equal(expanded[[2, 3, 8, 9]], values)
+
+
+def test_found_regions_round_trip_times():
+    y = np.concatenate([_silence(3.0), _tone(1.0), _silence(3.0), _tone(1.0)])
+    regions = find_active_regions(y, SR, block_length=HOP)
+    # The start of every region on the compacted timeline maps to the region's start in the original
+    lengths = regions.regions[:, 1] - regions.regions[:, 0]
+    compacted_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) / SR
+    assert np.allclose(regions.to_original_time(compacted_starts), regions.regions[:, 0] / SR)
@@ -0,0 +1,76 @@
+"""
+Tests that the analysis backends produce conforming, mutually consistent features on a synthetic signal: a
+C major triad under a click track at 120 BPM.
+"""
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.benchmark import check_conformance
+from src.entities.audio_file import AudioFile
+from src.infrastructure.librosa_feature_extractor import LibrosaFeatureExtractor
+from src.infrastructure.numpy_feature_extractor import NumpyFeatureExtractor
+
+SR = 22050
+DURATION = 12.0
+BEAT_SECONDS = 0.5
+TRIAD = (261.63, 329.63, 392.0)
+
+
+def _click_track_over_triad():
+    t = np.arange(int(SR * DURATION)) / SR
+    y = sum(0.15 * np.sin(2 * np.pi * frequency * t) for frequency in TRIAD)
+    click_length = int(0.02 * SR)
+    n = np.arange(click_length)
+    click = 0.8 * np.exp(-n / (0.003 * SR)) * np.sin(2 * np.pi * 1000 * n / SR)
+    for beat in np.arange(0, DURATION, BEAT_SECONDS):
+        start = int(beat * SR)
+        y[start:start + click_length] += click
+    return y.astype(np.float32)
+
+
+@pytest.fixture(scope='module')
+def audio_file(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('audio') / 'click_triad.wav')
+    sf.write(path, _click_track_over_triad(), SR)
+    return AudioFile(path, 'wav', DURATION, SR)
+
+
+@pytest.fixture(scope='module', params=[NumpyFeatureExtractor, LibrosaFeatureExtractor], ids=['numpy', 'librosa'])
+def extracted(request, audio_file):
+    return request.param().extract(audio_file, pitch_mode='contour')
+
+
+def test_output_conforms(extracted):
+    assert check_conformance(extracted, DURATION) == []
+
+
+def test_estimates_match_the_signal(extracted):
+    assert float(np.atleast_1d(extracted['tempo'])[0]) == pytest.approx(60 / BEAT_SECONDS, rel=0.05)
+    assert extracted['key'] == "C major"
+    assert np.median(np.diff(extracted['rhythm'])) == pytest.approx(BEAT_SECONDS, rel=0.05)
+    # Every summary pitch is one of the triad's notes, within a quarter tone
+    cents = 1200 * np.abs(np.log2(extracted['pitch'][:, None] / np.array(TRIAD)[None, :])).min(axis=1)
+    assert (cents < 50).all()
+
+
+@pytest.mark.parametrize('extractor_class', [NumpyFeatureExtractor, LibrosaFeatureExtractor],
+                         ids=['numpy', 'librosa'])
+def test_deferred_features_equal_eager_ones(extractor_class, audio_file):
+    extractor = extractor_class()
+    eager = extractor.extract(audio_file)
+    partial = extractor.extract(audio_file, features=['tempo'])
+
+    assert not callable(partial['tempo'])
+    assert callable(partial['key']) and callable(partial['pitch']) and callable(partial['rhythm'])
+    assert partial['key']() == eager['key']
+    assert np.array_equal(partial['rhythm'](), eager['rhythm'])
+    assert np.array_equal(partial['pitch'](), eager['pitch'])
+
+
+def test_numpy_backend_requires_the_rate_of_a_signal(audio_file):
+    y = _click_track_over_triad()
+    with pytest.raises(ValueError, match="sample_rate is required"):
+        NumpyFeatureExtractor().extract(audio_file, y=y)
+    assert NumpyFeatureExtractor().extract(audio_file, y=y, sample_rate=SR)['key'] == "C major"
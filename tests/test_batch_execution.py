@@ -0,0 +1,62 @@
+"""
+Tests for batch execution over a process pool: per-file failures, and recovery when a worker process dies.
+"""
+
+import os
+import time
+
+import pytest
+
+from src.entities.audio_file import AudioFile
+from src.use_cases.batch_execution import run_batch
+
+
+class _FlakyUseCase:
+    """
+    Echoes each file's path, raising for "bad" files and killing its worker process on "crash" files.
+    """
+
+    def execute(self, audio_file):
+        name = os.path.basename(audio_file.file_path)
+        if name.startswith('crash'):
+            os._exit(1)
+        if name.startswith('bad'):
+            raise ValueError(f"cannot decode {name}")
+        time.sleep(0.05)
+        return name
+
+
+def _audio_files(*names):
+    return [AudioFile(f"/audio/{name}", 'wav', 1.0, 44100) for name in names]
+
+
+def _outcomes(items):
+    return {os.path.basename(item.audio_file.file_path): item for item in items}
+
+
+def test_failing_files_do_not_abort_the_batch():
+    outcomes = _outcomes(run_batch(_FlakyUseCase(), _audio_files('a.wav', 'bad.wav', 'b.wav'), max_workers=2))
+
+    assert outcomes['a.wav'].ok and outcomes['a.wav'].result == 'a.wav'
+    assert not outcomes['bad.wav'].ok and outcomes['bad.wav'].error == "ValueError: cannot decode bad.wav"
+    assert outcomes['b.wav'].ok
+
+
+@pytest.mark.parametrize('chunksize', [1, 2])
+def test_dead_worker_fails_only_the_chunks_in_progress(chunksize):
+    names = ['crash.wav'] + [f'{i}.wav' for i in range(7)]
+
+    items = list(run_batch(_FlakyUseCase(), _audio_files(*names), max_workers=2, chunksize=chunksize))
+
+    outcomes = _outcomes(items)
+    assert len(items) == len(names) and set(outcomes) == set(names)
+    assert outcomes['crash.wav'].error.startswith("Worker process died")
+    # Besides the crashing chunk, at most the chunk running on the other worker is lost with the pool
+    failed = [name for name, item in outcomes.items() if not item.ok]
+    assert len(failed) <= 2 * chunksize
+    assert all(outcomes[name].result == name for name in names if name not in failed)
+
+
+def test_chunksize_must_be_positive():
+    with pytest.raises(ValueError, match="chunksize"):
+        list(run_batch(_FlakyUseCase(), _audio_files('a.wav'), chunksize=0))
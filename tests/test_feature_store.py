@@ -0,0 +1,77 @@
+"""
+Tests for the persistent feature store and the extractor decorator serving repeat requests from it.
+"""
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.entities.audio_file import AudioFile
+from src.infrastructure.feature_store import FeatureStore, StoredFeatureExtractor
+from src.infrastructure.numpy_feature_extractor import NumpyFeatureExtractor
+from src.infrastructure.startup import synthetic_signal
+
+SR = 22050
+DURATION = 6.0
+
+
+class _CountingExtractor(NumpyFeatureExtractor):
+    """
+    Records the features of every extraction that reaches the backend.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def extract(self, audio_file, **kwargs):
+        self.calls.append(kwargs.get('features'))
+        return super().extract(audio_file, **kwargs)
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = str(tmp_path / 'triad.wav')
+    sf.write(path, synthetic_signal(SR, DURATION), SR)
+    return AudioFile(path, 'wav', DURATION, SR)
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    backend = _CountingExtractor()
+    return backend, StoredFeatureExtractor(backend, FeatureStore(str(tmp_path / 'store')))
+
+
+def test_repeat_request_is_served_from_the_store(audio_file, extractor):
+    backend, stored = extractor
+    first = stored.extract(audio_file)
+    second = stored.extract(audio_file)
+
+    assert len(backend.calls) == 1
+    assert second['tempo'] == pytest.approx(float(np.atleast_1d(first['tempo'])[0]))
+    assert second['key'] == first['key']
+    assert np.allclose(second['rhythm'], first['rhythm'])
+    assert np.allclose(second['pitch'], first['pitch'])
+
+
+def test_feature_subsets_are_stored_too(audio_file, extractor):
+    backend, stored = extractor
+    partial = stored.extract(audio_file, features=['tempo'])
+    assert not callable(partial['key'])
+
+    repeat = stored.extract(audio_file, features=['tempo'])
+    other = stored.extract(audio_file, features=['key', 'rhythm'])
+
+    assert len(backend.calls) == 1
+    assert repeat['key'] == other['key'] == partial['key']
+    assert np.allclose(other['rhythm'], partial['rhythm'])
+
+
+def test_contour_resolutions_share_an_entry(audio_file, extractor):
+    backend, stored = extractor
+    stored.extract(audio_file, pitch_mode='contour')
+    per_beat = stored.extract(audio_file, pitch_mode='contour', pitch_resolution='beat')
+
+    assert len(backend.calls) == 1
+    # One bin before the first beat, then one per beat
+    assert np.allclose(per_beat['pitch_track']['time'][1:], per_beat['rhythm'])
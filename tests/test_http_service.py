@@ -0,0 +1,173 @@
+"""
+Tests for the HTTP service, driven by a local HTTP client against a service on an ephemeral port. The pool
+workers run stub controllers, so the tests exercise the service without decoding any audio.
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.entities.music_score import MusicScore
+from src.entities.musical_feature import MusicalFeature
+from src.entities.note import SCORE_NOTE_DTYPE
+from src.entities.transcription_result import TranscriptionResult
+from src.infrastructure.musicxml_writer import MusicXMLDocument
+from src.interface_adapters.http_service import AudioHttpService
+from src.use_cases.instrumentation import span
+
+UPLOAD = b'RIFF' + bytes(60)
+
+# The seconds a "slow" job would take if it ran to the end
+SLOW_JOB_SECONDS = 30.0
+
+
+class _StubUploadController:
+    def upload_audio(self, request):
+        score = MusicScore("Stub")
+        score.add_notes(np.array([(60 + i % 12, 4 * i, 4, 90) for i in range(400)], dtype=SCORE_NOTE_DTYPE))
+        return TranscriptionResult(b'MThd', MusicXMLDocument(score))
+
+
+class _StubFeatureController:
+    def __init__(self, genre):
+        self.genre = genre
+
+    def extract_features(self, request):
+        if self.genre == 'slow':
+            # Many short stages, each a point at which the job's deadline is checked
+            for _ in range(int(SLOW_JOB_SECONDS / 0.05)):
+                with span('stage'):
+                    time.sleep(0.05)
+        return MusicalFeature(tempo=120.0, key="C major", pitch=[440.0], rhythm=[0.5, 1.0])
+
+
+def _stub_controllers(genre):
+    return _StubUploadController(), _StubFeatureController(genre)
+
+
+def _request(port, method, path, body=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def _wait_for_job(port, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        _, _, body = _request(port, 'GET', f'/jobs/{job_id}')
+        job = json.loads(body)
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish within {timeout} seconds")
+
+
+def _serve(upload_dir, client, **options):
+    """
+    Runs `client(service, port)` in a thread against a running service, and returns its result.
+    """
+    async def main():
+        service = AudioHttpService(_stub_controllers, str(upload_dir), max_workers=1, genres=('general', 'slow'),
+                                   profiles=('fast', 'balanced'), **options)
+        server = await service.start(port=0)
+        try:
+            return await asyncio.to_thread(client, service, server.sockets[0].getsockname()[1])
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+def test_feature_job_round_trip(tmp_path):
+    def client(service, port):
+        status, headers, body = _request(port, 'POST', '/features?filename=a.wav', UPLOAD)
+        assert status == 202
+        job_id = json.loads(body)['job_id']
+        assert headers['Location'] == f'/jobs/{job_id}'
+        assert _wait_for_job(port, job_id)['status'] == 'done'
+
+        status, _, body = _request(port, 'GET', f'/jobs/{job_id}/result?format=json')
+        assert status == 200
+        result = json.loads(body)
+        assert result['tempo'] == 120.0 and result['key'] == "C major"
+
+        status, _, body = _request(port, 'GET', f'/jobs/{job_id}/midi')
+        assert status == 404
+        return job_id
+
+    _serve(tmp_path, client)
+    # The upload is removed once its job has finished
+    assert os.listdir(tmp_path) == []
+
+
+def test_score_is_streamed_in_chunks(tmp_path):
+    def client(service, port):
+        _, _, body = _request(port, 'POST', '/transcriptions?filename=a.wav', UPLOAD)
+        job_id = json.loads(body)['job_id']
+        assert _wait_for_job(port, job_id)['status'] == 'done'
+        return _request(port, 'GET', f'/jobs/{job_id}/score')
+
+    status, headers, body = _serve(tmp_path, client)
+    assert status == 200
+    assert headers['Transfer-Encoding'] == 'chunked' and 'Content-Length' not in headers
+    assert body.startswith(b'<?xml') and body.endswith(b'</score-partwise>\n')
+    assert body.count(b'<note>') >= 400
+
+
+@pytest.mark.parametrize('query, message', [
+    ('sample_rate=abc', "Invalid sample rate"),
+    ('sample_rate=-1', "Invalid sample rate"),
+    ('genre=bogus', "Unknown genre"),
+    ('profile=typo', "Unknown profile"),
+    ('features=tempo,loudness', "Unknown features"),
+    ('pitch_mode=loud', "Unknown pitch mode"),
+    ('capture=perf', "Unknown capture mode"),
+])
+def test_invalid_parameters_are_rejected_before_the_upload(tmp_path, query, message):
+    def client(service, port):
+        return _request(port, 'POST', f'/features?filename=a.wav&{query}', UPLOAD)
+
+    status, _, body = _serve(tmp_path, client)
+    assert status == 400
+    assert json.loads(body)['error'].startswith(message)
+    assert os.listdir(tmp_path) == []
+
+
+def test_missing_content_length_and_unknown_job(tmp_path):
+    def client(service, port):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        connection.putrequest('POST', '/features')
+        connection.endheaders()
+        missing_length = connection.getresponse().status
+        connection.close()
+        return missing_length, _request(port, 'GET', '/jobs/unknown')[0]
+
+    assert _serve(tmp_path, client) == (411, 404)
+
+
+def test_timed_out_job_is_abandoned(tmp_path):
+    def client(service, port):
+        started = time.monotonic()
+        _, _, body = _request(port, 'POST', '/features?filename=a.wav&genre=slow', UPLOAD)
+        job_id = json.loads(body)['job_id']
+        job = _wait_for_job(port, job_id)
+        # The execution itself stops at its next stage rather than running to the end
+        execution = service.jobs[job_id].future
+        while not execution.done():
+            time.sleep(0.05)
+        status, _, _ = _request(port, 'GET', f'/jobs/{job_id}/result')
+        return job, status, time.monotonic() - started
+
+    job, result_status, elapsed = _serve(tmp_path, client, job_timeout=0.5)
+    assert job['status'] == 'timeout'
+    assert result_status == 409
+    assert elapsed < SLOW_JOB_SECONDS / 3
@@ -0,0 +1,117 @@
+"""
+Tests for the job scheduler: single-flight coalescing, priority lanes and the bounded queue.
+"""
+
+import threading
+
+import pytest
+
+from src.use_cases.job_scheduler import JobScheduler, QueueFullError
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = JobScheduler(workers=1, max_queue=2)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def _blocking_job(scheduler):
+    """
+    Occupies the scheduler's only worker until the returned event is set.
+    """
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(10)
+
+    scheduler.submit('blocker', block)
+    assert started.wait(10)
+    return release
+
+
+def test_identical_keys_share_one_execution(scheduler):
+    release = _blocking_job(scheduler)
+    calls = []
+
+    def work(value):
+        calls.append(value)
+        return value * 2
+
+    first = scheduler.submit(('features', 'abc'), work, 21)
+    second = scheduler.submit(('features', 'abc'), work, 21)
+    other = scheduler.submit(('features', 'def'), work, 1)
+    assert first is second and first is not other
+
+    release.set()
+    assert first.result(10) == 42 and other.result(10) == 2
+    assert sorted(calls) == [1, 21]
+
+
+def test_key_is_released_after_the_execution(scheduler):
+    first = scheduler.submit('key', lambda: 'first')
+    assert first.result(10) == 'first'
+    second = scheduler.submit('key', lambda: 'second')
+    assert second.result(10) == 'second'
+
+
+def test_errors_reach_every_waiter(scheduler):
+    release = _blocking_job(scheduler)
+
+    def fail():
+        raise ValueError("broken upload")
+
+    first = scheduler.submit('key', fail)
+    second = scheduler.submit('key', fail)
+    release.set()
+    for future in (first, second):
+        with pytest.raises(ValueError, match="broken upload"):
+            future.result(10)
+
+
+def test_short_jobs_are_served_first(scheduler):
+    release = _blocking_job(scheduler)
+    order = []
+    long_job = scheduler.submit('long', order.append, 'long', duration=3600)
+    short_job = scheduler.submit('short', order.append, 'short', duration=30)
+    release.set()
+    long_job.result(10), short_job.result(10)
+    assert order == ['short', 'long']
+    assert [scheduler.lane_for(d) for d in (30, 60, 61, 600, 601, None)] == [0, 0, 1, 1, 2, 2]
+
+
+def test_full_queue_rejects_new_keys_but_not_in_flight_ones(scheduler):
+    release = _blocking_job(scheduler)
+    queued = scheduler.submit('a', lambda: 'a')
+    scheduler.submit('b', lambda: 'b')
+    assert scheduler.is_full() and scheduler.queued() == 2
+
+    with pytest.raises(QueueFullError):
+        scheduler.submit('c', lambda: 'c')
+    # Joining a queued execution does not take a queue slot
+    assert scheduler.submit('a', lambda: 'a') is queued
+    release.set()
+    assert queued.result(10) == 'a'
+
+
+def test_shutdown_cancels_waiting_jobs():
+    scheduler = JobScheduler(workers=1, max_queue=4)
+    release = _blocking_job(scheduler)
+    waiting = scheduler.submit('waiting', lambda: None)
+    scheduler.shutdown(wait=False)
+    release.set()
+    assert waiting.cancelled()
+    with pytest.raises(RuntimeError):
+        scheduler.submit('late', lambda: None)
+
+
+def test_key_is_retired_before_the_result_is_published(scheduler):
+    seen = []
+    first = scheduler.submit('key', lambda: 'first')
+    # Runs on the worker thread as the future resolves; the key must already be free
+    first.add_done_callback(lambda _: seen.append(scheduler.submit('key', lambda: 'second')))
+
+    assert first.result(10) == 'first'
+    assert len(seen) == 1 and seen[0] is not first
+    assert seen[0].result(10) == 'second'
@@ -0,0 +1,117 @@
+"""
+Tests for the Standard MIDI File writer, parsing its output back byte by byte.
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from src.infrastructure.midi_writer import write_midi_bytes
+from src.infrastructure.note_segmentation import NOTE_DTYPE
+
+
+def _notes(*notes):
+    return np.array(list(notes), dtype=NOTE_DTYPE)
+
+
+def _read_variable_length(data, position):
+    value = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, position
+
+
+def _parse(data):
+    """
+    Parses a format 0 file into its header fields, tempo and note events as (tick, kind, pitch, velocity).
+    """
+    assert data[:4] == b'MThd'
+    header_length, file_format, tracks, ticks_per_beat = struct.unpack('>IHHH', data[4:14])
+    assert data[14:18] == b'MTrk'
+    track_length, = struct.unpack('>I', data[18:22])
+    track = data[22:]
+    assert len(track) == track_length
+
+    tempo, events, tick, position = None, [], 0, 0
+    while position < len(track):
+        delta, position = _read_variable_length(track, position)
+        tick += delta
+        status = track[position]
+        if status == 0xFF:
+            kind, length = track[position + 1], track[position + 2]
+            payload = track[position + 3:position + 3 + length]
+            position += 3 + length
+            if kind == 0x51:
+                tempo = int.from_bytes(payload, 'big')
+            elif kind == 0x2F:
+                assert position == len(track)
+            continue
+        pitch, velocity = track[position + 1], track[position + 2]
+        events.append((tick, 'on' if status & 0xF0 == 0x90 else 'off', pitch, velocity))
+        position += 3
+    return (header_length, file_format, tracks, ticks_per_beat), tempo, events
+
+
+def test_header_tempo_and_events():
+    data = write_midi_bytes(_notes((0.0, 0.5, 60, 100), (0.5, 1.0, 64, 90), (3.0, 3.25, 67, 80)), tempo_bpm=120.0)
+
+    header, tempo, events = _parse(data)
+
+    assert header == (6, 0, 1, 480)
+    assert tempo == 500_000
+    # At 120 BPM, a second is 960 ticks; the last onset's delta (1920 ticks) takes two bytes
+    assert events == [(0, 'on', 60, 100), (480, 'off', 60, 0), (480, 'on', 64, 90), (960, 'off', 64, 0),
+                      (2880, 'on', 67, 80), (3120, 'off', 67, 0)]
+
+
+@pytest.mark.parametrize('value, encoded', [(0, b'\x00'), (127, b'\x7f'), (128, b'\x81\x00'),
+                                            (16383, b'\xff\x7f'), (16384, b'\x81\x80\x00')])
+def test_delta_times_are_variable_length(value, encoded):
+    ticks_per_second = 960
+    data = write_midi_bytes(_notes((value / ticks_per_second, (value + 1) / ticks_per_second, 60, 64)))
+    # The first delta after the tempo meta event is the note-on's
+    assert data[22 + 7:22 + 7 + len(encoded)] == encoded
+    assert _parse(data)[2][0] == (value, 'on', 60, 64)
+
+
+def test_repeated_pitch_retriggers_after_its_note_off():
+    _, _, events = _parse(write_midi_bytes(_notes((0.0, 0.5, 60, 100), (0.5, 1.0, 60, 100))))
+    assert events == [(0, 'on', 60, 100), (480, 'off', 60, 0), (480, 'on', 60, 100), (960, 'off', 60, 0)]
+
+
+def test_overlapping_notes_of_a_pitch_are_not_cut_short():
+    # The second note starts while the first sounds, and the third lies inside the first
+    notes = _notes((0.0, 1.0, 60, 100), (0.5, 1.5, 60, 90), (2.0, 4.0, 62, 80), (2.5, 3.0, 62, 70))
+
+    _, _, events = _parse(write_midi_bytes(notes))
+
+    assert events == [(0, 'on', 60, 100), (480, 'off', 60, 0), (480, 'on', 60, 90), (1440, 'off', 60, 0),
+                      (1920, 'on', 62, 80), (2400, 'off', 62, 0), (2400, 'on', 62, 70), (3840, 'off', 62, 0)]
+    # Every note-on is matched by exactly one later note-off
+    sounding = set()
+    for _, kind, pitch, _ in events:
+        assert (pitch in sounding) == (kind == 'off')
+        (sounding.add if kind == 'on' else sounding.remove)(pitch)
+    assert not sounding
+
+
+def test_notes_of_a_pitch_starting_together_are_merged():
+    _, _, events = _parse(write_midi_bytes(_notes((1.0, 1.5, 60, 100), (1.0, 2.0, 60, 90))))
+    assert events == [(960, 'on', 60, 90), (1920, 'off', 60, 0)]
+
+
+def test_very_slow_tempo_is_clamped():
+    _, tempo, events = _parse(write_midi_bytes(_notes((0.0, 60.0, 60, 100)), tempo_bpm=2.0))
+    assert tempo == 0xFFFFFF
+    # Ticks follow the tempo actually written, so the note still lasts a minute, to a tick
+    seconds_per_tick = tempo / 480 / 1e6
+    assert events[-1][0] * seconds_per_tick == pytest.approx(60.0, abs=seconds_per_tick)
+
+
+def test_empty_track():
+    header, tempo, events = _parse(write_midi_bytes(_notes()))
+    assert header == (6, 0, 1, 480) and tempo == 500_000 and events == []
@@ -0,0 +1,78 @@
+"""
+Tests for filling a score from quantized notes and streaming it as MusicXML.
+"""
+
+import io
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
+
+from src.infrastructure.musicxml_writer import MusicXMLDocument
+from src.infrastructure.note_segmentation import NOTE_DTYPE
+from src.infrastructure.score_quantization import build_score
+
+TEMPO = 120.0
+BEAT_TIMES = np.arange(0.0, 8.0, 0.5)
+
+
+def _parse(document):
+    chunks = list(document)
+    assert len(chunks) > 2
+    return ElementTree.fromstring(''.join(chunks).encode('utf-8'))
+
+
+def _pitches(root):
+    """
+    Returns the (step, alter, octave) of every pitched note, ties included.
+    """
+    return [(pitch.findtext('step'), int(pitch.findtext('alter') or 0), int(pitch.findtext('octave')))
+            for pitch in root.iter('pitch')]
+
+
+def test_quantized_notes_round_trip():
+    # Onsets slightly off the beat grid; lowest, highest and accidental pitches, and a note across a barline
+    notes = np.array([(0.02, 0.48, 60, 90), (0.51, 0.99, 61, 90), (1.0, 1.24, 0, 90), (1.25, 1.5, 11, 90),
+                      (1.5, 2.5, 127, 90), (2.5, 3.0, 118, 90)], dtype=NOTE_DTYPE)
+    score = build_score(notes, BEAT_TIMES, TEMPO, "Round <Trip>", composer="A & B")
+
+    assert score.notes.start.tolist() == [0, 4, 8, 10, 12, 20]
+    assert score.notes.duration.tolist() == [4, 4, 2, 2, 8, 4]
+
+    root = _parse(MusicXMLDocument(score))
+
+    assert root.tag == 'score-partwise'
+    assert root.findtext('work/work-title') == "Round <Trip>"
+    assert root.findtext('identification/creator') == "A & B"
+    # The G9 crosses the first barline and is split into two tied notes
+    assert _pitches(root) == [('C', 0, 4), ('C', 1, 4), ('C', 0, -1), ('B', 0, -1), ('G', 0, 9), ('G', 0, 9),
+                              ('A', 1, 8)]
+    ties = [[tie.get('type') for tie in note.findall('tie')] for note in root.iter('note')]
+    assert [types for types in ties if types] == [['start'], ['stop']]
+
+
+def test_measures_are_filled_with_rests():
+    notes = np.array([(0.5, 1.0, 64, 90), (5.0, 5.5, 67, 90)], dtype=NOTE_DTYPE)
+    score = build_score(notes, BEAT_TIMES, TEMPO, "Rests")
+
+    root = _parse(MusicXMLDocument(score))
+
+    measures = root.findall('part/measure')
+    assert [measure.get('number') for measure in measures] == ['1', '2', '3']
+    measure_length = score.divisions * score.beats_per_measure
+    for measure in measures:
+        assert sum(int(note.findtext('duration')) for note in measure.iter('note')) == measure_length
+    assert root.find('part/measure/note/rest') is not None
+
+
+def test_empty_score_is_one_rest_measure():
+    score = build_score(np.zeros(0, dtype=NOTE_DTYPE), BEAT_TIMES, TEMPO, "Silence")
+    root = _parse(MusicXMLDocument(score))
+    assert len(root.findall('part/measure')) == 1 and _pitches(root) == []
+
+
+def test_write_to_matches_iteration():
+    score = build_score(np.array([(0.0, 1.0, 69, 90)], dtype=NOTE_DTYPE), BEAT_TIMES, TEMPO, "Sink")
+    document = MusicXMLDocument(score)
+    sink = io.StringIO()
+    document.write_to(sink)
+    assert sink.getvalue() == str(document) == ''.join(document)
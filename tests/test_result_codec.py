@@ -0,0 +1,87 @@
+"""
+Tests for the binary result codec and the JSON view of results.
+"""
+
+import io
+
+import numpy as np
+import pytest
+
+from src.entities.diagnostics import Diagnostics, SpanTiming
+from src.entities.music_score import MusicScore
+from src.entities.musical_feature import PITCH_TRACK_DTYPE, MusicalFeature
+from src.entities.note import SCORE_NOTE_DTYPE
+from src.entities.transcription_result import TranscriptionResult
+from src.infrastructure.musicxml_writer import MusicXMLDocument
+from src.interface_adapters.result_codec import FORMAT_VERSION, decode_result, encode_result, result_to_json
+
+
+def _diagnostics():
+    return Diagnostics(spans=[SpanTiming('decode', 1, 0.5, 0.4, None), SpanTiming('decode/beats', 2, 0.25, 0.2, 4096)],
+                       profile="profile text", allocations=["site: 1 KiB"], measurements={'skipped_seconds': 1.5})
+
+
+def _span_fields(span):
+    return (span.name, span.calls, span.wall_seconds, span.cpu_seconds, span.peak_allocated_bytes)
+
+
+def test_musical_feature_round_trip():
+    pitch_track = np.array([(0.0, 440.0), (0.01, 0.0), (0.02, 441.5)], dtype=PITCH_TRACK_DTYPE)
+    feature = MusicalFeature(tempo=123.0469, key="F# minor", pitch=[440.0, 220.5], rhythm=[0.5, 1.0, 1.49],
+                             pitch_track=pitch_track, diagnostics=_diagnostics())
+
+    decoded = decode_result(encode_result(feature))
+
+    assert isinstance(decoded, MusicalFeature)
+    assert decoded.tempo == feature.tempo and decoded.key == "F# minor"
+    assert decoded.pitch.dtype == np.float32 and np.array_equal(decoded.pitch, feature.pitch)
+    assert decoded.rhythm.dtype == np.float64 and np.array_equal(decoded.rhythm, feature.rhythm)
+    assert decoded.pitch_track.dtype == PITCH_TRACK_DTYPE and np.array_equal(decoded.pitch_track, pitch_track)
+    assert list(map(_span_fields, decoded.diagnostics.spans)) == list(map(_span_fields, feature.diagnostics.spans))
+    assert decoded.diagnostics.profile == "profile text"
+    assert decoded.diagnostics.allocations == ["site: 1 KiB"]
+    assert decoded.diagnostics.measurements == {'skipped_seconds': 1.5}
+
+
+def test_unevaluated_features_are_left_out():
+    computed = []
+    feature = MusicalFeature(tempo=96.0, key=lambda: computed.append('key') or "C major", pitch=None,
+                             rhythm=[0.625])
+
+    decoded = decode_result(encode_result(feature))
+
+    assert computed == []
+    assert decoded.tempo == 96.0 and decoded.key is None and decoded.pitch is None and decoded.pitch_track is None
+    assert result_to_json(feature) == {"tempo": 96.0, "key": None, "pitch": None, "rhythm": [0.625]}
+
+
+def test_transcription_round_trip_renders_the_score():
+    score = MusicScore("Round Trip")
+    score.add_notes(np.array([(60, 0, 4, 90), (64, 4, 4, 90), (67, 8, 8, 90)], dtype=SCORE_NOTE_DTYPE))
+    document = MusicXMLDocument(score)
+    midi_data = b'MThd\x00\x00\x00\x06\x00\x00\x00\x01\x01\xe0'
+    result = TranscriptionResult(midi_data, document)
+
+    decoded = decode_result(encode_result(result))
+
+    assert isinstance(decoded, TranscriptionResult)
+    assert decoded.midi_data == midi_data
+    assert decoded.score_data == ''.join(document)
+    assert decoded.diagnostics is None
+    assert result_to_json(decoded)["score_data"] == decoded.score_data
+
+
+def test_archive_loads_without_pickle():
+    feature = MusicalFeature(tempo=120.0, key="C major", pitch=[440.0], rhythm=[0.5])
+    with np.load(io.BytesIO(encode_result(feature)), allow_pickle=False) as archive:
+        assert int(archive['format_version']) == FORMAT_VERSION
+        assert all(archive[name].dtype != object for name in archive.files)
+
+
+def test_unknown_version_and_types_are_rejected():
+    buffer = io.BytesIO()
+    np.savez(buffer, kind=np.array('musical_feature'), format_version=np.array(FORMAT_VERSION + 1))
+    with pytest.raises(ValueError, match="Unsupported result format version"):
+        decode_result(buffer.getvalue())
+    with pytest.raises(TypeError):
+        encode_result({"tempo": 120.0})
@@ -0,0 +1,134 @@
+"""
+Tests for the shared PCM cache: misses decode once and write an entry, hits map it without decoding, and
+eviction frees only the entries no process holds.
+"""
+
+import gc
+import os
+import pickle
+
+import librosa
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.infrastructure.shared_pcm_cache import SharedPCMCache
+
+SR = 8000
+
+
+def _write_tone(path, frequency, seconds=1.0):
+    t = np.arange(int(SR * seconds)) / SR
+    sf.write(path, (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32), SR, subtype='FLOAT')
+    return path
+
+
+def _entries(cache):
+    return sorted(name for name in os.listdir(cache.root_dir) if name.endswith('.pcm'))
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """
+    Records the files the cache decodes.
+    """
+    decoded = []
+    decode = librosa.load
+
+    def load(path, **kwargs):
+        decoded.append(path)
+        return decode(path, **kwargs)
+
+    monkeypatch.setattr(librosa, 'load', load)
+    return decoded
+
+
+def test_miss_writes_an_entry_and_hit_maps_it(tmp_path, decodes):
+    cache = SharedPCMCache(str(tmp_path / 'cache'))
+    path = _write_tone(str(tmp_path / 'a.wav'), 440.0)
+
+    y, sr = cache.load(path)
+    assert decodes == [path] and sr == SR and len(_entries(cache)) == 1
+    assert y.dtype == np.float32 and not y.flags.writeable
+    with pytest.raises(ValueError):
+        y[0] = 1.0
+
+    again, _ = cache.load(path)
+    assert decodes == [path]
+    assert np.array_equal(again, y)
+    assert np.array_equal(y, sf.read(path, dtype='float32')[0])
+
+
+def test_entries_are_keyed_by_content_and_parameters(tmp_path, decodes):
+    cache = SharedPCMCache(str(tmp_path / 'cache'))
+    path = _write_tone(str(tmp_path / 'a.wav'), 440.0)
+    copy = _write_tone(str(tmp_path / 'copy.wav'), 440.0)
+
+    cache.load(path)
+    # The same content under another name shares the entry
+    cache.load(copy)
+    assert len(decodes) == 1
+
+    y, sr = cache.load(path, sample_rate=SR // 2)
+    assert sr == SR // 2 and len(y) == SR // 2
+    assert len(decodes) == 2 and len(_entries(cache)) == 2
+
+
+def test_eviction_skips_held_entries(tmp_path, decodes):
+    cache = SharedPCMCache(str(tmp_path / 'cache'))
+    held, _ = cache.load(_write_tone(str(tmp_path / 'held.wav'), 440.0))
+    released, _ = cache.load(_write_tone(str(tmp_path / 'released.wav'), 660.0))
+    assert len(_entries(cache)) == 2
+
+    del released
+    gc.collect()
+    remaining = cache.evict(max_bytes=0)
+
+    assert len(_entries(cache)) == 1 and remaining == held.nbytes + 64
+    # Only the evicted entry's key lock is removed
+    assert len([name for name in os.listdir(cache.root_dir) if name.endswith('.lock')]) == 1
+    assert np.isfinite(held).all()
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path, decodes):
+    cache = SharedPCMCache(str(tmp_path / 'cache'))
+    paths = [_write_tone(str(tmp_path / f'{i}.wav'), 220.0 * (i + 1)) for i in range(3)]
+    for path in paths:
+        cache.load(path)
+    gc.collect()
+    # Entries are ordered by their last use, which every mapping records as the entry's mtime
+    names = _entries(cache)
+    for last_used, name in zip((300, 100, 200), names):
+        os.utime(os.path.join(cache.root_dir, name), (last_used, last_used))
+    oldest = names[1]
+    entry_bytes = os.path.getsize(os.path.join(cache.root_dir, oldest))
+
+    cache.evict(max_bytes=2 * entry_bytes)
+
+    assert len(_entries(cache)) == 2 and oldest not in _entries(cache)
+
+
+def test_evicted_entry_stays_readable_while_mapped(tmp_path, decodes):
+    cache = SharedPCMCache(str(tmp_path / 'cache'))
+    path = _write_tone(str(tmp_path / 'a.wav'), 440.0)
+    y, _ = cache.load(path)
+    expected = np.array(y)
+
+    # Remove the entry behind the mapping's back, as another host process might
+    for name in _entries(cache):
+        os.remove(os.path.join(cache.root_dir, name))
+
+    assert np.array_equal(y, expected)
+    cache.load(path)
+    assert len(decodes) == 2
+
+
+def test_cache_pickles_by_location(tmp_path, decodes):
+    cache = SharedPCMCache(str(tmp_path / 'cache'), max_bytes=1024)
+    path = _write_tone(str(tmp_path / 'a.wav'), 440.0)
+    cache.load(path)
+
+    clone = pickle.loads(pickle.dumps(cache))
+    assert (clone.root_dir, clone.max_bytes) == (cache.root_dir, 1024)
+    clone.load(path)
+    assert len(decodes) == 1
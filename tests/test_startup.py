@@ -0,0 +1,17 @@
+"""
+Tests for the process warm-up run before a service takes requests.
+"""
+
+import pytest
+
+from src.infrastructure.performance_profile import PerformanceProfile
+from src.infrastructure.startup import warm_up
+
+
+@pytest.mark.parametrize('profile', ['fast', PerformanceProfile('custom', 11025, 'soxr_lq', 1024, 256)],
+                         ids=['registered', 'custom'])
+def test_warm_up_runs_every_stage(profile):
+    diagnostics = warm_up(profile, duration=2.0)
+
+    names = {timing.name for timing in diagnostics.spans}
+    assert {'warm_up/decode', 'warm_up/features', 'warm_up/transcription'} <= names